@@ -0,0 +1,97 @@
+"""Time repeated requests to one host through the shared HTTP session, against
+a new connection per request as the network tools used to make.
+
+The host is a stand-in server on localhost. It can wait before answering the
+first request on each connection, to stand in for the DNS lookup and the TLS
+handshake a remote host would cost.
+
+    python benchmarks/http_session.py [--requests 200] [--handshake-ms 20]
+"""
+
+import sys
+import time
+import argparse
+import threading
+import statistics
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+BODY = b"<html><body>" + b"<p>Forecast: sunny.</p>" * 200 + b"</body></html>"
+
+
+def serve(handshake: float) -> ThreadingHTTPServer:
+    """Start the stand-in server on a free port, in the background."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately, which Nagle's algorithm
+        # would hold back on a reused connection until the client's delayed ACK.
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            time.sleep(handshake)
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed(get, url: str, count: int):
+    """Return the latency of each of `count` requests, in seconds."""
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = get(url)
+        response.raise_for_status()
+        response.content
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    sys.path.append(str(ROOT / "tools"))
+    from _builtin_shared.network import get_session
+
+    server = serve(args.handshake_ms / 1000)
+    host, port = server.server_address
+    url = f"http://{host}:{port}/forecast"
+
+    cases = [
+        ("requests.get", lambda url: requests.get(url, timeout=15)),
+        ("shared session", get_session().get),
+    ]
+    for name, get in cases:
+        samples = timed(get, url, args.requests)
+        print(
+            f"{name:>14}: median {statistics.median(samples) * 1000:6.2f}ms, "
+            f"p95 {statistics.quantiles(samples, n=20)[-1] * 1000:6.2f}ms, "
+            f"total {sum(samples):6.2f}s over {len(samples)} requests"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
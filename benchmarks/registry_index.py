@@ -0,0 +1,108 @@
+"""Time loading tools and preparing them for a request, for 20, 100 and 500
+generated tools, against the SDK's tool manager.
+
+Loading is timed cold, with no index cached, and warm, reusing the index the
+cold load wrote. Per request, the SDK's callables are converted to schemas by
+the Ollama client, while the registry's precompiled schemas are only
+validated by it.
+
+    python benchmarks/registry_index.py [--tools 20 100 500] [--runs 5]
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+TOOLS_PER_MODULE = 5
+
+TOOL = '''
+def tool_{index}(query: str, limit: int = 10, exact: bool = False):
+    """
+    Looks up records of kind {index} matching a query.
+
+    For the model: Use this to find records of kind {index}. Results are sorted
+    by relevance, best first.
+
+    Args:
+        query (str): The text to search for.
+        limit (int, optional): The most results to return. Defaults to 10.
+        exact (bool, optional): Whether to match the query exactly.
+
+    Returns:
+        list: The matching records.
+    """
+    return []
+'''
+
+
+def generate(directory: Path, tools: int):
+    for start in range(0, tools, TOOLS_PER_MODULE):
+        indices = range(start, min(start + TOOLS_PER_MODULE, tools))
+        source = "".join(TOOL.format(index=index) for index in indices)
+        (directory / f"tools_{start}.py").write_text(source)
+
+
+def timed(function, runs: int) -> float:
+    """Return the median time of a function, over a number of runs."""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tools", type=int, nargs="+", default=[20, 100, 500])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    from ollama._client import _copy_tools
+    from sdk.tools import ToolManager
+    from cli.registry import ToolRegistry
+
+    for count in args.tools:
+        with tempfile.TemporaryDirectory() as directory:
+            generate(Path(directory), count)
+            tool_dirs = [directory]
+            index = Path(directory) / "index.json"
+
+            def cold():
+                index.unlink(missing_ok=True)
+                ToolRegistry(tool_dirs, index_path=index)
+
+            def warm():
+                ToolRegistry(tool_dirs, index_path=index)
+
+            sdk_tools = ToolManager(tool_dirs).get_tools()
+            schemas = ToolRegistry(tool_dirs, index_path=index).get_schemas()
+
+            timings = {
+                "sdk load": timed(lambda: ToolManager(tool_dirs), args.runs),
+                "cold index": timed(cold, args.runs),
+                "warm index": timed(warm, args.runs),
+                "sdk request": timed(lambda: list(_copy_tools(sdk_tools)), args.runs),
+                "registry request": timed(
+                    lambda: list(_copy_tools(schemas)), args.runs
+                ),
+            }
+            print(
+                f"{count:>4} tools: "
+                + ", ".join(
+                    f"{name} {elapsed * 1000:.2f}ms"
+                    for name, elapsed in timings.items()
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Time how long rendering a streamed response takes, per chunk.
+
+Compares re-rendering the whole response on every chunk, as the CLI used to,
+with printing completed blocks once and re-rendering only the open one.
+
+    python benchmarks/render_stream.py [--paragraphs 20]
+"""
+
+import io
+import sys
+import time
+import argparse
+
+from pathlib import Path
+
+from rich.console import Console
+from rich.live import Live
+from rich.markdown import Markdown
+from rich.panel import Panel
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cli.interface import ChatInterface  # noqa: E402
+from cli.theme import Theme  # noqa: E402
+
+
+PARAGRAPH = (
+    "Some **bold** text, a [link](https://example.com) and `inline code`, "
+    "followed by a longer sentence to make the paragraph wrap a few times.\n\n"
+    "```python\nfor i in range(10):\n    print(i)\n```\n\n"
+)
+
+
+def chunks(paragraphs: int):
+    """Split a response into chunks of about the size a model streams."""
+    text = PARAGRAPH * paragraphs
+    return [text[i : i + 4] for i in range(0, len(text), 4)]
+
+
+def full_rerender(console: Console, stream) -> float:
+    theme = Theme()
+    start = time.perf_counter()
+    response = ""
+    with Live(console=console, auto_refresh=False) as live:
+        for chunk in stream:
+            response += chunk
+            live.update(
+                Panel(Markdown(response), border_style=theme.border), refresh=True
+            )
+    return time.perf_counter() - start
+
+
+def incremental(console: Console, stream) -> float:
+    # Refresh on every chunk, like the old renderer, so only the work per
+    # refresh differs.
+    interface = ChatInterface(console, Theme(), frame_rate=float("inf"))
+    start = time.perf_counter()
+    interface.start_stream()
+    for chunk in stream:
+        interface.update_stream(chunk)
+    interface.stop_stream()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=20)
+    args = parser.parse_args()
+
+    stream = chunks(args.paragraphs)
+    for name, render in (
+        ("full re-render", full_rerender),
+        ("incremental", incremental),
+    ):
+        console = Console(file=io.StringIO(), force_terminal=True, width=100)
+        elapsed = render(console, stream)
+        print(
+            f"{name:>15}: {elapsed:7.2f}s for {len(stream)} chunks, "
+            f"{elapsed / len(stream) * 1000:6.2f}ms per chunk"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Measure how fast scrape_url extracts a page's main content, and the memory
+it takes, against the BeautifulSoup pipeline it replaced.
+
+The page is generated, shaped like a news article: navigation, scripts and
+styles, a long article, and a comment section after it. A saved page can be
+given instead, such as those in tests/fixtures/pages.
+
+    python benchmarks/scrape_extract.py [--paragraphs 2000] [--runs 5] [--page FILE]
+"""
+
+import sys
+import json
+import time
+import resource
+import argparse
+import subprocess
+import importlib.util
+
+from pathlib import Path
+from typing import Optional
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PARAGRAPH = (
+    "<p>The council met on Tuesday to discuss the budget, which has grown by "
+    "a <a href='/news/budget'>tenth</a> since last year, and agreed to review "
+    "it again in the spring.</p>\n"
+)
+
+
+def page(paragraphs: int) -> str:
+    nav = "<nav><ul>" + "<li><a href='/x'>Section</a></li>" * 200 + "</ul></nav>"
+    script = "<script>" + "var x = {a: 1, b: [1, 2, 3]};\n" * 2000 + "</script>"
+    style = "<style>" + ".a { color: red; }\n" * 2000 + "</style>"
+    article = "<article><h1>Budget</h1>" + PARAGRAPH * paragraphs + "</article>"
+    comments = "<div class='comments'>" + PARAGRAPH * (paragraphs // 4) + "</div>"
+    return (
+        f"<html><head><title>Budget</title>{script}{style}</head>"
+        f"<body>{nav}<main>{article}{comments}</main></body></html>"
+    )
+
+
+def streaming_extractor():
+    """Return scrape_url's extraction, as it runs on a streamed response."""
+    sys.path.append(str(ROOT / "tools"))
+    spec = importlib.util.spec_from_file_location(
+        "scrape_url", ROOT / "tools" / "scrape_url.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    def extract(html: str) -> str:
+        extractor = module._ContentExtractor()
+        for start in range(0, len(html), 64 * 1024):
+            extractor.feed(html[start : start + 64 * 1024])
+            if extractor.done:
+                break
+        extractor.close()
+        return extractor.content()
+
+    return extract
+
+
+def soup_extractor():
+    """Return the BeautifulSoup pipeline scrape_url used to run."""
+    from bs4 import BeautifulSoup
+
+    def extract(html: str) -> str:
+        soup = BeautifulSoup(html, "html.parser")
+        for tag in ["script", "style", "nav", "header", "footer", "aside"]:
+            for s in soup.select(tag):
+                s.decompose()
+        main_content = soup.find("article") or soup.find("main") or soup.body
+        return main_content.get_text(separator="\n", strip=True)
+
+    return extract
+
+
+def measure(engine: str, paragraphs: int, saved: Optional[Path]):
+    """Extract a page once, in this process, and print the timings as JSON."""
+    html = saved.read_text(encoding="utf-8") if saved else page(paragraphs)
+    # Imports are done before timing, as the tool module stays loaded.
+    extract = {"streaming": streaming_extractor, "soup": soup_extractor}[engine]()
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    text = extract(html)
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+    print(
+        json.dumps(
+            {
+                "bytes": len(html),
+                "elapsed": elapsed,
+                "peak_kb": peak,
+                "chars": len(text),
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--page", type=Path, help="A saved HTML page to extract")
+    parser.add_argument("--engine", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.engine:
+        measure(args.engine, args.paragraphs, args.page)
+        return
+
+    for engine in ("soup", "streaming"):
+        runs = []
+        for _ in range(args.runs):
+            # A fresh process per run, so each peak is that run's own.
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--engine",
+                    engine,
+                    "--paragraphs",
+                    str(args.paragraphs),
+                    *(["--page", str(args.page)] if args.page else []),
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            runs.append(json.loads(output))
+
+        best = min(runs, key=lambda run: run["elapsed"])
+        print(
+            f"{engine:>9}: {best['bytes'] / best['elapsed'] / 1e6:6.1f} MB/s, "
+            f"{best['elapsed'] * 1000:7.1f}ms, peak +{best['peak_kb'] / 1024:5.1f} MB, "
+            f"{best['chars']} chars extracted"
+        )
+
+
+if __name__ == "__main__":
+    main()
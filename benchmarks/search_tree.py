@@ -0,0 +1,116 @@
+"""Time search_files on a generated tree, against the os.walk and fnmatch
+search it replaced.
+
+The tree has source directories, plus a node_modules directory and a build
+directory listed in .gitignore, which make up a third of the files. It is
+generated once and reused between runs when --tree is given.
+
+    python benchmarks/search_tree.py [--files 200000] [--tree /tmp/search-tree]
+"""
+
+import os
+import sys
+import time
+import fnmatch
+import argparse
+import tempfile
+import importlib.util
+
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+FILES_PER_DIRECTORY = 100
+
+
+def generate(root: Path, files: int):
+    """Create the tree, unless a previous run already did."""
+    marker = root / ".generated"
+    if marker.exists() and marker.read_text() == str(files):
+        return
+
+    (root / ".gitignore").write_text("build/\n")
+    ignored = files // 3
+    previous = None
+    for index in range(files):
+        if index < ignored // 2:
+            base = root / "node_modules"
+        elif index < ignored:
+            base = root / "build"
+        else:
+            base = root / "src"
+        directory = (
+            base
+            / f"d{index // FILES_PER_DIRECTORY // 50}"
+            / f"{index // FILES_PER_DIRECTORY}"
+        )
+        if directory != previous:
+            directory.mkdir(parents=True, exist_ok=True)
+            previous = directory
+        suffix = ".py" if index % 10 == 0 else ".txt"
+        (directory / f"file{index}{suffix}").write_text(
+            "import os\n" if suffix == ".py" else ""
+        )
+
+    marker.write_text(str(files))
+
+
+def walk_search(directory: str, pattern: str):
+    matches = []
+    for root, _, filenames in os.walk(directory):
+        for filename in fnmatch.filter(filenames, pattern):
+            matches.append(os.path.join(root, filename))
+    return matches
+
+
+def load_search_files():
+    spec = importlib.util.spec_from_file_location(
+        "search_files", ROOT / "tools" / "search_files.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.search_files
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200_000)
+    parser.add_argument("--tree", type=Path)
+    args = parser.parse_args()
+
+    tree = args.tree or Path(tempfile.mkdtemp(prefix="search-tree-"))
+    tree.mkdir(parents=True, exist_ok=True)
+    elapsed, _ = timed(generate, tree, args.files)
+    print(f"tree of {args.files} files at {tree} ({elapsed:.1f}s to generate)")
+
+    search_files = load_search_files()
+    # Nothing matches, so both searches walk everything they do not prune.
+    cases = [
+        ("os.walk, no matches", walk_search, (str(tree), "*.none"), {}),
+        ("search_files, no matches", search_files, (str(tree), "*.none"), {}),
+        ("os.walk, all *.py", walk_search, (str(tree), "*.py"), {}),
+        ("search_files, first page of *.py", search_files, (str(tree), "*.py"), {}),
+        (
+            "search_files, grep first page",
+            search_files,
+            (str(tree), "*.py"),
+            {"contains": "import os"},
+        ),
+    ]
+    for name, function, positional, keywords in cases:
+        # Once to warm the page cache, then timed.
+        function(*positional, **keywords)
+        elapsed, result = timed(function, *positional, **keywords)
+        count = len(result["matches"] if isinstance(result, dict) else result)
+        print(f"{name:>34}: {elapsed * 1000:8.1f}ms, {count} results")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Time how long the CLI takes to start, up to loading its tools.
+
+Each run is a fresh interpreter that imports the CLI and loads the bundled
+tools, which is everything before the first prompt except talking to Ollama.
+Cold runs start without a tool index, warm runs reuse the one cached by the
+run before, and eager runs import every tool module as the SDK does.
+
+    python benchmarks/startup.py [--runs 5]
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+LAZY = """
+import main
+from cli.registry import ToolRegistry
+ToolRegistry(["tools"]).get_tools()
+"""
+
+EAGER = """
+import sys
+import main
+from sdk.tools import ToolManager
+# The SDK does not put the tools' directory on the import path for them.
+sys.path.append("tools")
+ToolManager(["tools"]).get_tools()
+"""
+
+
+def run(code: str, cache: str) -> float:
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env={"XDG_CACHE_HOME": cache, "PATH": ""},
+        check=True,
+    )
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = {"cold": [], "warm": [], "eager": []}
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as cache:
+            timings["cold"].append(run(LAZY, cache))
+            timings["warm"].append(run(LAZY, cache))
+            timings["eager"].append(run(EAGER, cache))
+
+    for name, samples in timings.items():
+        print(
+            f"{name:>5}: median {statistics.median(samples) * 1000:7.1f}ms, "
+            f"best {min(samples) * 1000:7.1f}ms over {len(samples)} runs"
+        )
+
+
+if __name__ == "__main__":
+    main()
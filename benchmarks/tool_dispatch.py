@@ -0,0 +1,121 @@
+"""Measure the overhead of running a tool in a worker process, against running
+it in the thread pool as the CLI does without --isolate-tools.
+
+The tool returns its argument, so the timings are all dispatch: pickling the
+call and its result, and the round trip through the worker's socket. While
+each call is in flight, a ticker on the event loop records its longest stall,
+which is what the UI would freeze for. The cost of replacing a killed worker
+is measured last.
+
+    python benchmarks/tool_dispatch.py [--calls 200]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+TOOL = """
+import time
+
+def echo(value):
+    return value
+
+def sleep(seconds):
+    time.sleep(seconds)
+"""
+
+PAYLOADS = {"small": b"x" * 100, "1 MB": b"x" * 2**20, "32 MB": b"x" * 2**25}
+
+
+async def stalls(running: asyncio.Event, samples: list):
+    """Record the longest gap between ticks of the event loop while running."""
+    previous = time.perf_counter()
+    longest = 0.0
+    while running.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        longest = max(longest, now - previous)
+        previous = now
+    samples.append(longest)
+
+
+async def measure(call, calls: int):
+    latencies, stalled = [], []
+    for _ in range(calls):
+        running = asyncio.Event()
+        running.set()
+        ticker = asyncio.create_task(stalls(running, stalled))
+        started = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - started)
+        running.clear()
+        await ticker
+    return latencies, stalled
+
+
+async def main_async(calls: int):
+    sys.path.insert(0, str(ROOT))
+    from cli.workers import WorkerPool
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "echo_tool.py"
+        path.write_text(TOOL)
+        namespace = {}
+        exec(TOOL, namespace)
+
+        pool = WorkerPool(1, timeout=30)
+        pool.start([str(path)])
+        try:
+            for name, payload in PAYLOADS.items():
+                count = calls if len(payload) < 2**24 else max(1, calls // 20)
+                cases = [
+                    ("thread", lambda: asyncio.to_thread(namespace["echo"], payload)),
+                    (
+                        "worker",
+                        lambda: pool.run(str(path), "echo", {"value": payload}),
+                    ),
+                ]
+                for engine, call in cases:
+                    await call()  # the worker's first call waits for its import
+                    latencies, stalled = await measure(call, count)
+                    print(
+                        f"{name:>6} {engine:>6}: "
+                        f"median {statistics.median(latencies) * 1000:7.2f}ms, "
+                        f"longest loop stall {max(stalled) * 1000:6.2f}ms "
+                        f"over {count} calls"
+                    )
+
+            respawns = []
+            for _ in range(max(1, calls // 20)):
+                started = time.perf_counter()
+                try:
+                    await pool.run(str(path), "sleep", {"seconds": 10}, timeout=0.01)
+                except TimeoutError:
+                    pass
+                await pool.run(str(path), "echo", {"value": 0})
+                respawns.append(time.perf_counter() - started - 0.01)
+            print(
+                f"respawn after a timeout: median "
+                f"{statistics.median(respawns) * 1000:.1f}ms"
+            )
+        finally:
+            pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Measure the time to the first token of the first response, with and without
+warming up the model at startup, against a stand-in Ollama server.
+
+The server waits as a real one would: once to load the model, and then for
+each request in proportion to the part of its tools and messages that it has
+not seen before. With warm-up, the system prompt and every bundled tool are
+sent while the user is still typing, as the CLI does with --warm-up, so the
+first prompt only has to wait for its own message.
+
+    python benchmarks/warm_up.py [--load 2.0] [--prefill 0.02] [--typing 3.0] [--runs 3]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SYSTEM_PROMPT = "You are a helpful assistant that uses tools to answer. " * 20
+
+PROMPT = "What is the weather like in Lisbon today?"
+
+
+async def first_token(server, index_path: Path, warm_up: bool, typing: float) -> float:
+    """Start a session, let the user type, then time the first prompt's first
+    token, including any wait for a warm-up that is still running.
+    """
+    from cli.agent import Agent
+    from cli.provider import Provider
+    from cli.registry import ToolRegistry
+
+    registry = ToolRegistry([str(ROOT / "tools")], index_path=index_path)
+    agent = Agent(Provider("fake", server.url), SYSTEM_PROMPT, tool_registry=registry)
+    warming = asyncio.create_task(agent.warm_up()) if warm_up else None
+    await asyncio.sleep(typing)
+
+    started = time.perf_counter()
+    if warming is not None:
+        await warming
+    elapsed = None
+    async for part in agent.stream_response(PROMPT):
+        if part.kind == "text" and elapsed is None:
+            elapsed = time.perf_counter() - started
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--load", type=float, default=2.0, help="Seconds to load the model"
+    )
+    parser.add_argument(
+        "--prefill",
+        type=float,
+        default=0.02,
+        help="Seconds to evaluate each uncached kilobyte of the prompt",
+    )
+    parser.add_argument(
+        "--typing", type=float, default=3.0, help="Seconds before the first prompt"
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    sys.path.insert(0, str(ROOT / "tests"))
+    from fake_ollama import FakeOllama
+
+    with tempfile.TemporaryDirectory() as directory:
+        index_path = Path(directory) / "index.json"
+        for warm_up in (False, True):
+            samples = []
+            for _ in range(args.runs):
+                with FakeOllama(
+                    load_delay=args.load, prefill_delay=args.prefill
+                ) as server:
+                    samples.append(
+                        asyncio.run(
+                            first_token(server, index_path, warm_up, args.typing)
+                        )
+                    )
+            print(
+                f"{'warm-up' if warm_up else 'cold':>7}: time to first token "
+                f"median {statistics.median(samples) * 1000:7.1f}ms, "
+                f"best {min(samples) * 1000:7.1f}ms over {len(samples)} runs"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import asyncio
+
+from typing import Dict, Any, List, Optional, AsyncIterator, Union
+
+from sdk import Agent as BaseAgent
+from sdk.providers.base import BaseProvider
+from sdk.types import Message, Part
+
+from .cache import ConversionCache
+from .files import FileManager
+from .history import HistoryManager
+from .registry import ToolRegistry
+from .router import ToolRouter
+
+
+# Ends a response that the user interrupted, so the model knows it was cut off.
+INTERRUPTED_MARKER = "\n\n[Response interrupted by the user.]"
+
+
+class Agent(BaseAgent):
+    """An SDK agent with the extra behaviour the CLI needs."""
+
+    def __init__(
+        self,
+        provider: BaseProvider,
+        prompt: Optional[str] = None,
+        tools: Optional[Union[str, List[str]]] = None,
+        eager_tool_calls: bool = False,
+        conversion_cache: Optional[ConversionCache] = None,
+        history_manager: Optional[HistoryManager] = None,
+        tool_registry: Optional[ToolRegistry] = None,
+        tool_router: Optional[ToolRouter] = None,
+    ):
+        # Tools are loaded by the registry below, so the SDK's eager loader
+        # must not be given any directories to import. A registry may also be
+        # shared between agents, so each tool module is only imported once.
+        super().__init__(provider, prompt)
+        self.tool_dirs = [tools] if isinstance(tools, str) else tools or []
+        self.tool_manager = tool_registry or ToolRegistry(self.tool_dirs)
+        self.tool_router = tool_router
+        self.eager_tool_calls = eager_tool_calls
+        self.file_manager = FileManager(conversion_cache or ConversionCache())
+        self.history_manager = history_manager or HistoryManager()
+        self.clear_history()
+
+    def clear_history(self):
+        """Resets the conversation history, preserving the system prompt."""
+        self.history.clear()
+        self.history_manager.clear()
+        if self.system_prompt:
+            prompt = Part(kind="text", data=self.system_prompt)
+            self.history.append(Message(role="system", parts=[prompt]))
+
+    async def warm_up(self):
+        """Prime the model with the system prompt and tools, ahead of any input.
+
+        Routed tools depend on the prompt, so none are primed when routing.
+        """
+        tools = self.tool_manager.get_schemas() if self.tool_router is None else []
+        await self.model_provider.warm_up(self.history, tools)
+
+    async def stream_response(
+        self, prompt: Optional[str], files: Optional[List[str]] = None
+    ) -> AsyncIterator[Part]:
+        """
+        Generates and streams a response from the model, like the SDK agent.
+        If `eager_tool_calls` is set, tool calls are yielded as soon as they
+        are parsed instead of being held back until the stream ends.
+        """
+        parts = []
+
+        if prompt is not None:
+            parts += [Part(kind="text", data=prompt)]
+
+        if files is not None and len(files) > 0:
+            files = await self.file_manager.process_files(files)
+            parts += [Part(kind="file", data=file) for file in files]
+
+        if len(parts) > 0:
+            self.history.append(Message(role="user", parts=parts))
+
+        self.history_manager.compact(self.history)
+
+        tools = self._select_tools(prompt)
+        stream = self.model_provider.chat(self.history, tools)
+
+        full_response = ""
+        tool_calls = []
+
+        try:
+            async for part in stream:
+                if part.kind == "text":
+                    full_response += part.data
+                    yield part
+                elif part.kind == "tool_call":
+                    tool_calls.append(part)
+                    if self.eager_tool_calls:
+                        yield part
+        except asyncio.CancelledError:
+            # Keep what was said, without tool calls that will never be run.
+            text = Part(kind="text", data=full_response + INTERRUPTED_MARKER)
+            self.history.append(Message(role="assistant", parts=[text]))
+            raise
+
+        parts = [Part(kind="text", data=full_response), *tool_calls]
+        self.history.append(Message(role="assistant", parts=parts))
+        if self.tool_router is not None:
+            self.tool_router.observe(call.data.tool for call in tool_calls)
+
+        if tool_calls and not self.eager_tool_calls:
+            for call_part in tool_calls:
+                yield call_part
+
+    def _select_tools(self, prompt: Optional[str]) -> List[Dict[str, Any]]:
+        """Return the schemas of the tools to send, routed if a router is set."""
+        schemas = self.tool_manager.get_schemas()
+        if self.tool_router is None:
+            return schemas
+        return self.tool_router.route(schemas, prompt)
@@ -0,0 +1,356 @@
+import json
+import time
+import asyncio
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from rich.console import Console
+
+from sdk.types import Message, ToolCall
+
+from .agent import Agent
+from .cache import ConversionCache
+from .history import HistoryManager
+from .interface import ChatInterface
+from .hosts import HostPool
+from .provider import Provider
+from .registry import ToolRegistry
+from .router import ToolRouter
+from .theme import Theme
+from .tools import ToolManager, ToolOutcome
+from .workers import WorkerPool
+
+
+# Allows every tool when given as an allowed tool name.
+ALL_TOOLS = "*"
+
+# Rounds of tool calls the model may make in a single turn before it is cut off.
+MAX_TOOL_ROUNDS = 10
+
+
+class BatchError(Exception):
+    pass
+
+
+class ToolRoundLimitReached(BatchError):
+    pass
+
+
+@dataclass
+class Conversation:
+    """A conversation to replay: its prompts, sent one turn at a time."""
+
+    id: str
+    prompts: List[str]
+    system: Optional[str] = None
+
+
+@dataclass
+class BatchSummary:
+    """The totals of a batch run, for reporting its throughput."""
+
+    conversations: int = 0
+    failed: int = 0
+    turns: int = 0
+    tool_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def conversations_per_minute(self) -> float:
+        return self.conversations * 60 / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.completion_tokens / self.elapsed if self.elapsed else 0.0
+
+
+def load_conversations(path: Path) -> List[Conversation]:
+    """Read conversations from a JSONL file, one JSON object per line.
+
+    Each object has an 'id' and a list of 'prompts' (or a single 'prompt'),
+    and may set its own 'system' prompt.
+    """
+    conversations = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+
+            try:
+                record = json.loads(line)
+                prompts = record.get("prompts") or [record["prompt"]]
+                conversations.append(
+                    Conversation(
+                        id=str(record.get("id", number)),
+                        prompts=[str(prompt) for prompt in prompts],
+                        system=record.get("system"),
+                    )
+                )
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                raise BatchError(f"Invalid conversation on line {number}: {e}")
+
+    return conversations
+
+
+class BatchToolManager(ToolManager):
+    """Runs the tools on an allowlist without asking, and records every call."""
+
+    def __init__(
+        self,
+        interface: ChatInterface,
+        allowed_tools: Set[str],
+        max_concurrency: int,
+        worker_pool: Optional[WorkerPool] = None,
+    ):
+        super().__init__(interface, max_concurrency, worker_pool=worker_pool)
+        self.allowed_tools = allowed_tools
+        self.calls: List[Dict[str, Any]] = []
+
+    async def _collect_consent(
+        self, tool_calls: List[ToolCall]
+    ) -> Tuple[List[ToolCall], Optional[ToolCall]]:
+        """Approve allowed calls, stopping at the first one not on the list."""
+        approved = []
+        for tool_call in tool_calls:
+            if (
+                ALL_TOOLS not in self.allowed_tools
+                and tool_call.tool not in self.allowed_tools
+            ):
+                self.calls.append(
+                    {
+                        "tool": tool_call.tool,
+                        "arguments": tool_call.parameters,
+                        "status": "denied",
+                    }
+                )
+                return approved, tool_call
+            approved.append(tool_call)
+
+        return approved, None
+
+    def skip_tool_calls(self, tool_calls: List[ToolCall]) -> List[Message]:
+        """Answer calls that will not be run with an error, so that none is
+        left without a result in the history.
+        """
+        error = ToolRoundLimitReached(
+            f"Not run, since the turn reached its limit of {MAX_TOOL_ROUNDS} "
+            "rounds of tool calls."
+        )
+        for tool_call in tool_calls:
+            self.calls.append(
+                {
+                    "tool": tool_call.tool,
+                    "arguments": tool_call.parameters,
+                    "status": "skipped",
+                }
+            )
+        return [self._create_error_message(call, error) for call in tool_calls]
+
+    async def _timed_execute(self, model, tool_call: ToolCall) -> ToolOutcome:
+        outcome = await super()._timed_execute(model, tool_call)
+        self.calls.append(
+            {
+                "tool": tool_call.tool,
+                "arguments": tool_call.parameters,
+                "status": "ok" if outcome.error is None else "error",
+                "error": None if outcome.error is None else str(outcome.error),
+                "elapsed": round(outcome.elapsed, 4),
+                "cached": outcome.cached,
+            }
+        )
+        return outcome
+
+
+class BatchRunner:
+    """Replays conversations headlessly, several at a time.
+
+    Each conversation gets its own agent and provider, so histories never mix,
+    while the tool registry, file conversion cache, Ollama hosts and any tool
+    worker processes are shared between them. Each conversation sticks to the
+    host it started on.
+    """
+
+    def __init__(self, interface: ChatInterface, config: Dict[str, Any]):
+        self.interface = interface
+        self.config = config
+        self.allowed_tools = set(config["allowed_tools"] or [])
+        self.tool_registry = ToolRegistry(config["tools"] or [])
+        self.conversion_cache = ConversionCache(config["cache_size"] * 1024 * 1024)
+        self.host_pool = HostPool(config["hosts"])
+        self.worker_pool = (
+            WorkerPool(
+                config["tool_concurrency"],
+                config["tool_timeout"],
+                config["tool_memory"],
+            )
+            if config["isolate_tools"]
+            else None
+        )
+
+    async def run(
+        self, conversations: List[Conversation], output_path: Path
+    ) -> BatchSummary:
+        """Run every conversation, writing each result as soon as it finishes."""
+        summary = BatchSummary()
+        semaphore = asyncio.Semaphore(max(1, self.config["workers"]))
+        started = time.perf_counter()
+
+        async def run(conversation: Conversation) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._run_conversation(conversation)
+
+        try:
+            if self.worker_pool is not None:
+                self.worker_pool.start(self.tool_registry.module_paths())
+
+            with open(output_path, "w", encoding="utf-8") as output:
+                for finished in asyncio.as_completed(
+                    [run(conversation) for conversation in conversations]
+                ):
+                    record = await finished
+                    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    output.flush()
+
+                    summary.conversations += 1
+                    summary.failed += 1 if record["error"] else 0
+                    summary.turns += len(record["turns"])
+                    summary.tool_calls += len(record["tool_calls"])
+                    for turn in record["turns"]:
+                        summary.prompt_tokens += turn["prompt_tokens"]
+                        summary.completion_tokens += turn["completion_tokens"]
+
+                    self.interface.show_batch_result(
+                        record["id"],
+                        summary.conversations,
+                        len(conversations),
+                        record["elapsed"],
+                        record["error"],
+                    )
+        finally:
+            if self.worker_pool is not None:
+                self.worker_pool.close()
+
+        summary.elapsed = time.perf_counter() - started
+        return summary
+
+    async def _run_conversation(self, conversation: Conversation) -> Dict[str, Any]:
+        """Replay one conversation's prompts, returning its result record."""
+        # Each conversation has its own quiet console, since Rich only allows one
+        # live display per console, and tool progress is shown with one.
+        interface = ChatInterface(Console(quiet=True), Theme())
+        tool_manager = BatchToolManager(
+            interface,
+            self.allowed_tools,
+            self.config["tool_concurrency"],
+            self.worker_pool,
+        )
+        record = {
+            "id": conversation.id,
+            "error": None,
+            "turns": [],
+            "tool_calls": tool_manager.calls,
+            "transcript": [],
+            "elapsed": 0.0,
+        }
+
+        started = time.perf_counter()
+        agent = None
+        try:
+            agent = Agent(
+                provider=Provider(
+                    self.config["model"],
+                    self.host_pool,
+                    options=self.config["options"],
+                    max_context=self.config["max_context"],
+                ),
+                prompt=conversation.system or self.config["prompt"],
+                conversion_cache=self.conversion_cache,
+                history_manager=HistoryManager(self.config["context_budget"]),
+                tool_registry=self.tool_registry,
+                tool_router=(
+                    ToolRouter(self.config["route_tools"], self.config["pinned_tools"])
+                    if self.config["route_tools"]
+                    else None
+                ),
+            )
+            for prompt in conversation.prompts:
+                record["turns"].append(
+                    await self._run_turn(agent, tool_manager, prompt)
+                )
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+
+        record["elapsed"] = round(time.perf_counter() - started, 4)
+        if agent is not None:
+            record["transcript"] = [_serialize(message) for message in agent.history]
+            agent.file_manager.close()
+        return record
+
+    async def _run_turn(
+        self, agent: Agent, tool_manager: BatchToolManager, prompt: str
+    ) -> Dict[str, Any]:
+        """Send one prompt and run tool calls until the model stops making them."""
+        turn = {
+            "prompt": prompt,
+            "response": "",
+            "tool_rounds": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "tool_tokens_saved": 0,
+            "first_token": None,
+            "elapsed": 0.0,
+        }
+
+        started = time.perf_counter()
+        stream = agent.stream_response(prompt)
+        while True:
+            response, tool_calls = "", []
+            async for part in stream:
+                if turn["first_token"] is None:
+                    turn["first_token"] = round(time.perf_counter() - started, 4)
+                if part.kind == "text":
+                    response += part.data
+                elif part.kind == "tool_call":
+                    tool_calls.append(part.data)
+
+            if stats := agent.model_provider.last_stats:
+                turn["prompt_tokens"] += stats.prompt_tokens
+                turn["completion_tokens"] += stats.completion_tokens
+            router = agent.tool_router
+            if router is not None and router.last_route is not None:
+                turn["tool_tokens_saved"] += router.last_route.tokens_saved
+            turn["response"] = response
+
+            if not tool_calls:
+                break
+            if turn["tool_rounds"] >= MAX_TOOL_ROUNDS:
+                agent.history.extend(tool_manager.skip_tool_calls(tool_calls))
+                break
+
+            tool_results = await tool_manager.process_tool_calls(agent, tool_calls)
+            agent.history.extend(tool_results)
+            turn["tool_rounds"] += 1
+            stream = agent.stream_response(prompt=None)
+
+        turn["elapsed"] = round(time.perf_counter() - started, 4)
+        return turn
+
+
+def _serialize(message: Message) -> Dict[str, Any]:
+    """Turn a message into JSON for the transcript."""
+    serialized = {"role": message.role, "content": ""}
+    for part in message.parts:
+        if part.kind == "text":
+            serialized["content"] += part.data
+        elif part.kind == "tool_call":
+            serialized.setdefault("tool_calls", []).append(
+                {"tool": part.data.tool, "arguments": part.data.parameters}
+            )
+        elif part.kind == "file":
+            serialized.setdefault("files", []).append(part.data.name)
+
+    return serialized
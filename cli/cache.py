@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import hashlib
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+
+def cache_dir(name: str) -> Path:
+    """Return (and create) a named directory under the CLI's cache root."""
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    path = Path(root) / "offline-function-calling" / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def write_atomic(path: Path, data: str):
+    """Write a file so that readers never see it half-written."""
+    temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp.write_text(data, encoding="utf-8")
+    os.replace(temp, path)
+
+
+class ConversionCache:
+    """An on-disk, size-capped LRU cache of converted document text.
+
+    Entries are stored by the SHA-256 of the source file's contents. A small
+    index maps (path, size, mtime) to that hash, so an unchanged file does not
+    need to be re-read to find its entry.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, directory: Path = None):
+        self.max_bytes = max_bytes
+        self.directory = directory or cache_dir("conversions")
+        self.hits = 0
+        self.misses = 0
+
+        self._index_path = self.directory / "index.json"
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+
+    def key(self, path: str) -> str:
+        """Return the content hash that identifies the given file."""
+        stat = os.stat(path)
+        cached = self._index.get(path)
+        if (
+            cached
+            and cached["size"] == stat.st_size
+            and cached["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return cached["sha256"]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+
+        self._index[path] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest.hexdigest(),
+        }
+        write_atomic(self._index_path, json.dumps(self._index))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached text for a key, marking it as recently used."""
+        entry = self._entry_path(key)
+        try:
+            text = entry.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        os.utime(entry)
+        self.hits += 1
+        return text
+
+    def put(self, key: str, text: str):
+        """Store converted text, evicting the least recently used entries."""
+        write_atomic(self._entry_path(key), text)
+        self._evict()
+
+    def clear(self) -> int:
+        """Remove every entry, returning how many were removed."""
+        entries = list(self.directory.glob("*.md"))
+        for entry in entries:
+            entry.unlink(missing_ok=True)
+
+        self._index = {}
+        self._index_path.unlink(missing_ok=True)
+        return len(entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the size of the cache and its hit rate for this session."""
+        entries = list(self.directory.glob("*.md"))
+        return {
+            "entries": len(entries),
+            "size_bytes": sum(entry.stat().st_size for entry in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "directory": str(self.directory),
+        }
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.md"
+
+    def _evict(self):
+        """Drop the least recently used entries until the cache fits its cap, and
+        the index entries of the files they were converted from.
+        """
+        entries = [(entry, entry.stat()) for entry in self.directory.glob("*.md")]
+        total = sum(stat.st_size for _, stat in entries)
+
+        evicted = set()
+        for entry, stat in sorted(entries, key=lambda item: item[1].st_mtime):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            evicted.add(entry.stem)
+            total -= stat.st_size
+
+        if evicted:
+            self._index = {
+                path: cached
+                for path, cached in self._index.items()
+                if cached["sha256"] not in evicted
+            }
+            write_atomic(self._index_path, json.dumps(self._index))
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return json.loads(self._index_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+
+class ResultCache:
+    """An in-memory LRU cache of tool results, each kept for its tool's TTL."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+
+    def key(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Return a key for a call that does not depend on argument order."""
+        canonical = json.dumps(arguments, sort_keys=True, separators=(",", ":"))
+        return f"{tool_name}:{canonical}"
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return whether the key has a live entry, and its result, marking it
+        as recently used.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+
+        expires, result = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, result
+
+    def put(self, key: str, result: Any, ttl: float):
+        """Store a result, evicting the least recently used entries."""
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,19 +1,24 @@
 from typing import Dict, Callable
 
 from .interface import ChatInterface
+from .metrics import MetricsRecorder
 
 
 class CommandHandler:
     """Handles messages that are directed to the CLI as commands."""
 
-    def __init__(self, interface: ChatInterface):
+    def __init__(self, interface: ChatInterface, metrics: MetricsRecorder):
         self.interface = interface
+        self.metrics = metrics
         self.commands: Dict[str, Callable] = {
             "/exit": self._exit_command,
             "/quit": self._exit_command,
             "/help": self._help_command,
             "/clear": self._clear_command,
             "/tools": self._tools_command,
+            "/cache": self._cache_command,
+            "/context": self._context_command,
+            "/stats": self._stats_command,
         }
 
     async def handle_command(self, prompt: str, agent) -> bool:
@@ -61,8 +66,41 @@ class CommandHandler:
             self.interface.show_tools_list(tools)
 
         elif subcommand == "reload":
-            count = agent.tool_manager.reload_tools()
-            self.interface.show_tools_reloaded(count)
+            changes = agent.tool_manager.refresh()
+            self.interface.show_tools_reloaded(len(agent.tool_manager.tools), changes)
 
         else:
             self.interface.show_error(f"Unknown tools subcommand: {subcommand}")
+
+    async def _cache_command(self, agent, args):
+        """Handle file conversion cache subcommands."""
+        subcommand = args[0] if args else "stats"
+        cache = agent.file_manager.cache
+
+        if subcommand == "stats":
+            self.interface.show_cache_stats(cache.stats())
+
+        elif subcommand == "clear":
+            count = cache.clear()
+            self.interface.show_success(f"Removed {count} cached conversions.")
+
+        else:
+            self.interface.show_error(f"Unknown cache subcommand: {subcommand}")
+
+    async def _context_command(self, agent, args):
+        """Show how much of the context budget the history is using."""
+        manager = agent.history_manager
+        self.interface.show_context(
+            manager.usage(agent.history),
+            manager.budget,
+            len(agent.history),
+            manager.compactions,
+        )
+
+    async def _stats_command(self, agent, args):
+        """Show where the time of the last turn and of the session went."""
+        if not self.metrics.turns:
+            self.interface.show_warning("No turns have been completed yet.")
+            return
+
+        self.interface.show_stats(self.metrics.turns[-1], self.metrics.totals())
@@ -0,0 +1,50 @@
+import os
+import tomllib
+
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class ConfigError(Exception):
+    pass
+
+
+def config_path() -> Path:
+    """Return the path of the CLI's config file, which need not exist."""
+    root = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return Path(root) / "offline-function-calling" / "config.toml"
+
+
+def load_config(path: Optional[Path] = None) -> Dict[str, Any]:
+    """Read the config file, returning an empty config if there is none.
+
+    The file may set `max_context`, and an `[options]` table of Ollama model
+    options (such as num_batch, num_thread and num_predict) for every request:
+
+        max_context = 32768
+
+        [options]
+        num_batch = 512
+        num_thread = 8
+    """
+    path = path or config_path()
+    try:
+        with open(path, "rb") as f:
+            config = tomllib.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise ConfigError(f"Could not read config file '{path}': {e}")
+
+    if not isinstance(config.get("options", {}), dict):
+        raise ConfigError(f"'options' in '{path}' must be a table.")
+    return config
+
+
+def model_options(config: Dict[str, Any], **overrides) -> Dict[str, Any]:
+    """Merge the config file's model options with those given as flags."""
+    options = dict(config.get("options", {}))
+    options.update(
+        {name: value for name, value in overrides.items() if value is not None}
+    )
+    return options
@@ -1,10 +1,119 @@
 import re
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from mimetypes import guess_file_type
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
+from sdk.types import File
+
+from .cache import ConversionCache
 from .interface import ChatInterface
 
 
+_converter = None
+
+
+def _get_converter():
+    """Return this process's document converter, creating it on first use.
+
+    markitdown loads converters for every file format it supports when it is
+    imported, so it is only imported once a file needs converting.
+    """
+    global _converter
+    if _converter is None:
+        from markitdown import MarkItDown
+
+        _converter = MarkItDown()
+
+    return _converter
+
+
+def _convert(path: str) -> str:
+    """Convert a document to text, in this process or a conversion worker."""
+    return _get_converter().convert(path).text_content
+
+
+def _pool_context():
+    """Start conversion workers from a clean process rather than by forking the
+    CLI, whose event loop and threads a fork would copy mid-flight.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+class FileManager:
+    """Converts attached files to text, caching conversions on disk."""
+
+    def __init__(self, cache: ConversionCache):
+        self.cache = cache
+        self.conversion_time = 0.0
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def process_files(self, paths: List[str]) -> List[File]:
+        """Convert the given files, running cache misses concurrently and off the
+        event loop, so the interface stays responsive while they convert.
+        """
+        started = time.perf_counter()
+        files, misses = {}, {}
+        for path in paths:
+            file, key = self._lookup(Path(path))
+            if file is None:
+                misses[path] = key
+            else:
+                files[path] = file
+
+        if len(misses) == 1:
+            path, key = next(iter(misses.items()))
+            text = await asyncio.to_thread(_convert, path)
+            files[path] = self._store(Path(path), key, text)
+        elif misses:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(mp_context=_pool_context())
+            loop = asyncio.get_running_loop()
+            converted = await asyncio.gather(
+                *(loop.run_in_executor(self._pool, _convert, path) for path in misses)
+            )
+            for (path, key), text in zip(misses.items(), converted):
+                files[path] = self._store(Path(path), key, text)
+
+        self.conversion_time += time.perf_counter() - started
+        return [files[path] for path in paths]
+
+    def close(self):
+        """Stop the conversion workers, if any were started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _lookup(self, path: Path) -> Tuple[Optional[File], Optional[str]]:
+        """Return the file if it needs no conversion or is cached, else its key."""
+        mime = self._mime(path)
+        if mime.startswith("image/"):
+            return self._file(path, mime, path.read_bytes()), None
+
+        key = self.cache.key(str(path))
+        text = self.cache.get(key)
+        if text is None:
+            return None, key
+
+        return self._file(path, mime, text), key
+
+    def _store(self, path: Path, key: str, text: str) -> File:
+        self.cache.put(key, text)
+        return self._file(path, self._mime(path), text)
+
+    def _mime(self, path: Path) -> str:
+        mime, _ = guess_file_type(path)
+        return mime or "application/octet-stream"
+
+    def _file(self, path: Path, mime: str, contents) -> File:
+        return File(name=path.stem, uri=path.as_uri(), mime=mime, contents=contents)
+
+
 class FileHandler:
     """Handles file path detection and validation from user input."""
 
@@ -15,21 +124,36 @@ class FileHandler:
         path_chars = r"[\w\-. \/\\\\]"
 
         self.patterns = [
-            re.compile(r"file://(" + path_chars + r"*" + ext_pattern + r")", re.IGNORECASE),
-            re.compile(r"\b([A-Za-z]:[\\/]" + path_chars + r"*" + ext_pattern + r")", re.IGNORECASE),
+            re.compile(
+                r"file://(" + path_chars + r"*" + ext_pattern + r")", re.IGNORECASE
+            ),
+            re.compile(
+                r"\b([A-Za-z]:[\\/]" + path_chars + r"*" + ext_pattern + r")",
+                re.IGNORECASE,
+            ),
             re.compile(r"(?<![\w/\\:])(/" + path_chars + r"*" + ext_pattern + r")"),
-            re.compile(r"\b((?:~|(?:\.\.?))[\\/]" + path_chars + r"*" + ext_pattern + r")"),
-            re.compile(r"""
+            re.compile(
+                r"\b((?:~|(?:\.\.?))[\\/]" + path_chars + r"*" + ext_pattern + r")"
+            ),
+            re.compile(
+                r"""
                 (['"])
                 (
                     (?:(?!\1).)*?
                     [/\\]
                     (?:(?!\1).)*?
-                    """ + ext_pattern + r"""
+                    """
+                + ext_pattern
+                + r"""
                 )
                 \1
-            """, re.VERBOSE),
-            re.compile(r"\b([\w\-.]+\.(?:pdf|docx|xlsx|txt|csv|json|xml|log|py|js|html|css|zip|tar|gz|jpg|jpeg|png|gif|mp4|mov))\b", re.IGNORECASE)
+            """,
+                re.VERBOSE,
+            ),
+            re.compile(
+                r"\b([\w\-.]+\.(?:pdf|docx|xlsx|txt|csv|json|xml|log|py|js|html|css|zip|tar|gz|jpg|jpeg|png|gif|mp4|mov))\b",
+                re.IGNORECASE,
+            ),
         ]
 
     def extract_files(self, prompt: str) -> Tuple[str, List[str]]:
@@ -50,16 +174,17 @@ class FileHandler:
 
                 if self._is_like_file_path(path_str):
                     cleaned_prompt = (
-                        cleaned_prompt[: match.start()]
-                        + cleaned_prompt[match.end() :]
+                        cleaned_prompt[: match.start()] + cleaned_prompt[match.end() :]
                     )
-                    
+
                     try:
                         expanded_path = Path(path_str).expanduser().resolve()
                     except (RuntimeError, ValueError):
-                        self.interface.show_warning(f"Could not resolve path: {path_str}")
+                        self.interface.show_warning(
+                            f"Could not resolve path: {path_str}"
+                        )
                         continue
-                    
+
                     found_files_set.add(str(expanded_path))
                     if not expanded_path.exists() or not expanded_path.is_file():
                         self.interface.show_warning(f"File not found: {path_str}")
@@ -74,7 +199,7 @@ class FileHandler:
 
         if any(char in path_str for char in ["<", ">", "|", "*", "?", "\n", "\r"]):
             return False
-            
+
         if "://" in path_str and not path_str.lower().startswith("file://"):
             return False
 
@@ -0,0 +1,204 @@
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from sdk.types import Message, Part
+
+
+# A rough, model-agnostic estimate: most tokenizers average about four
+# characters of English text per token.
+CHARS_PER_TOKEN = 4
+
+# Gemma 3 encodes every image as a fixed number of tokens.
+IMAGE_TOKENS = 256
+
+# The share of the budget that compaction frees the history down to, so the
+# next few messages fit without compacting again. Compacting changes an older
+# part of the prompt, which Ollama then has to evaluate again from there.
+LOW_WATERMARK = 0.75
+
+
+@dataclass
+class Compaction:
+    """A record of a message part that was replaced to save context."""
+
+    position: int
+    role: str
+    description: str
+    tokens_saved: int
+
+
+class HistoryManager:
+    """Keeps a conversation's history within an approximate token budget.
+
+    When the budget is exceeded, the oldest tool results and attached files are
+    replaced with short stubs. The system prompt and the most recent turns are
+    not compacted, except that tool results in those turns are cut short if
+    they still do not fit, so that no single result can exceed the budget.
+    """
+
+    def __init__(self, budget: int = 24000, keep_turns: int = 2):
+        self.budget = budget
+        self.keep_turns = keep_turns
+        self.compactions: List[Compaction] = []
+        self._counts: Dict[int, Tuple[Message, int]] = {}
+
+    def count_tokens(self, message: Message) -> int:
+        """Return the approximate number of tokens in a message."""
+        cached = self._counts.get(id(message))
+        if cached is not None and cached[0] is message:
+            return cached[1]
+
+        tokens = sum(self._count_part(part) for part in message.parts)
+        self._counts[id(message)] = (message, tokens)
+        return tokens
+
+    def usage(self, history: List[Message]) -> int:
+        """Return the approximate number of tokens in the whole history."""
+        self._counts = {
+            id(message): self._counts[id(message)]
+            for message in history
+            if id(message) in self._counts
+        }
+        return sum(self.count_tokens(message) for message in history)
+
+    def compact(self, history: List[Message]) -> int:
+        """Compact the oldest messages once the history exceeds the budget,
+        until it fits within the low watermark.
+
+        Compacted messages are replaced with new `Message` objects rather than
+        modified, so anything derived from the old ones stays consistent.
+        Returns the number of tokens saved.
+        """
+        usage = self.usage(history)
+        if usage <= self.budget:
+            return 0
+
+        excess = usage - int(self.budget * LOW_WATERMARK)
+        saved = 0
+
+        first = self._first_compactable(history)
+        last = max(first, self._last_compactable(history))
+        for position in range(first, last):
+            if saved >= excess:
+                break
+
+            message = history[position]
+            parts = []
+            for part in message.parts:
+                stub, description = self._stub(message, part)
+                if stub is None:
+                    parts.append(part)
+                    continue
+
+                tokens_saved = self._count_part(part) - self._count_part(stub)
+                if tokens_saved <= 0:
+                    parts.append(part)
+                    continue
+
+                parts.append(stub)
+                saved += tokens_saved
+                self.compactions.append(
+                    Compaction(position, message.role, description, tokens_saved)
+                )
+
+            if parts != message.parts:
+                history[position] = Message(role=message.role, parts=parts)
+
+        for position in range(last, len(history)):
+            if saved >= excess:
+                break
+
+            message = history[position]
+            if message.role != "tool":
+                continue
+
+            parts = []
+            for part in message.parts:
+                if part.kind != "text" or saved >= excess:
+                    parts.append(part)
+                    continue
+
+                truncated = self._truncate(part, excess - saved)
+                tokens_saved = self._count_part(part) - self._count_part(truncated)
+                if tokens_saved <= 0:
+                    parts.append(part)
+                    continue
+
+                parts.append(truncated)
+                saved += tokens_saved
+                description = f"Part of result of {self._tool_name(message)}"
+                self.compactions.append(
+                    Compaction(position, message.role, description, tokens_saved)
+                )
+
+            if parts != message.parts:
+                history[position] = Message(role=message.role, parts=parts)
+
+        return saved
+
+    def clear(self):
+        """Forget everything that was compacted, e.g. when history is cleared."""
+        self.compactions.clear()
+        self._counts.clear()
+
+    def _first_compactable(self, history: List[Message]) -> int:
+        return 1 if history and history[0].role == "system" else 0
+
+    def _last_compactable(self, history: List[Message]) -> int:
+        """Return the position where the turns that must be kept start."""
+        turns = 0
+        for position in range(len(history) - 1, -1, -1):
+            if history[position].role == "user":
+                turns += 1
+                if turns >= self.keep_turns:
+                    return position
+        return 0
+
+    def _stub(self, message: Message, part: Part):
+        """Return a compact replacement for a part, if it can be compacted."""
+        if message.role == "tool" and part.kind == "text":
+            description = f"Result of {self._tool_name(message)}"
+            text = (
+                "```tool_result\n"
+                f'{{"compacted": "{description} omitted to save context."}}\n'
+                "```"
+            )
+            return Part(kind="text", data=text), description
+
+        if part.kind == "file":
+            description = f"Attached file {part.data.name}"
+            text = f"\n\n[{description} omitted to save context.]"
+            return Part(kind="text", data=text), description
+
+        return None, None
+
+    def _truncate(self, part: Part, tokens: int) -> Part:
+        """Cut the end off a tool result, to save about the given tokens."""
+        text = part.data
+        # The note takes room too, so at least that much more is cut.
+        longest_note = len(_omitted_note(len(text)))
+        keep = max(len(text) - tokens * CHARS_PER_TOKEN - longest_note, 0)
+        return Part(kind="text", data=text[:keep] + _omitted_note(len(text) - keep))
+
+    def _tool_name(self, message: Message) -> str:
+        return next(
+            (part.data.tool for part in message.parts if part.kind == "tool_call"),
+            "tool",
+        )
+
+    def _count_part(self, part: Part) -> int:
+        if part.kind == "text":
+            return len(part.data) // CHARS_PER_TOKEN
+        if part.kind == "file":
+            if part.data.mime.startswith("image/"):
+                return IMAGE_TOKENS
+            # The provider sends only a header naming other files.
+            header = f"\n\n{'=' * 13}\nFile: {part.data.name}\n{'=' * 13}\n"
+            return len(header) // CHARS_PER_TOKEN
+        if part.kind == "tool_call":
+            return len(str(part.data.parameters)) // CHARS_PER_TOKEN
+        return 0
+
+
+def _omitted_note(characters: int) -> str:
+    return f"\n... [{characters} characters omitted to save context]\n```"
@@ -0,0 +1,100 @@
+import time
+import asyncio
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import httpx
+
+from ollama import AsyncClient, ResponseError
+
+
+# Seconds before a host that failed is tried again.
+RETRY_INTERVAL = 30.0
+
+# Seconds to wait for a host to answer a health check.
+HEALTH_CHECK_TIMEOUT = 5.0
+
+# How much each new time-to-first-token sample moves a host's average.
+LATENCY_SMOOTHING = 0.3
+
+# Errors that mean a host could not serve a request, so another should be tried.
+HOST_ERRORS = (ConnectionError, ResponseError, httpx.HTTPError, OSError)
+
+
+@dataclass
+class Host:
+    """An Ollama server, and what is known about its load and health."""
+
+    url: str
+    client: AsyncClient = field(repr=False)
+    outstanding: int = 0
+    latency: Optional[float] = None
+    failed_at: Optional[float] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.failed_at is None
+
+    @property
+    def retryable(self) -> bool:
+        return self.healthy or time.monotonic() - self.failed_at >= RETRY_INTERVAL
+
+
+class HostPool:
+    """Picks the Ollama host for each request, from one or more servers.
+
+    Hosts are ranked by how many requests they have in flight, then by their
+    average time to first token. A host that fails is skipped until it passes
+    a health check, or until it is due to be retried.
+    """
+
+    def __init__(self, urls: List[str]):
+        if not urls:
+            raise ValueError("At least one Ollama host is required.")
+        self.hosts = [Host(url, AsyncClient(url)) for url in dict.fromkeys(urls)]
+
+    def candidates(self, preferred: Optional[Host] = None) -> List[Host]:
+        """Return the hosts to try for a request, best first.
+
+        The preferred host comes first while it is healthy, so a conversation
+        keeps reusing the KV cache of the host it started on. If every host has
+        failed recently, they are all tried anyway, least recently failed first.
+        """
+        healthy = sorted(
+            (host for host in self.hosts if host.healthy),
+            key=lambda host: (host.outstanding, host.latency or 0.0),
+        )
+        if preferred is not None and preferred.healthy:
+            healthy.remove(preferred)
+            healthy.insert(0, preferred)
+
+        failed = sorted(
+            (host for host in self.hosts if not host.healthy),
+            key=lambda host: host.failed_at,
+        )
+        retryable = [host for host in failed if host.retryable]
+        return healthy + retryable or failed
+
+    def mark_failed(self, host: Host):
+        host.failed_at = time.monotonic()
+
+    def record_latency(self, host: Host, latency: float):
+        """Mark a host healthy again, and fold a sample into its average latency."""
+        host.failed_at = None
+        if host.latency is None:
+            host.latency = latency
+        else:
+            host.latency += LATENCY_SMOOTHING * (latency - host.latency)
+
+    async def check(self, model: str):
+        """Check every host concurrently, by asking it to describe the model."""
+
+        async def check_host(host: Host):
+            try:
+                await asyncio.wait_for(host.client.show(model), HEALTH_CHECK_TIMEOUT)
+                host.failed_at = None
+            except (asyncio.TimeoutError, *HOST_ERRORS):
+                self.mark_failed(host)
+
+        await asyncio.gather(*(check_host(host) for host in self.hosts))
@@ -1,32 +1,79 @@
+import os
 import sys
+import time
+import codecs
 import asyncio
 
-from typing import Dict, Any
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 
-from rich.console import Console, Group
+from rich.console import Console, ConsoleOptions, Group, RenderResult
 from rich.markdown import Markdown
 from rich.table import Table
 from rich.panel import Panel
+from rich.padding import Padding
 from rich.live import Live
 from rich.text import Text
+from rich.traceback import Traceback
 from rich.prompt import Confirm
+from rich.segment import Segment
 
 from sdk.types import Model
 
 from .theme import Theme
+from .registry import ToolChanges
+from .history import Compaction
+from .provider import PrefixMatch, Residency
+from .metrics import TurnMetrics
+from .stream import MarkdownStream
+
+if TYPE_CHECKING:
+    from .batch import BatchSummary
+
+
+class _PanelRows:
+    """Renders a Panel with or without its top and bottom borders, so that a
+    Panel printed in several parts lines up as one.
+    """
+
+    def __init__(self, panel: Panel, top: bool, bottom: bool):
+        self.panel = panel
+        self.top = top
+        self.bottom = bottom
+
+    def __rich_console__(
+        self, console: Console, options: ConsoleOptions
+    ) -> RenderResult:
+        lines = console.render_lines(self.panel, options)
+        end = len(lines) if self.bottom else len(lines) - 1
+        for line in lines[0 if self.top else 1 : end]:
+            yield from line
+            yield Segment.line()
 
 
 class ChatInterface:
     """Elegant chat interface with rich visual components."""
 
-    def __init__(self, console: Console, theme: Theme):
+    def __init__(self, console: Console, theme: Theme, frame_rate: float = 15.0):
         self.console = console
         self.theme = theme
+        self.frame_rate = frame_rate
         self._live_panel = None
+        self._markdown_stream = None
+        self._last_refresh = 0.0
         self._full_response = ""
         self._current_tool_display = None
-
-    def show_header(self, model_info: Model, tool_count: int, prompt_loaded: bool):
+        self._tool_status = None
+        self._last_output_refresh = 0.0
+
+    def show_header(
+        self,
+        model_info: Model,
+        tool_count: int,
+        prompt_loaded: bool,
+        residency: Optional[Residency] = None,
+        warming_up: bool = False,
+    ):
         """Display an elegant header with model and session information."""
         self._clear_screen()
 
@@ -51,6 +98,14 @@ class ChatInterface:
         session_text.append(
             f"\n{'Custom' if prompt_loaded else 'Default'} prompt", style=self.theme.dim
         )
+        if residency is not None and residency.loaded:
+            session_text.append(
+                f"\nLoaded, {residency.vram_ratio:.0%} in VRAM", style=self.theme.dim
+            )
+        elif warming_up:
+            session_text.append("\nLoading in the background", style=self.theme.dim)
+        elif residency is not None:
+            session_text.append("\nNot loaded", style=self.theme.dim)
 
         info_table = Table.grid(expand=True)
         info_table.add_column(justify="left")
@@ -67,8 +122,12 @@ class ChatInterface:
 
         self.console.print(header_panel)
 
-    def get_user_input(self) -> str:
-        """Get multiline user input with elegant prompting."""
+    async def get_user_input(self) -> str:
+        """Get multiline user input with elegant prompting.
+
+        Input is read without blocking the event loop, so background work such
+        as warming up the model carries on while the user types.
+        """
         self.console.rule(characters="─", style=self.theme.border)
 
         user_prompt = Text()
@@ -77,45 +136,105 @@ class ChatInterface:
 
         self.console.print(user_prompt)
 
+        if sys.stdin.isatty():
+            try:
+                return (await self._read_terminal()).strip()
+            except NotImplementedError:
+                pass  # the event loop cannot watch stdin, e.g. on Windows
+
+        text = await asyncio.to_thread(sys.stdin.read)
+        if not text and not sys.stdin.isatty():
+            raise EOFError
+        return text.strip()
+
+    async def _read_terminal(self) -> str:
+        """Read from the terminal until Ctrl+D, waking only when input arrives.
+
+        The terminal stays in canonical mode, so it still handles line editing,
+        and each read returns a line. A read of nothing means Ctrl+D was pressed
+        at the start of a line.
+        """
+        loop = asyncio.get_running_loop()
+        fd = sys.stdin.fileno()
+        decoder = codecs.getincrementaldecoder(sys.stdin.encoding or "utf-8")(
+            errors="replace"
+        )
+        chunks = []
+        submitted = loop.create_future()
+
+        def on_readable():
+            data = os.read(fd, 4096)
+            if data:
+                chunks.append(decoder.decode(data))
+            elif not submitted.done():
+                submitted.set_result(None)
+
+        loop.add_reader(fd, on_readable)
         try:
-            lines = []
-            for line in sys.stdin:
-                lines.append(line)
-            return "".join(lines).strip()
-        except EOFError:
-            return "".join(lines).strip() if lines else ""
+            await submitted
+        finally:
+            loop.remove_reader(fd)
+
+        chunks.append(decoder.decode(b"", final=True))
+        return "".join(chunks)
 
     def start_stream(self) -> None:
         """Initializes and starts a Live display for streaming."""
         self._full_response = ""
+        self._markdown_stream = MarkdownStream()
+        self._blocks_printed = False
+        self._last_refresh = 0.0
         self._live_panel = Live(console=self.console, auto_refresh=False)
         self._live_panel.start()
 
     def update_stream(self, chunk: str) -> None:
-        """Updates the Live display with a new chunk of text."""
+        """Updates the Live display with a new chunk of text.
+
+        Completed Markdown blocks are printed once above the Live display, so
+        only the block that is still open gets re-rendered, and at most
+        `frame_rate` times a second.
+        """
         if self._live_panel is None:
             self.start_stream()
 
         self._full_response += chunk
-        content = Markdown(self._full_response + " ▋", style=self.theme.assistant)
-        panel = Panel(content, border_style=self.theme.border)
-        self._live_panel.update(panel, refresh=True)
+        completed = self._markdown_stream.feed(chunk)
+        for block in completed:
+            self._live_panel.console.print(self._render_block(block, last=False))
+            self._blocks_printed = True
+
+        now = time.monotonic()
+        if completed or now - self._last_refresh >= 1 / self.frame_rate:
+            tail = self._render_block(self._markdown_stream.tail + " ▋")
+            self._live_panel.update(tail, refresh=True)
+            self._last_refresh = now
 
     def stop_stream(self) -> None:
         """Finalizes and stops the Live display."""
         if self._live_panel:
-            final_content = Markdown(self._full_response, style=self.theme.assistant)
-            final_panel = Panel(final_content, border_style=self.theme.border)
-            self._live_panel.update(final_panel)
+            tail = self._markdown_stream.flush()
+            self._live_panel.update(self._render_block(tail))
             self._live_panel.stop()
             self._live_panel = None
+            self._markdown_stream = None
 
         self.console.print()
 
-    async def execute_tool_with_consent(
-        self, tool_name: str, arguments: Dict[str, Any], tool_executor: callable
-    ) -> Any:
-        """Execute a single tool with user consent and clean visual feedback."""
+    def _render_block(self, markdown: str, last: bool = True) -> _PanelRows:
+        """Render one Markdown block of the assistant's response as a part of
+        its Panel: the first part has the top border, and the last one the
+        bottom border.
+        """
+        content = Markdown(markdown, style=self.theme.assistant)
+        if not last:
+            content = Padding(content, (0, 0, 1, 0))
+        panel = Panel(content, border_style=self.theme.border)
+        return _PanelRows(panel, top=not self._blocks_printed, bottom=last)
+
+    async def request_tool_consent(
+        self, tool_name: str, arguments: Dict[str, Any]
+    ) -> bool:
+        """Show a tool request and ask the user whether it may be executed."""
         self._show_tool_request(tool_name, arguments)
 
         self.console.print()
@@ -130,9 +249,8 @@ class ChatInterface:
 
         if not consent:
             self._show_tool_denied(tool_name)
-            return None
 
-        return await self._execute_with_progress(tool_name, tool_executor)
+        return consent
 
     def _show_tool_request(self, tool_name: str, arguments: Dict[str, Any]):
         """Display tool request as a message from 'Tools' user."""
@@ -174,32 +292,74 @@ class ChatInterface:
 
         self.console.print(content)
 
-    async def _execute_with_progress(
-        self, tool_name: str, tool_executor: callable
-    ) -> Any:
-        """Execute tool with a clean progress indicator."""
+    @contextmanager
+    def tool_progress(self, tool_names: List[str]):
+        """Show a progress indicator while a batch of tools runs."""
         progress_text = Text()
         progress_text.append("Executing ")
-        progress_text.append(tool_name, style=self.theme.info)
+        if len(tool_names) == 1:
+            progress_text.append(tool_names[0], style=self.theme.info)
+        else:
+            progress_text.append(f"{len(tool_names)} tools", style=self.theme.info)
         progress_text.append("...")
 
         with self.console.status(
             progress_text, spinner="dots", spinner_style=self.theme.spinner
-        ):
+        ) as status:
+            self._tool_status = (status, progress_text)
             try:
-                result = await tool_executor()
-                self._show_tool_success(tool_name, result)
-                return result
-            except Exception as e:
-                self._show_tool_error(tool_name, e)
-                raise
-
-    def _show_tool_success(self, tool_name: str, result: Any):
+                yield status
+            finally:
+                self._tool_status = None
+
+    def show_tool_output(self, tool_name: str, lines: List[str]):
+        """Show the latest output of a running tool below the progress indicator.
+
+        Updates are throttled to the frame rate, so chatty commands do not spend
+        their time redrawing the terminal.
+        """
+        now = time.monotonic()
+        if self._tool_status is None or now - self._last_output_refresh < (
+            1 / self.frame_rate
+        ):
+            return
+        self._last_output_refresh = now
+
+        status, progress_text = self._tool_status
+        # Progress bars redraw a line with carriage returns; show the last draw.
+        lines = [line.rsplit("\r", 1)[-1] for line in lines]
+        output = Text(
+            "\n".join(lines), style=self.theme.dim, no_wrap=True, overflow="ellipsis"
+        )
+        status.update(
+            Group(
+                progress_text,
+                Panel(
+                    output,
+                    title=Text(tool_name, style=self.theme.info),
+                    title_align="left",
+                    border_style=self.theme.border,
+                ),
+            )
+        )
+
+    def show_tool_result(
+        self, tool_name: str, error: Optional[Exception] = None, cached: bool = False
+    ):
+        """Display the outcome of a single tool execution."""
+        if error is None:
+            self._show_tool_success(tool_name, cached)
+        else:
+            self._show_tool_error(tool_name, error)
+
+    def _show_tool_success(self, tool_name: str, cached: bool = False):
         """Display successful tool execution as a message from 'Tools'."""
         success_text = Text()
         success_text.append(
             f"Called {tool_name} successfully", style=self.theme.tool_success
         )
+        if cached:
+            success_text.append(" (cached result)", style=self.theme.dim)
         self.console.print(success_text)
         self.console.print()
 
@@ -221,7 +381,12 @@ class ChatInterface:
         self.console.print()
 
     def show_tools_summary(
-        self, total_tools: int, executed_tools: int, failed_tools: int
+        self,
+        total_tools: int,
+        executed_tools: int,
+        failed_tools: int,
+        timings: List[Tuple[str, float]],
+        wall_time: float,
     ):
         """Show a summary after tool execution batch."""
         if total_tools <= 1:
@@ -236,8 +401,15 @@ class ChatInterface:
         if failed_tools > 0:
             summary_text.append(f", {failed_tools} failed", style=self.theme.error)
 
+        summary_text.append(f" in {wall_time:.2f}s", style=self.theme.dim)
+
+        timings_text = Text()
+        for tool_name, elapsed in timings:
+            timings_text.append(f"\n • {tool_name}: ", style=self.theme.argument)
+            timings_text.append(f"{elapsed:.2f}s", style=self.theme.dim)
+
         self.console.rule(style=self.theme.border)
-        self.console.print(summary_text)
+        self.console.print(summary_text, timings_text, sep="")
         self.console.rule(style=self.theme.border)
         self.console.print()
 
@@ -265,10 +437,222 @@ class ChatInterface:
             self.console.print(Text(doc, style=self.theme.dim))
             self.console.print()
 
-    def show_tools_reloaded(self, count: int):
+    def show_tools_reloaded(self, count: int, changes: ToolChanges):
+        """Display which tools a reload added, changed and removed."""
         self.console.print()
         self.console.print(Text("Tools", style=self.theme.subtitle))
-        self.console.print(Text(f"Reloaded {count} tools", style=self.theme.info))
+        self.console.print(
+            Text(
+                f"Reloaded {count} tools in {changes.elapsed * 1000:.0f}ms",
+                style=self.theme.info,
+            )
+        )
+        self._show_tool_changes(changes)
+        self.console.print()
+
+    def show_tools_changed(self, changes: ToolChanges):
+        """Display tool changes that were picked up automatically."""
+        self.console.print(
+            Text("Tool directories changed on disk:", style=self.theme.system)
+        )
+        self._show_tool_changes(changes)
+        self.console.print()
+
+    def _show_tool_changes(self, changes: ToolChanges):
+        for marker, names, style in [
+            ("+", changes.added, self.theme.tool_success),
+            ("~", changes.changed, self.theme.tool_pending),
+            ("-", changes.removed, self.theme.tool_error),
+        ]:
+            for name in names:
+                change_text = Text()
+                change_text.append(f" {marker} ", style=style)
+                change_text.append(name, style=self.theme.dim)
+                self.console.print(change_text)
+
+    def show_cache_stats(self, stats: Dict[str, Any]):
+        """Display the size and hit rate of the file conversion cache."""
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "N/A"
+
+        stats_table = Table(show_header=False, pad_edge=False, box=None)
+        stats_table.add_column("Stat", style=self.theme.command, width=20)
+        stats_table.add_column("Value", style=self.theme.info)
+        stats_table.add_row("Entries", str(stats["entries"]))
+        size_mb = stats["size_bytes"] / 1024**2
+        max_mb = stats["max_bytes"] / 1024**2
+        stats_table.add_row("Size", f"{size_mb:.1f} / {max_mb:.0f} MB")
+        stats_table.add_row("Hits", f"{stats['hits']} ({hit_rate})")
+        stats_table.add_row("Misses", str(stats["misses"]))
+        stats_table.add_row("Location", stats["directory"])
+
+        self.console.print()
+        self.console.print(Text("Conversion Cache", style=self.theme.subtitle))
+        self.console.print(stats_table)
+        self.console.print()
+
+    def show_context(
+        self,
+        usage: int,
+        budget: int,
+        message_count: int,
+        compactions: List[Compaction],
+    ):
+        """Display context usage and the parts of history that were compacted."""
+        usage_text = Text()
+        usage_text.append(f"~{usage:,}", style=self.theme.highlight)
+        usage_text.append(f" / {budget:,} tokens", style=self.theme.info)
+        usage_text.append(
+            f" ({usage / budget:.0%}) across {message_count} messages",
+            style=self.theme.dim,
+        )
+
+        self.console.print()
+        self.console.print(Text("Context", style=self.theme.subtitle))
+        self.console.print(usage_text)
+
+        if compactions:
+            self.console.print()
+            compacted_table = Table(show_header=False, pad_edge=False, box=None)
+            compacted_table.add_column("Message", style=self.theme.command, width=20)
+            compacted_table.add_column("Compacted", style=self.theme.info)
+            for compaction in compactions:
+                compacted_table.add_row(
+                    f"#{compaction.position} {compaction.role}",
+                    f"{compaction.description} (~{compaction.tokens_saved:,} tokens)",
+                )
+            self.console.print(Text("Compacted", style=self.theme.subtitle))
+            self.console.print(compacted_table)
+
+        self.console.print()
+
+    def show_prefix_match(self, match: PrefixMatch):
+        """Display how much of the last request's prefix could be reused."""
+        if match is None:
+            return
+
+        match_text = Text()
+        match_text.append("Prompt prefix: ", style=self.theme.system)
+        match_text.append(
+            f"{match.matched_bytes:,} / {match.total_bytes:,} bytes reused",
+            style=self.theme.dim,
+        )
+        match_text.append(f" ({match.ratio:.1%})", style=self.theme.system)
+        self.console.print(match_text)
+
+    def show_stats(self, last: TurnMetrics, totals: TurnMetrics):
+        """Display the time and token breakdown of the last turn and the session."""
+        stats_table = Table(pad_edge=False, box=None)
+        stats_table.add_column("", style=self.theme.command, width=20)
+        stats_table.add_column("Last turn", style=self.theme.info, justify="right")
+        stats_table.add_column(
+            f"Session ({totals.turn} turns)", style=self.theme.dim, justify="right"
+        )
+
+        def seconds(value: Optional[float]) -> str:
+            return "N/A" if value is None else f"{value:.2f}s"
+
+        def tokens(count: int, elapsed: float, rate: float) -> str:
+            return f"{count:,} in {elapsed:.2f}s ({rate:.1f}/s)"
+
+        stats_table.add_row("Total", seconds(last.total), seconds(totals.total))
+        stats_table.add_row("First token", seconds(last.first_token), "")
+        stats_table.add_row(
+            "Prompt eval",
+            tokens(
+                last.prompt_tokens, last.prompt_seconds, last.prompt_tokens_per_second
+            ),
+            tokens(
+                totals.prompt_tokens,
+                totals.prompt_seconds,
+                totals.prompt_tokens_per_second,
+            ),
+        )
+        stats_table.add_row(
+            "Generation",
+            tokens(
+                last.completion_tokens,
+                last.completion_seconds,
+                last.completion_tokens_per_second,
+            ),
+            tokens(
+                totals.completion_tokens,
+                totals.completion_seconds,
+                totals.completion_tokens_per_second,
+            ),
+        )
+        for phase, elapsed in last.phases.items():
+            label = phase.replace("_", " ").capitalize()
+            stats_table.add_row(label, seconds(elapsed), seconds(totals.phases[phase]))
+        stats_table.add_row(
+            "Requests",
+            f"{last.requests} ({last.tool_calls} tool calls)",
+            f"{totals.requests} ({totals.tool_calls} tool calls)",
+        )
+        if last.tools_total is not None:
+            stats_table.add_row(
+                "Tools sent",
+                f"{last.tools_sent} of {last.tools_total} "
+                f"(~{last.tool_tokens_saved:,} tokens saved)",
+                f"~{totals.tool_tokens_saved:,} tokens saved",
+            )
+        if last.options:
+            stats_table.add_row(
+                "Options",
+                ", ".join(f"{name}={value}" for name, value in last.options.items()),
+                "",
+            )
+
+        self.console.print()
+        self.console.print(Text("Stats", style=self.theme.subtitle))
+        self.console.print(stats_table)
+        self.console.print()
+
+    def show_batch_result(
+        self,
+        conversation_id: str,
+        done: int,
+        total: int,
+        elapsed: float,
+        error: Optional[str] = None,
+    ):
+        """Display the outcome of one conversation in a batch run."""
+        result_text = Text()
+        result_text.append(f"[{done}/{total}] ", style=self.theme.dim)
+        result_text.append(conversation_id, style=self.theme.info)
+        if error is None:
+            result_text.append(f" finished in {elapsed:.1f}s", style=self.theme.success)
+        else:
+            result_text.append(" failed: ", style=self.theme.error)
+            result_text.append(error, style=self.theme.warning)
+        self.console.print(result_text)
+
+    def show_batch_summary(self, summary: "BatchSummary", output_path: str):
+        """Display the totals and throughput of a batch run."""
+        stats_table = Table(show_header=False, pad_edge=False, box=None)
+        stats_table.add_column("Stat", style=self.theme.command, width=20)
+        stats_table.add_column("Value", style=self.theme.info)
+        stats_table.add_row(
+            "Conversations", f"{summary.conversations} ({summary.failed} failed)"
+        )
+        stats_table.add_row("Turns", str(summary.turns))
+        stats_table.add_row("Tool calls", str(summary.tool_calls))
+        stats_table.add_row(
+            "Tokens",
+            f"{summary.prompt_tokens:,} prompt, "
+            f"{summary.completion_tokens:,} generated",
+        )
+        stats_table.add_row("Wall time", f"{summary.elapsed:.1f}s")
+        stats_table.add_row(
+            "Throughput",
+            f"{summary.conversations_per_minute:.1f} conversations/min, "
+            f"{summary.tokens_per_second:.1f} tokens/s",
+        )
+        stats_table.add_row("Output", output_path)
+
+        self.console.print()
+        self.console.print(Text("Batch Summary", style=self.theme.subtitle))
+        self.console.print(stats_table)
         self.console.print()
 
     def show_help(self):
@@ -282,6 +666,9 @@ class ChatInterface:
             ("/exit", "Exit the chat session"),
             ("/clear", "Clear history and screen"),
             ("/tools [list|reload]", "Manage available tools"),
+            ("/cache [stats|clear]", "Manage the file conversion cache"),
+            ("/context", "Show context usage and compacted history"),
+            ("/stats", "Show where the time of each turn went"),
             ("/help", "Show this help message"),
         ]
         for cmd, desc in commands:
@@ -307,10 +694,19 @@ class ChatInterface:
         """Display a styled message."""
         self.console.print(message, style=style or self.theme.info)
 
-    def show_error(self, message: str):
-        """Display an error message."""
+    def show_error(self, message: str, error: Optional[BaseException] = None):
+        """Display an error message, with the traceback of the given error or
+        of the one being handled, if any.
+        """
         self.console.print(Text(message, style=self.theme.error))
-        self.console.print_exception(show_locals=True)
+        if error is None:
+            error = sys.exc_info()[1]
+        if error is not None:
+            self.console.print(
+                Traceback.from_exception(
+                    type(error), error, error.__traceback__, show_locals=True
+                )
+            )
 
     def show_warning(self, message: str):
         """Display a warning message."""
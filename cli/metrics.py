@@ -0,0 +1,147 @@
+import json
+import time
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from .provider import GenerationStats
+from .router import Route
+
+
+# The parts of a turn that are timed, in the order they usually happen.
+PHASES = ["extract_files", "convert_files", "consent", "tools", "render"]
+
+
+@dataclass
+class TurnMetrics:
+    """Where the time of a single turn went, and how many tokens it used."""
+
+    turn: int
+    started_at: float
+    requests: int = 0
+    tool_calls: int = 0
+    prompt_tokens: int = 0
+    prompt_seconds: float = 0.0
+    completion_tokens: int = 0
+    completion_seconds: float = 0.0
+    first_token: Optional[float] = None
+    total: float = 0.0
+    tools_sent: Optional[int] = None
+    tools_total: Optional[int] = None
+    tool_tokens_saved: int = 0
+    options: Dict[str, Any] = field(default_factory=dict)
+    phases: Dict[str, float] = field(
+        default_factory=lambda: {phase: 0.0 for phase in PHASES}
+    )
+
+    @property
+    def prompt_tokens_per_second(self) -> float:
+        return self.prompt_tokens / self.prompt_seconds if self.prompt_seconds else 0.0
+
+    @property
+    def completion_tokens_per_second(self) -> float:
+        if not self.completion_seconds:
+            return 0.0
+        return self.completion_tokens / self.completion_seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        record = asdict(self)
+        record["prompt_tokens_per_second"] = round(self.prompt_tokens_per_second, 2)
+        record["completion_tokens_per_second"] = round(
+            self.completion_tokens_per_second, 2
+        )
+        return record
+
+
+class MetricsRecorder:
+    """Times the phases of each turn, and optionally logs every turn as JSON.
+
+    Timers only count while a turn is in progress, so the recorder can be
+    handed to components that also run outside of turns.
+    """
+
+    def __init__(self, path: Optional[Path] = None, context: Dict[str, Any] = None):
+        self.path = path
+        self.context = context or {}
+        self.turns: List[TurnMetrics] = []
+        self.current: Optional[TurnMetrics] = None
+        self._started = 0.0
+
+    def start_turn(self):
+        self.current = TurnMetrics(turn=len(self.turns) + 1, started_at=time.time())
+        self._started = time.perf_counter()
+
+    def finish_turn(self):
+        """Close the current turn, appending it to the metrics file if set."""
+        turn, self.current = self.current, None
+        if turn is None:
+            return
+
+        turn.total = time.perf_counter() - self._started
+        self.turns.append(turn)
+        if self.path is not None:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({**self.context, **turn.as_dict()}) + "\n")
+
+    @contextmanager
+    def time(self, phase: str):
+        """Add the time spent in the block to a phase of the current turn."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - started)
+
+    def add_time(self, phase: str, elapsed: float):
+        if self.current is not None:
+            self.current.phases[phase] = self.current.phases.get(phase, 0.0) + elapsed
+
+    def mark_first_token(self):
+        if self.current is not None and self.current.first_token is None:
+            self.current.first_token = time.perf_counter() - self._started
+
+    def add_generation(
+        self,
+        stats: Optional[GenerationStats],
+        tool_calls: int = 0,
+        options: Optional[Dict[str, Any]] = None,
+        route: Optional[Route] = None,
+    ):
+        """Count one model request, with the statistics Ollama reported for it,
+        the model options it was sent with, and the tools it was sent with if
+        they were routed.
+        """
+        if self.current is None:
+            return
+
+        self.current.requests += 1
+        self.current.tool_calls += tool_calls
+        self.current.options.update(options or {})
+        if route is not None:
+            self.current.tools_sent = route.sent
+            self.current.tools_total = route.total
+            self.current.tool_tokens_saved += route.tokens_saved
+        if stats is not None:
+            self.current.prompt_tokens += stats.prompt_tokens
+            self.current.prompt_seconds += stats.prompt_seconds
+            self.current.completion_tokens += stats.completion_tokens
+            self.current.completion_seconds += stats.completion_seconds
+
+    def totals(self) -> TurnMetrics:
+        """Sum the metrics of every finished turn."""
+        totals = TurnMetrics(turn=len(self.turns), started_at=0.0)
+        for turn in self.turns:
+            totals.requests += turn.requests
+            totals.tool_calls += turn.tool_calls
+            totals.prompt_tokens += turn.prompt_tokens
+            totals.prompt_seconds += turn.prompt_seconds
+            totals.completion_tokens += turn.completion_tokens
+            totals.completion_seconds += turn.completion_seconds
+            totals.total += turn.total
+            totals.tool_tokens_saved += turn.tool_tokens_saved
+            for phase, elapsed in turn.phases.items():
+                totals.phases[phase] = totals.phases.get(phase, 0.0) + elapsed
+
+        return totals
@@ -0,0 +1,359 @@
+import json
+import time
+import inspect
+import hashlib
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, AsyncIterator, Dict, Callable, Any, Tuple, Union, Optional
+
+from ollama import AsyncClient, ResponseError
+
+from sdk import OllamaProvider
+from sdk.types import Message, Model, Part, ToolCall
+
+from .history import CHARS_PER_TOKEN
+from .hosts import HOST_ERRORS, Host, HostPool
+
+
+# The context sizes num_ctx is rounded up to. Changing num_ctx makes Ollama
+# reload the model and drop its KV cache, so the context only ever grows, and
+# by whole buckets.
+CONTEXT_BUCKETS = [8192, 16384, 32768, 65536, 131072]
+DEFAULT_MAX_CONTEXT = 32768
+
+# Tokens kept free for the reply, when num_predict does not bound it.
+REPLY_HEADROOM = 4096
+
+
+@dataclass
+class PrefixMatch:
+    """How much of a request was byte-identical to the one before it."""
+
+    matched_bytes: int
+    total_bytes: int
+
+    @property
+    def ratio(self) -> float:
+        return self.matched_bytes / self.total_bytes if self.total_bytes else 1.0
+
+
+@dataclass
+class GenerationStats:
+    """The token counts and timings Ollama reports at the end of a response."""
+
+    prompt_tokens: int = 0
+    prompt_seconds: float = 0.0
+    completion_tokens: int = 0
+    completion_seconds: float = 0.0
+
+
+@dataclass
+class Residency:
+    """Whether the model is loaded on its host, and how much of it is in VRAM."""
+
+    loaded: bool
+    size: int = 0
+    size_vram: int = 0
+    expires_at: Optional[datetime] = None
+
+    @property
+    def vram_ratio(self) -> float:
+        return self.size_vram / self.size if self.size else 0.0
+
+
+class Provider(OllamaProvider):
+    """An Ollama provider that keeps the prompt prefix stable between requests.
+
+    Ollama can only reuse its KV cache for the leading part of a request that
+    is identical to the previous one. Tools are therefore always sent in name
+    order, and each message is formatted once and reused on later turns.
+
+    Requests go to a pool of one or more hosts. A provider sticks to the host
+    that served its last request, and fails over to another host if that one
+    errors before the first chunk of a response arrives.
+
+    Unless `num_ctx` is set in the options, the context size is chosen from
+    the size of each request, plus room for the reply.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        hosts: Union[str, List[str], HostPool] = "http://localhost:11434",
+        keep_alive: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        max_context: int = DEFAULT_MAX_CONTEXT,
+    ):
+        # The SDK provider would create its own client for a single host.
+        self.model = model
+        self.keep_alive = keep_alive
+        self.options = options or {}
+        self.max_context = max_context
+        self.last_options: Dict[str, Any] = {}
+        self._context_size = 0
+        self._tokens_per_byte = 1 / CHARS_PER_TOKEN
+        if not isinstance(hosts, HostPool):
+            hosts = HostPool([hosts] if isinstance(hosts, str) else hosts)
+        self.pool = hosts
+        self.host: Optional[Host] = None
+        self.last_prefix_match: PrefixMatch = None
+        self.last_stats: GenerationStats = None
+        self._formatted: Dict[int, Tuple[Message, Dict[str, Any], bytes]] = {}
+        self._previous_chunks: List[bytes] = []
+        self._serialized_tools: Tuple[List[Any], bytes] = ([], b"")
+
+    @property
+    def client(self) -> AsyncClient:
+        """The client of the current host, or of the best host if none is set."""
+        return (self.host or self.pool.candidates()[0]).client
+
+    def _format_message(self, message: Message) -> Dict[str, Any]:
+        return self._format_cached(message)[0]
+
+    async def chat(
+        self,
+        messages: List[Message],
+        tools: List[Union[Dict[str, Any], Callable]] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[Part]:
+        """Stream a reply, like the SDK provider.
+
+        Tools may be given as functions, or as precompiled JSON schemas, which
+        the Ollama client sends as they are instead of introspecting functions
+        on every request.
+        """
+        # Stats are only set once a response finishes, so an interrupted one
+        # must not leave the previous response's stats in place.
+        self.last_stats = None
+        tools = sorted(tools or [], key=_tool_name)
+
+        formatted = [self._format_cached(message) for message in messages]
+        self._formatted = {
+            id(message): self._formatted[id(message)] for message in messages
+        }
+        request = [self._serialize_tools(tools)]
+        request += [serialized for _, serialized in formatted]
+        request_bytes = sum(len(chunk) for chunk in request)
+        self._record_prefix(request)
+
+        options = {**self.options, **(options or {})}
+        options.setdefault("num_ctx", self._size_context(request_bytes))
+        self.last_options = options
+
+        host, chunks = await self._open_stream(
+            model=self.model,
+            messages=[message for message, _ in formatted],
+            tools=tools,
+            stream=True,
+            options=options,
+            keep_alive=self.keep_alive,
+        )
+
+        try:
+            async for part in self._parse_stream(chunks):
+                yield part
+        finally:
+            host.outstanding -= 1
+
+        # Requests served partly from the KV cache report fewer prompt tokens
+        # than they hold, so the estimate is only ever corrected upwards.
+        if self.last_stats and request_bytes:
+            self._tokens_per_byte = max(
+                self._tokens_per_byte, self.last_stats.prompt_tokens / request_bytes
+            )
+
+    def _size_context(self, request_bytes: int) -> int:
+        """Pick the smallest bucket that fits the request and its reply.
+
+        The reply is sized from the configured options, not those of a single
+        request, so a warm-up picks the same bucket as the request after it.
+        """
+        reply = self.options.get("num_predict")
+        if reply is None or reply < 0:
+            reply = REPLY_HEADROOM
+        needed = request_bytes * self._tokens_per_byte + reply
+
+        size = next(
+            (bucket for bucket in CONTEXT_BUCKETS if bucket >= needed),
+            CONTEXT_BUCKETS[-1],
+        )
+        self._context_size = max(self._context_size, min(size, self.max_context))
+        return self._context_size
+
+    async def warm_up(
+        self,
+        messages: List[Message],
+        tools: List[Union[Dict[str, Any], Callable]] = None,
+    ):
+        """Load the model and evaluate the start of a conversation, discarding the
+        reply, so that the first real request only has to evaluate what is new.
+        """
+        async for _ in self.chat(messages, tools, options={"num_predict": 1}):
+            pass
+
+    async def residency(self) -> Residency:
+        """Return whether the model is loaded on the current host."""
+        response = await self.client.ps()
+        for model in response.models:
+            if model.model in (self.model, f"{self.model}:latest"):
+                return Residency(
+                    loaded=True,
+                    size=model.size or 0,
+                    size_vram=model.size_vram or 0,
+                    expires_at=model.expires_at,
+                )
+
+        return Residency(loaded=False)
+
+    async def details(self) -> Model:
+        """Check the health of every host, then describe the model from the best."""
+        await self.pool.check(self.model)
+        for host in self.pool.candidates(self.host):
+            try:
+                info = await host.client.show(self.model)
+            except HOST_ERRORS:
+                self.pool.mark_failed(host)
+                continue
+
+            return Model(
+                name=self.model,
+                details=info.get("details", {}),
+                capabilities=info.get("capabilities", []),
+            )
+
+        raise ConnectionError(
+            f"Could not connect to Ollama or model '{self.model}' not found."
+        )
+
+    async def _open_stream(self, **request) -> Tuple[Host, AsyncIterator]:
+        """Start a chat request, failing over until a host sends its first chunk.
+
+        The returned host has the request counted as outstanding, and the caller
+        must release it once the stream is finished.
+        """
+        error = None
+        for host in self.pool.candidates(self.host):
+            host.outstanding += 1
+            started = time.perf_counter()
+            try:
+                stream = await host.client.chat(**request)
+                chunks = aiter(stream)
+                first = await anext(chunks, None)
+            except HOST_ERRORS as e:
+                host.outstanding -= 1
+                if isinstance(e, ResponseError) and not _is_host_error(e):
+                    raise
+                self.pool.mark_failed(host)
+                error = e
+                continue
+            except BaseException:
+                # Cancelled, or timed out, before the caller took the stream over.
+                host.outstanding -= 1
+                raise
+
+            self.pool.record_latency(host, time.perf_counter() - started)
+            self.host = host
+            return host, _prepend(first, chunks)
+
+        raise ConnectionError(f"No Ollama host could serve the request: {error}")
+
+    def _format_cached(self, message: Message) -> Tuple[Dict[str, Any], bytes]:
+        """Format a message once, along with its canonical serialization."""
+        cached = self._formatted.get(id(message))
+        if cached is not None and cached[0] is message:
+            return cached[1], cached[2]
+
+        formatted = super()._format_message(message)
+        serialized = json.dumps(
+            formatted, sort_keys=True, default=_digest, ensure_ascii=False
+        ).encode()
+        self._formatted[id(message)] = (message, formatted, serialized)
+        return formatted, serialized
+
+    def _serialize_tools(self, tools: List[Union[Dict[str, Any], Callable]]) -> bytes:
+        """Serialize the tools canonically, reusing the last result if the same
+        tool objects are sent again, as they are on every turn.
+        """
+        previous, serialized = self._serialized_tools
+        if len(previous) == len(tools) and all(a is b for a, b in zip(previous, tools)):
+            return serialized
+
+        serialized = "".join(
+            json.dumps(tool, sort_keys=True, ensure_ascii=False)
+            if isinstance(tool, dict)
+            else f"{tool.__name__}{inspect.signature(tool)}{tool.__doc__}"
+            for tool in tools
+        ).encode()
+        self._serialized_tools = (tools, serialized)
+        return serialized
+
+    def _record_prefix(self, chunks: List[bytes]):
+        """Measure how many leading bytes match the previous request."""
+        matched = 0
+        for previous, current in zip(self._previous_chunks, chunks):
+            if previous == current:
+                matched += len(current)
+                continue
+
+            limit = min(len(previous), len(current))
+            index = next((i for i in range(limit) if previous[i] != current[i]), limit)
+            matched += index
+            break
+
+        self.last_prefix_match = PrefixMatch(matched, sum(len(c) for c in chunks))
+        self._previous_chunks = chunks
+
+    async def _parse_stream(self, stream) -> AsyncIterator[Part]:
+        """Turn Ollama's response chunks into parts, like the SDK provider.
+
+        The statistics in the final chunk are kept in `last_stats`.
+        """
+        async for chunk in stream:
+            if chunk.get("done"):
+                self.last_stats = GenerationStats(
+                    prompt_tokens=chunk.get("prompt_eval_count") or 0,
+                    prompt_seconds=(chunk.get("prompt_eval_duration") or 0) / 1e9,
+                    completion_tokens=chunk.get("eval_count") or 0,
+                    completion_seconds=(chunk.get("eval_duration") or 0) / 1e9,
+                )
+
+            if tool_calls := chunk["message"].get("tool_calls"):
+                for tool_call in tool_calls:
+                    yield Part(
+                        kind="tool_call",
+                        data=ToolCall(
+                            id=None,
+                            tool=tool_call.function.name,
+                            parameters=tool_call.function.arguments or {},
+                        ),
+                    )
+            elif content := chunk["message"].get("content"):
+                yield Part(kind="text", data=content)
+
+
+async def _prepend(first, chunks: AsyncIterator) -> AsyncIterator:
+    """Yield a chunk that was already read, then the rest of the stream."""
+    if first is not None:
+        yield first
+    async for chunk in chunks:
+        yield chunk
+
+
+def _is_host_error(error: ResponseError) -> bool:
+    """Whether an error response is the host's fault, rather than the request's.
+
+    A missing model counts, since another host may have it.
+    """
+    return error.status_code >= 500 or error.status_code in (404, 429)
+
+
+def _digest(value: bytes) -> str:
+    """Stand in for image bytes in serialized messages."""
+    return hashlib.sha256(value).hexdigest()
+
+
+def _tool_name(tool: Union[Dict[str, Any], Callable]) -> str:
+    if isinstance(tool, dict):
+        return tool["function"]["name"]
+    return tool.__name__
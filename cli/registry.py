@@ -0,0 +1,422 @@
+import ast
+import sys
+import json
+import time
+import hashlib
+import inspect
+import threading
+import importlib.util
+
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from sdk.tools import ToolManager as BaseToolManager
+
+from .cache import cache_dir, write_atomic
+
+
+# Bump whenever the shape of the cached index changes, to invalidate it.
+INDEX_VERSION = 4
+
+_ANNOTATIONS = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "list": list,
+    "dict": dict,
+}
+
+_JSON_TYPES = {
+    "str": "string",
+    "int": "integer",
+    "float": "number",
+    "bool": "boolean",
+    "list": "array",
+    "dict": "object",
+}
+
+_SECTION_ENDS = ("returns:", "yields:", "raises:")
+
+
+def parse_tool_module(path: Path) -> List[Dict[str, Any]]:
+    """Describe the tools defined in a module without importing it.
+
+    Like the SDK, every public top-level function with a docstring is a tool.
+    A module may declare how long its tools' results can be cached, and how
+    long its tools may run in a worker process, in seconds, with literal
+    `CACHE_TTL` and `TIMEOUT` assignments. Each tool's JSON schema is
+    compiled here too, so it is built once per change to the module rather
+    than by the Ollama client on every request.
+    """
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    ttl = _module_constant(tree, "CACHE_TTL")
+    timeout = _module_constant(tree, "TIMEOUT")
+
+    tools = []
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+
+        doc = ast.get_docstring(node, clean=False)
+        if node.name.startswith("_") or not doc:
+            continue
+
+        spec = {
+            "name": node.name,
+            "doc": doc,
+            "is_async": isinstance(node, ast.AsyncFunctionDef),
+            "params": _parse_parameters(node.args),
+            "ttl": ttl,
+            "timeout": timeout,
+        }
+        spec["schema"] = compile_schema(spec)
+        tools.append(spec)
+
+    return tools
+
+
+def compile_schema(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the JSON schema Ollama expects for a tool, from its description.
+
+    This follows the Ollama client's own conversion of functions: parameter
+    descriptions come from the docstring's Args section, and parameters
+    without a type annotation are strings. Unlike it, parameters that have
+    defaults are not required.
+    """
+    description, arguments = _parse_docstring(inspect.cleandoc(spec["doc"]))
+    properties = {
+        param["name"]: {
+            "type": _JSON_TYPES.get(param["annotation"], "string"),
+            "description": arguments.get(param["name"], ""),
+        }
+        for param in spec["params"]
+    }
+
+    return {
+        "type": "function",
+        "function": {
+            "name": spec["name"],
+            "description": description,
+            "parameters": {
+                "type": "object",
+                "required": [p["name"] for p in spec["params"] if "default" not in p],
+                "properties": properties,
+            },
+        },
+    }
+
+
+def _parse_docstring(doc: str) -> Tuple[str, Dict[str, str]]:
+    """Split a Google style docstring into its description and its Args."""
+    description, args, section = [], [], "description"
+    for line in doc.splitlines():
+        lowered = line.strip().lower()
+        if lowered.startswith("args:"):
+            section = "args"
+        elif lowered.startswith(_SECTION_ENDS):
+            section = None
+        elif section == "description":
+            description.append(line.strip())
+        elif section == "args":
+            args.append(line.strip())
+
+    arguments, name = {}, None
+    for line in args:
+        if ":" in line:
+            # 'name (type, optional): description', or just 'name: description'
+            head, text = line.split(":", 1)
+            name = head.split("(", 1)[0].strip()
+            arguments[name] = text.strip()
+        elif name and line:
+            arguments[name] += " " + line
+
+    return "\n".join(description).strip(), arguments
+
+
+def _module_constant(tree: ast.Module, name: str):
+    """Return the value of a numeric constant, if the module declares one."""
+    for node in tree.body:
+        if not isinstance(node, ast.Assign):
+            continue
+
+        names = [target.id for target in node.targets if isinstance(target, ast.Name)]
+        if (
+            name in names
+            and isinstance(node.value, ast.Constant)
+            and isinstance(node.value.value, (int, float))
+        ):
+            return node.value.value
+
+    return None
+
+
+def _parse_parameters(args: ast.arguments) -> List[Dict[str, Any]]:
+    """Describe a function's positional-or-keyword parameters."""
+    params = []
+    defaults = [None] * (len(args.args) - len(args.defaults)) + args.defaults
+
+    for arg, default in zip(args.args, defaults):
+        param = {"name": arg.arg, "annotation": None}
+        annotation = _unwrap_optional(arg.annotation)
+        if isinstance(annotation, ast.Name):
+            param["annotation"] = annotation.id
+
+        if default is not None:
+            try:
+                param["default"] = ast.literal_eval(default)
+            except (ValueError, TypeError, SyntaxError):
+                param["default"] = None
+
+        params.append(param)
+
+    return params
+
+
+def _unwrap_optional(annotation):
+    """Return X for an `Optional[X]` or `X | None` annotation."""
+    if (
+        isinstance(annotation, ast.Subscript)
+        and isinstance(annotation.value, ast.Name)
+        and annotation.value.id == "Optional"
+    ):
+        return annotation.slice
+    if isinstance(annotation, ast.BinOp) and isinstance(annotation.op, ast.BitOr):
+        for side, other in (
+            (annotation.left, annotation.right),
+            (annotation.right, annotation.left),
+        ):
+            if isinstance(other, ast.Constant) and other.value is None:
+                return side
+    return annotation
+
+
+@dataclass
+class ToolChanges:
+    """The tools a reload added, changed and removed, and how long it took."""
+
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+class ToolRegistry(BaseToolManager):
+    """Loads tools lazily from an index built by parsing, not importing, them.
+
+    The index is cached on disk and keyed by each file's size and mtime. A
+    tool module is only imported the first time one of its tools is executed.
+    Reloading only re-parses modules whose contents changed, and evicts the
+    tools of modules that were deleted.
+    """
+
+    def __init__(self, tool_dirs: List[str] = None, index_path: Path = None):
+        self.index_path = index_path or cache_dir("tools") / "index.json"
+        self._index = self._load_index()
+        self._modules: Dict[str, Any] = {}
+        self._sources: Dict[str, str] = {}
+        self._specs: Dict[str, Dict[str, Any]] = {}
+        self._schemas: List[Dict[str, Any]] = []
+        self._import_lock = threading.Lock()
+        super().__init__(tool_dirs)
+
+    def reload_tools(self):
+        self.refresh()
+        return len(self.tools)
+
+    def execute_tool(self, name: str, kwargs: Dict) -> Any:
+        """Execute a tool, letting its errors propagate to the caller."""
+        if name not in self.tools:
+            raise KeyError(f"Tool '{name}' not found.")
+        return self.tools[name](**kwargs)
+
+    def get_schemas(self) -> List[Dict[str, Any]]:
+        """Return the compiled JSON schema of every tool, sorted by name.
+
+        The list is rebuilt only when the tools change, so it can be sent with
+        every request as is.
+        """
+        return self._schemas
+
+    def get_ttl(self, name: str):
+        """Return how long a tool's results may be cached, if at all."""
+        return self._specs[name]["ttl"] if name in self._specs else None
+
+    def get_timeout(self, name: str):
+        """Return how long a tool may run in a worker process, if it says."""
+        return self._specs[name]["timeout"] if name in self._specs else None
+
+    def get_source(self, name: str):
+        """Return the path of the module a tool is defined in."""
+        return self._sources.get(name)
+
+    def get_output_sink(self, name: str) -> Optional[ContextVar]:
+        """Return the variable a tool's module reads a callback for its live
+        output from, if it declares an OUTPUT_SINK. This imports the module.
+        """
+        source = self._sources.get(name)
+        if source is None:
+            return None
+        sink = getattr(self._import(Path(source)), "OUTPUT_SINK", None)
+        return sink if isinstance(sink, ContextVar) else None
+
+    def module_paths(self) -> List[str]:
+        """Return the path of every module that defines a tool."""
+        return sorted(set(self._sources.values()))
+
+    def refresh(self) -> ToolChanges:
+        """Bring the tools in line with the tool directories on disk."""
+        started = time.perf_counter()
+        index = dict(self._index)
+
+        tools: Dict[str, Callable] = {}
+        sources: Dict[str, str] = {}
+        specs: Dict[str, Dict[str, Any]] = {}
+        changed_files = set()
+
+        for path in self._tool_files():
+            file_specs, changed = self._describe(path)
+            if changed:
+                changed_files.add(str(path))
+                self._modules.pop(str(path), None)
+
+            for spec in file_specs:
+                name = spec["name"]
+                existing = self.tools.get(name)
+                if changed or existing is None or self._sources[name] != str(path):
+                    tools[name] = self._make_stub(path, spec)
+                else:
+                    tools[name] = existing
+                sources[name] = str(path)
+                specs[name] = spec
+
+        for path in set(self._sources.values()) - set(sources.values()):
+            self._modules.pop(path, None)
+            self._index.pop(path, None)
+
+        changes = ToolChanges(
+            added=sorted(tools.keys() - self.tools.keys()),
+            changed=sorted(
+                name
+                for name in tools.keys() & self.tools.keys()
+                if sources[name] in changed_files
+                or sources[name] != self._sources[name]
+            ),
+            removed=sorted(self.tools.keys() - tools.keys()),
+        )
+
+        self.tools, self._sources, self._specs = tools, sources, specs
+        if changes or len(self._schemas) != len(specs):
+            self._schemas = [specs[name]["schema"] for name in sorted(specs)]
+        if index != self._index:
+            write_atomic(
+                self.index_path,
+                json.dumps({"version": INDEX_VERSION, "files": self._index}),
+            )
+
+        changes.elapsed = time.perf_counter() - started
+        return changes
+
+    def _tool_files(self) -> List[Path]:
+        """List the modules in every tool directory, in a stable order."""
+        files = []
+        for directory in self.tool_dirs or []:
+            path = Path(directory)
+            if path.is_dir():
+                files += [file.resolve() for file in sorted(path.glob("*.py"))]
+
+        return files
+
+    def _describe(self, path: Path) -> Tuple[List[Dict[str, Any]], bool]:
+        """Return the indexed tools of a module, and whether it has changed.
+
+        A module whose size or mtime differs from the index is re-hashed, and
+        only re-parsed if its contents actually changed.
+        """
+        stat = path.stat()
+        entry = self._index.get(str(path))
+        if (
+            entry
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return entry["tools"], False
+
+        source = path.read_bytes()
+        digest = hashlib.sha256(source).hexdigest()
+        changed = entry is None or entry.get("sha256") != digest
+        tools = parse_tool_module(path) if changed else entry["tools"]
+
+        self._index[str(path)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+            "tools": tools,
+        }
+        return tools, changed and str(path) in self._sources.values()
+
+    def _make_stub(self, path: Path, spec: Dict[str, Any]) -> Callable:
+        """Create a stand-in for a tool that imports its module when called."""
+        name = spec["name"]
+
+        if spec["is_async"]:
+
+            async def tool(**kwargs):
+                return await self._resolve(path, name)(**kwargs)
+
+        else:
+
+            def tool(**kwargs):
+                return self._resolve(path, name)(**kwargs)
+
+        tool.__name__ = tool.__qualname__ = name
+        tool.__doc__ = spec["doc"]
+        tool.__signature__ = inspect.Signature(
+            [
+                inspect.Parameter(
+                    param["name"],
+                    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                    default=param.get("default", inspect.Parameter.empty),
+                    annotation=_ANNOTATIONS.get(
+                        param["annotation"], inspect.Parameter.empty
+                    ),
+                )
+                for param in spec["params"]
+            ]
+        )
+        return tool
+
+    def _resolve(self, path: Path, name: str) -> Callable:
+        """Return the real tool function, importing its module if needed."""
+        return getattr(self._import(path), name)
+
+    def _import(self, path: Path):
+        """Import a tool module, once. Its directory is added to the import
+        path, so it can import the helper packages kept next to it.
+        """
+        with self._import_lock:
+            module = self._modules.get(str(path))
+            if module is None:
+                if str(path.parent) not in sys.path:
+                    sys.path.append(str(path.parent))
+                spec = importlib.util.spec_from_file_location(path.stem, path)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                self._modules[str(path)] = module
+
+        return module
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+        if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+            return {}
+        return index["files"]
@@ -0,0 +1,142 @@
+import re
+import json
+import math
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Any, Iterable, List, Optional, Set
+
+from .history import CHARS_PER_TOKEN
+
+
+# BM25's term frequency saturation and document length normalisation.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# How many times a tool's name counts, relative to the words of its description.
+NAME_WEIGHT = 3
+
+# Tools sent on every turn when routing, unless others are pinned instead.
+DEFAULT_PINNED_TOOLS = ("read_file", "list_files", "web_search")
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase words, also splitting snake_case names."""
+    return _WORD.findall(text.lower())
+
+
+@dataclass
+class Route:
+    """The tools sent with a request, out of those loaded."""
+
+    sent: int
+    total: int
+    tokens_saved: int
+
+
+class ToolRouter:
+    """Picks the tools relevant to each turn, instead of sending them all.
+
+    Tools are ranked against the user's prompt with BM25 over their names,
+    descriptions and parameters. Each turn sends the top-k tools and the
+    pinned ones, and keeps that set for the tool rounds that follow. If the
+    model calls a tool it was not sent, every tool is sent for the rest of
+    the turn.
+    """
+
+    def __init__(self, top_k: int, pinned: Iterable[str] = DEFAULT_PINNED_TOOLS):
+        self.top_k = top_k
+        self.pinned: Set[str] = set(pinned)
+        self.selected: Set[str] = set()
+        self.expanded = False
+        self.last_route: Optional[Route] = None
+
+        self._indexed: Optional[List[Dict[str, Any]]] = None
+        self._documents: Dict[str, Counter] = {}
+        self._lengths: Dict[str, int] = {}
+        self._frequencies: Counter = Counter()
+        self._average_length = 0.0
+        self._tokens: Dict[str, int] = {}
+
+    def route(
+        self, schemas: List[Dict[str, Any]], prompt: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Return the schemas to send with a request.
+
+        A prompt starts a new turn and a new selection, while a request without
+        one continues the current turn with the tools it already has.
+        """
+        if schemas is not self._indexed:
+            self._index(schemas)
+
+        if prompt is not None:
+            self.expanded = False
+            self.selected = self.pinned | set(self.rank(prompt)[: self.top_k])
+
+        if self.expanded:
+            routed = schemas
+        else:
+            routed = [s for s in schemas if s["function"]["name"] in self.selected]
+
+        sent = {schema["function"]["name"] for schema in routed}
+        self.last_route = Route(
+            sent=len(routed),
+            total=len(schemas),
+            tokens_saved=sum(
+                tokens for name, tokens in self._tokens.items() if name not in sent
+            ),
+        )
+        return routed
+
+    def observe(self, tool_names: Iterable[str]):
+        """Send every tool for the rest of the turn if the model called one it
+        was not sent, in case the one it wanted is among them.
+        """
+        if any(name not in self.selected for name in tool_names):
+            self.expanded = True
+
+    def rank(self, query: str) -> List[str]:
+        """Return the names of the tools matching a query, best first."""
+        terms = set(tokenize(query))
+        count = len(self._documents)
+        scores = {}
+
+        for name, document in self._documents.items():
+            score = 0.0
+            norm = BM25_K1 * (
+                1 - BM25_B + BM25_B * self._lengths[name] / self._average_length
+            )
+            for term in terms & document.keys():
+                frequency = self._frequencies[term]
+                idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+                tf = document[term]
+                score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+            if score > 0:
+                scores[name] = score
+
+        return sorted(scores, key=lambda name: (-scores[name], name))
+
+    def _index(self, schemas: List[Dict[str, Any]]):
+        """Rebuild the index, whenever the registry's tools change."""
+        self._documents, self._lengths, self._tokens = {}, {}, {}
+        self._frequencies = Counter()
+
+        for schema in schemas:
+            function = schema["function"]
+            words = tokenize(function["name"]) * NAME_WEIGHT
+            words += tokenize(function["description"])
+            for param, details in function["parameters"]["properties"].items():
+                words += tokenize(param) + tokenize(details.get("description", ""))
+
+            name = function["name"]
+            self._documents[name] = Counter(words)
+            self._lengths[name] = len(words)
+            self._frequencies.update(self._documents[name].keys())
+            self._tokens[name] = len(json.dumps(schema)) // CHARS_PER_TOKEN
+
+        self._average_length = (
+            sum(self._lengths.values()) / len(self._lengths) if self._lengths else 1.0
+        ) or 1.0
+        self._indexed = schemas
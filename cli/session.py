@@ -1,10 +1,19 @@
+import signal
+import asyncio
+
 from typing import Dict, Any, List, Optional
 
-from sdk import Agent
 from sdk.types import ToolCall
 
+from .agent import Agent
+from .cache import ConversionCache
+from .history import HistoryManager
+from .hosts import HOST_ERRORS
+from .metrics import MetricsRecorder
+from .router import ToolRouter
 from .files import FileHandler
 from .tools import ToolManager
+from .workers import WorkerPool
 from .commands import CommandHandler
 from .interface import ChatInterface
 
@@ -16,9 +25,29 @@ class ChatSession:
         self.interface = interface
         self.config = config
         self.file_handler = FileHandler(interface)
-        self.tool_manager = ToolManager(interface)
-        self.command_handler = CommandHandler(interface)
+        self.metrics = MetricsRecorder(
+            config["metrics_file"],
+            {"model": config["provider"].model, "warm_up": config["warm_up"]},
+        )
+        self.worker_pool = (
+            WorkerPool(
+                config["tool_concurrency"],
+                config["tool_timeout"],
+                config["tool_memory"],
+            )
+            if config["isolate_tools"]
+            else None
+        )
+        self.tool_manager = ToolManager(
+            interface,
+            config["tool_concurrency"],
+            config["speculative_tools"],
+            self.metrics,
+            self.worker_pool,
+        )
+        self.command_handler = CommandHandler(interface, self.metrics)
         self.agent: Optional[Agent] = None
+        self.warm_up: Optional[asyncio.Task] = None
 
     async def run(self):
         """Run the main chat session."""
@@ -30,16 +59,58 @@ class ChatSession:
         except Exception as e:
             self.interface.show_error(f"Unexpected error: {str(e)}")
             raise
+        finally:
+            if self.worker_pool is not None:
+                self.worker_pool.close()
+            if self.agent is not None:
+                self.agent.file_manager.close()
 
     async def _initialize_model(self):
-        """Initialize the model and display header."""
-        self.agent = Agent(**self.config)
+        """Initialize the model and display header.
+
+        The model is warmed up in the background, so it loads while the header
+        is shown and the user types their first message.
+        """
+        self.agent = Agent(
+            provider=self.config["provider"],
+            prompt=self.config["prompt"],
+            tools=self.config["tools"],
+            eager_tool_calls=self.config["speculative_tools"],
+            conversion_cache=ConversionCache(self.config["cache_size"] * 1024 * 1024),
+            history_manager=HistoryManager(self.config["context_budget"]),
+            tool_router=(
+                ToolRouter(self.config["route_tools"], self.config["pinned_tools"])
+                if self.config["route_tools"]
+                else None
+            ),
+        )
+
+        if self.worker_pool is not None:
+            self.worker_pool.start(self.agent.tool_manager.module_paths())
+
+        if self.config["warm_up"]:
+            self.warm_up = asyncio.create_task(self.agent.warm_up())
+            # A failed warm-up only costs time, so its error is not shown.
+            self.warm_up.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
+            )
 
         model_info = await self.agent.describe_model()
         tools = self.agent.tool_manager.get_tools()
         prompt = True if self.config["prompt"] else False
 
-        self.interface.show_header(model_info, len(tools), prompt)
+        try:
+            residency = await self.agent.model_provider.residency()
+        except HOST_ERRORS:
+            residency = None
+
+        self.interface.show_header(
+            model_info,
+            len(tools),
+            prompt,
+            residency,
+            self.warm_up is not None and not self.warm_up.done(),
+        )
         self.interface.show_message(
             "\nBegin a conversation, or type '/help' for more information.",
             style=self.interface.theme.system,
@@ -49,7 +120,7 @@ class ChatSession:
         """Main chat interaction loop."""
         while True:
             try:
-                user_input = self.interface.get_user_input()
+                user_input = await self.interface.get_user_input()
                 if not user_input:
                     continue
 
@@ -65,12 +136,33 @@ class ChatSession:
 
     async def _process_user_message(self, user_input: str):
         """Process a user message through the full conversation flow."""
-        cleaned_prompt, extracted_files = self.file_handler.extract_files(user_input)
-        all_files = getattr(self, "_initial_files", []) + extracted_files
-        if not cleaned_prompt and all_files:
-            cleaned_prompt = "Please analyze the attached files."
+        if self.config["watch_tools"]:
+            changes = self.agent.tool_manager.refresh()
+            if changes:
+                self.interface.show_tools_changed(changes)
 
-        await self._process_conversation_turn(cleaned_prompt, all_files)
+        self.metrics.start_turn()
+        conversion_time = self.agent.file_manager.conversion_time
+        try:
+            if self.warm_up is not None and not self.warm_up.done():
+                with self.interface.console.status(
+                    "Loading model...", spinner_style=self.interface.theme.spinner
+                ):
+                    await asyncio.wait([self.warm_up])
+
+            with self.metrics.time("extract_files"):
+                cleaned_prompt, extracted_files = self.file_handler.extract_files(
+                    user_input
+                )
+            all_files = getattr(self, "_initial_files", []) + extracted_files
+            if not cleaned_prompt and all_files:
+                cleaned_prompt = "Please analyze the attached files."
+
+            await self._process_conversation_turn(cleaned_prompt, all_files)
+        finally:
+            conversion_time = self.agent.file_manager.conversion_time - conversion_time
+            self.metrics.add_time("convert_files", conversion_time)
+            self.metrics.finish_turn()
 
     async def _process_conversation_turn(self, prompt: str, files: List[str]):
         """Process a complete conversation turn with potential tool calls."""
@@ -79,30 +171,32 @@ class ChatSession:
 
         while True:
             tool_calls = []
-            text_stream_started = False
 
             with self.interface.console.status(
                 "Thinking...", spinner_style=self.interface.theme.spinner
             ) as status:
-                async for part in stream:
-                    if part.kind == "text":
-                        if not text_stream_started:
-                            status.stop()
-                            self.interface.start_stream()
-                            text_stream_started = True
+                receiving = asyncio.create_task(
+                    self._receive_response(stream, status, tool_calls)
+                )
+                interrupted = await self._until_interrupted(receiving)
 
-                        self.interface.update_stream(part.data)
-
-                    elif part.kind == "tool_call":
-                        if text_stream_started:
-                            self.interface.stop_stream()
-                            text_stream_started = False
+            provider = self.agent.model_provider
+            router = self.agent.tool_router
+            # An interrupted response reports no stats, and is not counted.
+            if provider.last_stats is not None:
+                self.metrics.add_generation(
+                    provider.last_stats,
+                    len(tool_calls),
+                    provider.last_options,
+                    router.last_route if router is not None else None,
+                )
+            if self.config["prefix_diagnostics"]:
+                self.interface.show_prefix_match(provider.last_prefix_match)
 
-                        status.stop()
-                        tool_calls.append(part.data)
-
-            if text_stream_started:
-                self.interface.stop_stream()
+            if interrupted:
+                self.tool_manager.discard_speculative()
+                self.interface.show_warning("Response interrupted.")
+                break
 
             if not tool_calls:
                 break
@@ -115,5 +209,71 @@ class ChatSession:
             self.agent.history.extend(tool_results)
             stream = self.agent.stream_response(prompt=None)
 
+    async def _receive_response(self, stream, status, tool_calls: List[ToolCall]):
+        """Render a response as it streams in, collecting its tool calls."""
+        text_stream_started = False
+        try:
+            async for part in stream:
+                self.metrics.mark_first_token()
+                if part.kind == "text":
+                    with self.metrics.time("render"):
+                        if not text_stream_started:
+                            status.stop()
+                            self.interface.start_stream()
+                            text_stream_started = True
+
+                        self.interface.update_stream(part.data)
+
+                elif part.kind == "tool_call":
+                    if text_stream_started:
+                        with self.metrics.time("render"):
+                            self.interface.stop_stream()
+                        text_stream_started = False
+
+                    status.stop()
+                    tool_calls.append(part.data)
+                    self.tool_manager.speculate(self.agent, part.data)
+        except BaseException:
+            # The calls will not be made, so neither should their speculative runs.
+            self.tool_manager.discard_speculative()
+            raise
+        finally:
+            if text_stream_started:
+                with self.metrics.time("render"):
+                    self.interface.stop_stream()
+
+    async def _until_interrupted(self, task: asyncio.Task) -> bool:
+        """Wait for a task, cancelling it if Ctrl+C is pressed, and return whether
+        it was. Pressing Ctrl+C again exits, as it does at the prompt.
+        """
+        loop = asyncio.get_running_loop()
+        previous = signal.getsignal(signal.SIGINT)
+
+        def restore():
+            loop.remove_signal_handler(signal.SIGINT)
+            signal.signal(signal.SIGINT, previous)
+
+        def interrupt():
+            task.cancel()
+            restore()
+
+        try:
+            loop.add_signal_handler(signal.SIGINT, interrupt)
+            installed = True
+        except (NotImplementedError, RuntimeError, ValueError):
+            installed = False  # e.g. on Windows, or outside the main thread
+
+        try:
+            await asyncio.wait([task])
+        finally:
+            if installed:
+                restore()
+            task.cancel()
+
+        if task.cancelled():
+            return True
+        task.result()
+        return False
+
     async def _execute_tool_calls(self, tool_calls: List[ToolCall]) -> List:
         return await self.tool_manager.process_tool_calls(self.agent, tool_calls)
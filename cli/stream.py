@@ -0,0 +1,105 @@
+import re
+
+from typing import List, Optional
+
+
+class MarkdownStream:
+    """Splits streamed Markdown into completed blocks and an open tail.
+
+    A blank line usually ends a block. After a list item or an indented line,
+    though, what follows the blank line may still belong to the list, so the
+    block is only closed once a line that is neither arrives.
+    """
+
+    _FENCES = ("```", "~~~")
+    _LIST_ITEM = re.compile(r"\s*(?:[-*+]|\d{1,9}[.)])(?:\s|$)")
+
+    def __init__(self):
+        self._block: List[str] = []
+        self._blanks: List[str] = []
+        self._partial = ""
+        self._fence: Optional[str] = None
+        self._fence_in_list = False
+
+    @property
+    def tail(self) -> str:
+        """The Markdown of the block that is still being written."""
+        return "".join(self._block + self._blanks) + self._partial
+
+    def feed(self, chunk: str) -> List[str]:
+        """Consume a chunk of text, returning any blocks it completed."""
+        completed = []
+        lines = (self._partial + chunk).split("\n")
+        self._partial = lines.pop()
+
+        for line in lines:
+            block = self._consume_line(line + "\n")
+            if block:
+                completed.append(block)
+
+        return completed
+
+    def flush(self) -> str:
+        """Return whatever is left in the tail and reset the stream."""
+        remaining = self.tail.strip("\n")
+        self._block = []
+        self._blanks = []
+        self._partial = ""
+        self._fence = None
+        return remaining
+
+    def _consume_line(self, line: str) -> Optional[str]:
+        """Add a complete line to the open block, closing it if possible."""
+        stripped = line.strip()
+
+        if self._fence is not None:
+            self._block.append(line)
+            if stripped.startswith(self._fence) and not stripped.strip(self._fence[0]):
+                self._fence = None
+                if not self._fence_in_list:
+                    return self._close_block()
+            return None
+
+        if not stripped:
+            if self._continues_list():
+                self._blanks.append(line)
+                return None
+            return self._close_block()
+
+        previous = None
+        if self._blanks:
+            if self._is_indented(line) or self._LIST_ITEM.match(line):
+                self._block += self._blanks
+                self._blanks = []
+            else:
+                previous = self._close_block()
+
+        fence = next((f for f in self._FENCES if stripped.startswith(f)), None)
+        if fence is not None:
+            # A fence can interrupt a paragraph, so the paragraph is done,
+            # unless the fence is indented into the list before it.
+            self._fence_in_list = self._is_indented(line) and self._continues_list()
+            if not self._fence_in_list:
+                previous = previous or self._close_block()
+            self._fence = stripped[: len(stripped) - len(stripped.lstrip(fence[0]))]
+
+        self._block.append(line)
+        return previous
+
+    def _continues_list(self) -> bool:
+        """Whether the open block ends in a list item or an indented line."""
+        last = next((line for line in reversed(self._block) if line.strip()), None)
+        return last is not None and bool(
+            self._LIST_ITEM.match(last) or self._is_indented(last)
+        )
+
+    @staticmethod
+    def _is_indented(line: str) -> bool:
+        return line[:1] in (" ", "\t")
+
+    def _close_block(self) -> Optional[str]:
+        """Return the open block as a completed one, if it has any content."""
+        block = "".join(self._block).strip("\n")
+        self._block = []
+        self._blanks = []
+        return block or None
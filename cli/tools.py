@@ -1,70 +1,304 @@
 import json
+import time
 import asyncio
+import inspect
 
-from typing import List, Dict, Any
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
 from textwrap import dedent
 
 from sdk.types import Message, Part, ToolCall
+
+from .cache import ResultCache
 from .interface import ChatInterface
+from .metrics import MetricsRecorder
+from .workers import WorkerPool
+
+
+# Tools that change state outside the conversation. These never run alongside
+# another call, so they apply in the order they were called.
+MUTATING_TOOLS = {
+    "add_todo",
+    "clear_todos",
+    "complete_todo",
+    "create_directory",
+    "delete_directory",
+    "delete_file",
+    "move_file",
+    "record_expense",
+    "run_command",
+    "write_file",
+}
+
+# How many lines of a running tool's output are shown live.
+LIVE_OUTPUT_LINES = 12
+
+# Tools that only read state and can safely be called more than once. Their
+# cached results stay fresh while only these tools run.
+READ_ONLY_TOOLS = {
+    "calculate",
+    "get_current_directory",
+    "get_environment_variable",
+    "get_file_size",
+    "get_time",
+    "get_weather",
+    "list_expenses",
+    "list_files",
+    "list_todos",
+    "read_file",
+    "search_files",
+    "summarize_expenses",
+    "web_search",
+}
+
+# Read-only tools that may be started speculatively, before the user has
+# consented to them, since a denied result can simply be thrown away. Tools
+# that read local files or the environment are left out, so nothing is read
+# from the machine that the user has not agreed to.
+SPECULATIVE_TOOLS = {"web_search"}
+
+
+@dataclass
+class ToolOutcome:
+    """The result or error of a single tool call, and how long it took."""
+
+    result: Any
+    error: Optional[Exception]
+    elapsed: float
+    cached: bool = False
 
 
 class ToolManager:
     """Manages tool execution with user consent and clean visual feedback."""
 
-    def __init__(self, interface: ChatInterface):
+    def __init__(
+        self,
+        interface: ChatInterface,
+        max_concurrency: int = 4,
+        speculative: bool = False,
+        metrics: Optional[MetricsRecorder] = None,
+        worker_pool: Optional[WorkerPool] = None,
+    ):
         self.interface = interface
+        self.max_concurrency = max(1, max_concurrency)
+        self.speculative = speculative
+        self.metrics = metrics or MetricsRecorder()
+        self.worker_pool = worker_pool
+        self.result_cache = ResultCache()
+        self._speculative_runs: Dict[int, asyncio.Task] = {}
+        self._speculation_stopped = False
+
+    def speculate(self, model, tool_call: ToolCall):
+        """Start a speculative tool call in the background, ahead of consent.
+
+        Once a response calls a tool that is not read-only, nothing after it in
+        the same response is started, since it may read what that tool changes.
+        """
+        if not self.speculative or self._speculation_stopped:
+            return
+        if tool_call.tool not in READ_ONLY_TOOLS:
+            self._speculation_stopped = True
+            return
+        if tool_call.tool not in SPECULATIVE_TOOLS:
+            return
+
+        key, ttl = self._cache_policy(model, tool_call)
+        if ttl and self.result_cache.get(key)[0]:
+            return
+
+        run = asyncio.create_task(
+            self._execute_tool(model, tool_call.tool, tool_call.parameters)
+        )
+        # Discarded runs are never awaited, so retrieve their errors here.
+        run.add_done_callback(lambda task: task.cancelled() or task.exception())
+        self._speculative_runs[id(tool_call)] = run
+
+    def discard_speculative(self):
+        """Throw away the results of any speculative runs that were not used,
+        ready for the next response.
+        """
+        for task in self._speculative_runs.values():
+            task.cancel()
+        self._speculative_runs.clear()
+        self._speculation_stopped = False
 
     async def process_tool_calls(
         self, model, tool_calls: List[ToolCall]
     ) -> List[Message]:
-        """Execute tool calls with user consent and clean UI."""
+        """Execute tool calls with user consent and clean UI.
+
+        Consent is collected for the whole batch first, then the approved calls
+        run concurrently. Results are returned in the order the calls were made.
+        """
         if not tool_calls:
             return []
 
+        try:
+            with self.metrics.time("consent"):
+                approved, denied = await self._collect_consent(tool_calls)
+
+            started = time.perf_counter()
+            outcomes = await self._execute_batch(model, approved) if approved else []
+            wall_time = time.perf_counter() - started
+            self.metrics.add_time("tools", wall_time)
+        finally:
+            self.discard_speculative()
+
         tool_results = []
         executed_count = 0
         failed_count = 0
+        timings = []
 
-        for i, tool_call in enumerate(tool_calls, 1):
-            tool_name = tool_call.tool
-            arguments = tool_call.parameters
-
-            try:
-                tool_executor = lambda: self._execute_tool(model, tool_name, arguments)
+        for tool_call, outcome in zip(approved, outcomes):
+            timings.append((tool_call.tool, outcome.elapsed))
+            self.interface.show_tool_result(
+                tool_call.tool, outcome.error, outcome.cached
+            )
 
-                result = await self.interface.execute_tool_with_consent(
-                    tool_name, arguments, tool_executor
+            if outcome.error is None:
+                tool_results.append(
+                    self._create_success_message(tool_call, outcome.result)
+                )
+                executed_count += 1
+            else:
+                tool_results.append(
+                    self._create_error_message(tool_call, outcome.error)
                 )
-
-                if result is None:
-                    tool_results.append(self._create_denial_message(tool_call))
-                    self.interface.show_warning(
-                        "\nTool execution sequence aborted by user."
-                    )
-                    break
-                else:
-                    tool_results.append(self._create_success_message(tool_call, result))
-                    executed_count += 1
-
-            except Exception as e:
-                tool_results.append(self._create_error_message(tool_call, e))
                 failed_count += 1
                 self.interface.show_error(
-                    f"Tool {tool_name} execution failed: {str(e)}"
+                    f"Tool {tool_call.tool} execution failed: {str(outcome.error)}",
+                    outcome.error,
                 )
 
+        if denied is not None:
+            tool_results.append(self._create_denial_message(denied))
+            self.interface.show_warning("\nTool execution sequence aborted by user.")
+
         if len(tool_calls) > 1:
             self.interface.show_tools_summary(
-                len(tool_calls), executed_count, failed_count
+                len(tool_calls), executed_count, failed_count, timings, wall_time
             )
 
         return tool_results
 
+    async def _collect_consent(
+        self, tool_calls: List[ToolCall]
+    ) -> Tuple[List[ToolCall], Optional[ToolCall]]:
+        """Ask for consent to each call, stopping at the first denial."""
+        approved = []
+        for tool_call in tool_calls:
+            consent = await self.interface.request_tool_consent(
+                tool_call.tool, tool_call.parameters
+            )
+            if not consent:
+                return approved, tool_call
+            approved.append(tool_call)
+
+        return approved, None
+
+    async def _execute_batch(
+        self, model, tool_calls: List[ToolCall]
+    ) -> List[ToolOutcome]:
+        """Run tool calls concurrently, with each mutating call as a barrier.
+
+        A mutating call starts once every call before it has finished, and the
+        calls after it start once it has finished, so reads on either side of a
+        write see the state the model expects.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(tool_call: ToolCall):
+            async with semaphore:
+                return await self._timed_execute(model, tool_call)
+
+        outcomes = []
+        with self.interface.tool_progress([call.tool for call in tool_calls]):
+            for group in _barrier_groups(tool_calls):
+                outcomes += await asyncio.gather(*(run(call) for call in group))
+        return outcomes
+
+    async def _timed_execute(self, model, tool_call: ToolCall) -> ToolOutcome:
+        """Execute a tool call, capturing its result or error and its runtime.
+
+        Results of cacheable tools are served from the result cache while they
+        are fresh, and the cache is cleared after any other tool that is not
+        read-only runs, since it may change what they would return. If the call
+        was already started speculatively, its run is awaited instead, and only
+        the remaining wait counts towards the runtime.
+        """
+        key, ttl = self._cache_policy(model, tool_call)
+        if ttl:
+            hit, result = self.result_cache.get(key)
+            if hit:
+                return ToolOutcome(result, None, 0.0, cached=True)
+
+        started = time.perf_counter()
+        try:
+            if run := self._speculative_runs.pop(id(tool_call), None):
+                result = await run
+            else:
+                result = await self._execute_tool(
+                    model, tool_call.tool, tool_call.parameters
+                )
+        except Exception as e:
+            return ToolOutcome(None, e, time.perf_counter() - started)
+        finally:
+            self._invalidate(tool_call, ttl)
+
+        if ttl:
+            self.result_cache.put(key, result, ttl)
+        return ToolOutcome(result, None, time.perf_counter() - started)
+
+    def _invalidate(self, tool_call: ToolCall, ttl: Optional[float]):
+        """Clear cached results after a call that may have changed them."""
+        if not ttl and tool_call.tool not in READ_ONLY_TOOLS:
+            self.result_cache.clear()
+
+    def _cache_policy(
+        self, model, tool_call: ToolCall
+    ) -> Tuple[Optional[str], Optional[float]]:
+        """Return the cache key for a call, and how long its result may be kept."""
+        if tool_call.tool in MUTATING_TOOLS:
+            return None, None
+
+        key = self.result_cache.key(tool_call.tool, tool_call.parameters)
+        return key, model.tool_manager.get_ttl(tool_call.tool)
+
     async def _execute_tool(self, model, tool_name: str, arguments: Dict[str, Any]):
-        """Execute the actual tool call."""
-        return await asyncio.to_thread(
-            model.tool_manager.execute_tool, name=tool_name, kwargs=arguments
-        )
+        """Execute the actual tool call.
+
+        Async tools run on the event loop, with their output streamed to the
+        interface as it arrives. Other tools run in a worker process if a pool
+        is set, so they can be timed out and cancelled, or else in a thread.
+        """
+        registry = model.tool_manager
+        tool = registry.tools.get(tool_name)
+        if not inspect.iscoroutinefunction(tool):
+            if tool is not None and self.worker_pool is not None:
+                return await self.worker_pool.run(
+                    registry.get_source(tool_name),
+                    tool_name,
+                    arguments,
+                    registry.get_timeout(tool_name),
+                )
+            return await asyncio.to_thread(
+                model.tool_manager.execute_tool, name=tool_name, kwargs=arguments
+            )
+
+        lines = deque(maxlen=LIVE_OUTPUT_LINES)
+
+        def show_output(line: str):
+            lines.append(line)
+            self.interface.show_tool_output(tool_name, list(lines))
+
+        sink = registry.get_output_sink(tool_name)
+        token = sink.set(show_output) if sink is not None else None
+        try:
+            return await registry.execute_tool(name=tool_name, kwargs=arguments)
+        finally:
+            if token is not None:
+                sink.reset(token)
 
     def _create_denial_message(self, tool_call: ToolCall) -> Message:
         """Create message for denied tool execution."""
@@ -128,3 +362,19 @@ class ToolManager:
                 Part(kind="tool_call", data=tool_call),
             ],
         )
+
+
+def _barrier_groups(tool_calls: List[ToolCall]) -> List[List[ToolCall]]:
+    """Split tool calls into groups that run one after another: each mutating
+    call on its own, and the calls between them together.
+    """
+    groups: List[List[ToolCall]] = []
+    for tool_call in tool_calls:
+        if tool_call.tool in MUTATING_TOOLS:
+            groups.append([tool_call])
+            groups.append([])
+        elif groups:
+            groups[-1].append(tool_call)
+        else:
+            groups.append([tool_call])
+    return [group for group in groups if group]
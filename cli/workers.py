@@ -0,0 +1,273 @@
+import os
+import sys
+import socket
+import struct
+import asyncio
+import builtins
+import subprocess
+import importlib.util
+
+from multiprocessing.connection import Connection
+from multiprocessing.reduction import ForkingPickler
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+# Seconds a tool may run in a worker, unless its module sets a TIMEOUT.
+DEFAULT_TIMEOUT = 60.0
+
+# The address space each worker may use, in MB. Python raises MemoryError in
+# the worker, instead of the machine swapping, when a tool goes past it.
+DEFAULT_MEMORY_LIMIT = 2048
+
+
+class WorkerError(Exception):
+    pass
+
+
+class Worker:
+    """A worker process, and the end of the socket the CLI talks to it through.
+
+    Workers are fresh interpreters rather than forks of the CLI, which has an
+    event loop and threads running, and multiprocessing would import the CLI's
+    own entry point into each of them. They run this file as a script, without
+    its directory on the import path, so they import nothing from the CLI.
+
+    The worker's end is a multiprocessing Connection. The CLI's end is a
+    non-blocking socket that speaks the same framing, so the event loop reads
+    replies as their bytes arrive.
+    """
+
+    def __init__(self, paths: List[str], memory_limit: int):
+        parent, child = socket.socketpair()
+        with child:
+            fd = child.fileno()
+            self.process = subprocess.Popen(
+                [sys.executable, "-P", __file__, str(fd), str(memory_limit)],
+                pass_fds=[fd],
+                stdin=subprocess.DEVNULL,
+                # Ctrl+C is the CLI's to handle, not the workers'.
+                start_new_session=True,
+            )
+        # The worker starts importing its tool modules right away.
+        parent.sendall(_frame(ForkingPickler.dumps(paths)))
+        parent.setblocking(False)
+        self.socket = parent
+        self.ready = False
+
+    def kill(self):
+        self.process.kill()
+        self.process.wait()
+        self.socket.close()
+
+
+class WorkerPool:
+    """Runs tools in a pool of worker processes, with their modules imported.
+
+    A call that runs past its timeout, or that is cancelled, kills its worker,
+    which is replaced by a fresh one. So does a call that runs out of memory or
+    crashes the worker outright. Calls and results are pickled over a socket to
+    each worker, and the event loop waits on the socket without a thread.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        timeout: float = DEFAULT_TIMEOUT,
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+    ):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.paths: List[str] = []
+        self.respawns = 0
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[Worker] = []
+
+    def start(self, paths: List[str]):
+        """Start the workers, each importing the given tool modules up front."""
+        self.paths = list(paths)
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            self._idle.put_nowait(self._spawn())
+
+    def close(self):
+        for worker in self._workers:
+            worker.kill()
+        self._workers.clear()
+        self._idle = None
+
+    async def run(
+        self,
+        path: str,
+        name: str,
+        arguments: Dict[str, Any],
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Call a tool in a worker, raising its error if it fails."""
+        if self._idle is None:
+            self.start([path])
+        timeout = timeout or self.timeout
+
+        worker = await self._idle.get()
+        # Unless it replies, the tool cannot be interrupted, so its worker is
+        # killed: on timeout, on a crash, and when the call is cancelled.
+        replace = True
+        importing = not worker.ready
+        try:
+            if importing:
+                # Importing the tool modules does not count towards the call's
+                # timeout, but has one of its own, in case a module hangs.
+                await asyncio.wait_for(self._handshake(worker), self.timeout)
+                importing = False
+            await _send(worker.socket, (path, name, arguments))
+            reply = await asyncio.wait_for(_receive(worker.socket), timeout)
+            # A worker that ran out of memory may be left in a bad state.
+            replace = reply[0] == "error" and reply[1] == "MemoryError"
+        except asyncio.TimeoutError:
+            if importing:
+                raise TimeoutError(
+                    f"Tool modules did not finish importing within "
+                    f"{self.timeout:g}s, so '{name}' could not run."
+                )
+            raise TimeoutError(f"Tool '{name}' did not finish within {timeout:g}s.")
+        except (EOFError, OSError):
+            raise WorkerError(f"Tool '{name}' crashed its worker process.")
+        finally:
+            if replace:
+                worker = self._replace(worker)
+            self._idle.put_nowait(worker)
+
+        if reply[0] == "ok":
+            return reply[1]
+
+        _, error_name, message = reply
+        raise _rebuild_error(error_name, message)
+
+    async def _handshake(self, worker: Worker):
+        """Wait for a new worker to finish importing its tool modules."""
+        await _receive(worker.socket)
+        worker.ready = True
+
+    def _spawn(self) -> Worker:
+        worker = Worker(self.paths, self.memory_limit)
+        self._workers.append(worker)
+        return worker
+
+    def _replace(self, worker: Worker) -> Worker:
+        worker.kill()
+        self._workers.remove(worker)
+        self.respawns += 1
+        return self._spawn()
+
+
+def _frame(data: bytes) -> bytes:
+    """Prefix a message with its length, as multiprocessing's Connection does."""
+    if len(data) > 0x7FFFFFFF:
+        return struct.pack("!iQ", -1, len(data)) + data
+    return struct.pack("!i", len(data)) + data
+
+
+async def _send(sock: socket.socket, message: Any):
+    loop = asyncio.get_running_loop()
+    await loop.sock_sendall(sock, _frame(ForkingPickler.dumps(message)))
+
+
+async def _receive(sock: socket.socket) -> Any:
+    """Read a message from a worker, as its bytes arrive, without blocking the
+    event loop until the last of them does.
+    """
+    (size,) = struct.unpack("!i", await _receive_exactly(sock, 4))
+    if size == -1:
+        (size,) = struct.unpack("!Q", await _receive_exactly(sock, 8))
+    return ForkingPickler.loads(await _receive_exactly(sock, size))
+
+
+async def _receive_exactly(sock: socket.socket, size: int) -> bytearray:
+    loop = asyncio.get_running_loop()
+    data = bytearray(size)
+    view = memoryview(data)
+    received = 0
+    while received < size:
+        count = await loop.sock_recv_into(sock, view[received:])
+        if not count:
+            raise EOFError
+        received += count
+    return data
+
+
+def _rebuild_error(name: str, message: str) -> Exception:
+    """Recreate a tool's error in the CLI, keeping its type's name.
+
+    Errors defined in tool modules cannot be unpickled outside the worker, so
+    only builtin errors keep their type, and the others get a stand-in.
+    """
+    error_type = getattr(builtins, name, None)
+    if isinstance(error_type, type) and issubclass(error_type, Exception):
+        try:
+            return error_type(message)
+        except Exception:
+            pass
+    return type(name, (Exception,), {})(message)
+
+
+def _worker_main(connection: Connection, memory_limit: int):
+    """Import the tool modules the CLI sends, then serve tool calls from it until
+    the socket is closed.
+    """
+    if memory_limit and resource is not None:
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    try:
+        _serve(connection)
+    except (EOFError, OSError):
+        pass  # the CLI has gone away
+
+
+def _serve(connection: Connection):
+    modules: Dict[str, Tuple[int, Any]] = {}
+    for path in connection.recv():
+        try:
+            _load_module(modules, path)
+        except Exception:
+            pass  # the error is reported when one of its tools is called
+    connection.send(("ready",))
+
+    while True:
+        path, name, arguments = connection.recv()
+        try:
+            result = getattr(_load_module(modules, path), name)(**arguments)
+            if asyncio.iscoroutine(result):
+                result = asyncio.run(result)
+            # A result that cannot be pickled fails here, before it is sent.
+            reply = ForkingPickler.dumps(("ok", result))
+        except Exception as e:
+            reply = ForkingPickler.dumps(("error", type(e).__name__, str(e)))
+        connection.send_bytes(reply)
+
+
+def _load_module(modules: Dict[str, Tuple[int, Any]], path: str):
+    """Import a tool module, again if it has changed since it was imported."""
+    mtime = os.stat(path).st_mtime_ns
+    cached = modules.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    # Tool modules import the helper packages kept next to them.
+    if str(Path(path).parent) not in sys.path:
+        sys.path.append(str(Path(path).parent))
+    spec = importlib.util.spec_from_file_location(Path(path).stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    modules[path] = (mtime, module)
+    return module
+
+
+if __name__ == "__main__":
+    _worker_main(Connection(int(sys.argv[1])), int(sys.argv[2]))
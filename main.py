@@ -1,18 +1,29 @@
 #!/usr/bin/env python3
 
 import asyncio
+from pathlib import Path
 from typing import Optional, List
 
 import typer
 
 from rich.console import Console
-from sdk import OllamaProvider
 
+from cli.batch import BatchRunner, BatchError, load_conversations
+from cli.config import ConfigError, load_config, model_options
+from cli.provider import DEFAULT_MAX_CONTEXT, Provider
+from cli.router import DEFAULT_PINNED_TOOLS
 from cli.session import ChatSession
 from cli.theme import Theme
+from cli.workers import DEFAULT_MEMORY_LIMIT, DEFAULT_TIMEOUT
 from cli.interface import ChatInterface
 
 
+def _positive(value: float) -> float:
+    if value <= 0:
+        raise typer.BadParameter("must be greater than 0")
+    return value
+
+
 app = typer.Typer(
     name="cli",
     help="Offline Function Calling CLI",
@@ -26,8 +37,11 @@ def chat(
     model_name: str = typer.Option(
         "gemma3:12b-fc", "--model", "-m", help="The Ollama model to use"
     ),
-    ollama_host: str = typer.Option(
-        "http://localhost:11434", "--ollama", "-o", help="The Ollama server to use"
+    ollama_hosts: List[str] = typer.Option(
+        ["http://localhost:11434"],
+        "--ollama",
+        "-o",
+        help="An Ollama server to use, repeat to balance requests across several",
     ),
     system_prompt: Optional[str] = typer.Option(
         None, "--system", "-s", help="The system prompt to use"
@@ -35,17 +49,137 @@ def chat(
     tools_dir: Optional[List[str]] = typer.Option(
         None, "--tools", "-t", help="Directory containing tool definitions"
     ),
+    context_budget: int = typer.Option(
+        24000,
+        "--context-budget",
+        help="Approximate tokens of history to keep before compacting old turns",
+    ),
+    watch_tools: bool = typer.Option(
+        False, "--watch-tools", help="Reload changed tools automatically between turns"
+    ),
+    tool_concurrency: int = typer.Option(
+        4, "--tool-concurrency", help="Maximum number of tools to run at once"
+    ),
+    speculative_tools: bool = typer.Option(
+        False,
+        "--speculative-tools",
+        help="Start web searches while the model is still responding",
+    ),
+    isolate_tools: bool = typer.Option(
+        False,
+        "--isolate-tools",
+        help="Run tools in worker processes that can be timed out and killed",
+    ),
+    tool_timeout: float = typer.Option(
+        DEFAULT_TIMEOUT,
+        "--tool-timeout",
+        help="Seconds an isolated tool may run, unless its module sets TIMEOUT",
+    ),
+    tool_memory: int = typer.Option(
+        DEFAULT_MEMORY_LIMIT,
+        "--tool-memory",
+        help="The memory each tool worker may use, in MB (0 for no limit)",
+    ),
+    route_tools: int = typer.Option(
+        0,
+        "--route-tools",
+        help="Send only this many tools most relevant to each message (0 sends all)",
+    ),
+    pinned_tools: Optional[List[str]] = typer.Option(
+        None,
+        "--pin-tool",
+        help="A tool to always send when routing tools "
+        f"(defaults to {', '.join(DEFAULT_PINNED_TOOLS)})",
+    ),
+    cache_size: int = typer.Option(
+        512, "--cache-size", help="Maximum size of the file conversion cache, in MB"
+    ),
+    prefix_diagnostics: bool = typer.Option(
+        False,
+        "--prefix-diagnostics",
+        help="Report how much of each request matched the previous one",
+    ),
+    frame_rate: float = typer.Option(
+        15.0,
+        "--frame-rate",
+        help="Maximum refreshes per second while streaming",
+        callback=_positive,
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None, "--metrics-file", help="Append a JSON line of timings for every turn"
+    ),
+    keep_alive: str = typer.Option(
+        "30m",
+        "--keep-alive",
+        help="How long Ollama keeps the model loaded after a request (e.g. 30m, -1)",
+    ),
+    warm_up: bool = typer.Option(
+        True,
+        "--warm-up/--no-warm-up",
+        help="Load the model and system prompt in the background at startup",
+    ),
+    config_file: Optional[Path] = typer.Option(
+        None, "--config", help="A TOML file of settings and Ollama model options"
+    ),
+    num_ctx: Optional[int] = typer.Option(
+        None, "--num-ctx", help="A fixed context size, instead of sizing it per request"
+    ),
+    max_context: Optional[int] = typer.Option(
+        None, "--max-context", help="The largest context size to grow to, in tokens"
+    ),
+    num_batch: Optional[int] = typer.Option(
+        None, "--num-batch", help="How many prompt tokens Ollama evaluates at once"
+    ),
+    num_thread: Optional[int] = typer.Option(
+        None, "--num-thread", help="How many CPU threads Ollama uses"
+    ),
+    num_predict: Optional[int] = typer.Option(
+        None, "--num-predict", help="The most tokens to generate per response"
+    ),
 ):
     """A CLI for function-calling enabled offline agents."""
 
     console = Console()
     theme = Theme()
-    interface = ChatInterface(console, theme)
+    interface = ChatInterface(console, theme, frame_rate)
+
+    try:
+        settings = load_config(config_file)
+    except ConfigError as e:
+        interface.show_error(str(e))
+        raise typer.Exit(1)
+
+    provider = Provider(
+        model_name,
+        ollama_hosts,
+        keep_alive,
+        model_options(
+            settings,
+            num_ctx=num_ctx,
+            num_batch=num_batch,
+            num_thread=num_thread,
+            num_predict=num_predict,
+        ),
+        max_context or settings.get("max_context", DEFAULT_MAX_CONTEXT),
+    )
 
     config = {
-        "provider": OllamaProvider(model_name, ollama_host),
+        "provider": provider,
         "prompt": system_prompt,
         "tools": tools_dir,
+        "context_budget": context_budget,
+        "watch_tools": watch_tools,
+        "tool_concurrency": tool_concurrency,
+        "speculative_tools": speculative_tools,
+        "isolate_tools": isolate_tools,
+        "tool_timeout": tool_timeout,
+        "tool_memory": tool_memory,
+        "route_tools": route_tools,
+        "pinned_tools": pinned_tools or list(DEFAULT_PINNED_TOOLS),
+        "cache_size": cache_size,
+        "prefix_diagnostics": prefix_diagnostics,
+        "metrics_file": metrics_file,
+        "warm_up": warm_up,
     }
 
     session = ChatSession(interface, config)
@@ -58,5 +192,122 @@ def chat(
         interface.show_farewell()
 
 
+@app.command()
+def batch(
+    input_file: Path = typer.Argument(
+        ..., help="A JSONL file of conversations to replay", exists=True
+    ),
+    output_file: Path = typer.Option(
+        "batch_output.jsonl", "--output", help="Where to write the results, as JSONL"
+    ),
+    model_name: str = typer.Option(
+        "gemma3:12b-fc", "--model", "-m", help="The Ollama model to use"
+    ),
+    ollama_hosts: List[str] = typer.Option(
+        ["http://localhost:11434"],
+        "--ollama",
+        "-o",
+        help="An Ollama server to use, repeat to balance requests across several",
+    ),
+    system_prompt: Optional[str] = typer.Option(
+        None, "--system", "-s", help="The system prompt to use"
+    ),
+    tools_dir: Optional[List[str]] = typer.Option(
+        None, "--tools", "-t", help="Directory containing tool definitions"
+    ),
+    allowed_tools: Optional[List[str]] = typer.Option(
+        None,
+        "--allow-tool",
+        "-a",
+        help="A tool that may run without consent, or '*' for all tools",
+    ),
+    workers: int = typer.Option(
+        4, "--workers", "-w", help="Maximum number of conversations to run at once"
+    ),
+    context_budget: int = typer.Option(
+        24000,
+        "--context-budget",
+        help="Approximate tokens of history to keep before compacting old turns",
+    ),
+    tool_concurrency: int = typer.Option(
+        4, "--tool-concurrency", help="Maximum number of tools to run at once"
+    ),
+    isolate_tools: bool = typer.Option(
+        False,
+        "--isolate-tools",
+        help="Run tools in worker processes that can be timed out and killed",
+    ),
+    tool_timeout: float = typer.Option(
+        DEFAULT_TIMEOUT,
+        "--tool-timeout",
+        help="Seconds an isolated tool may run, unless its module sets TIMEOUT",
+    ),
+    tool_memory: int = typer.Option(
+        DEFAULT_MEMORY_LIMIT,
+        "--tool-memory",
+        help="The memory each tool worker may use, in MB (0 for no limit)",
+    ),
+    route_tools: int = typer.Option(
+        0,
+        "--route-tools",
+        help="Send only this many tools most relevant to each message (0 sends all)",
+    ),
+    pinned_tools: Optional[List[str]] = typer.Option(
+        None,
+        "--pin-tool",
+        help="A tool to always send when routing tools "
+        f"(defaults to {', '.join(DEFAULT_PINNED_TOOLS)})",
+    ),
+    cache_size: int = typer.Option(
+        512, "--cache-size", help="Maximum size of the file conversion cache, in MB"
+    ),
+    config_file: Optional[Path] = typer.Option(
+        None, "--config", help="A TOML file of settings and Ollama model options"
+    ),
+):
+    """Replay conversations from a JSONL file without user interaction."""
+
+    console = Console()
+    theme = Theme()
+    interface = ChatInterface(console, theme)
+
+    try:
+        settings = load_config(config_file)
+    except ConfigError as e:
+        interface.show_error(str(e))
+        raise typer.Exit(1)
+
+    config = {
+        "model": model_name,
+        "hosts": ollama_hosts,
+        "prompt": system_prompt,
+        "tools": tools_dir,
+        "allowed_tools": allowed_tools,
+        "workers": workers,
+        "context_budget": context_budget,
+        "tool_concurrency": tool_concurrency,
+        "isolate_tools": isolate_tools,
+        "tool_timeout": tool_timeout,
+        "tool_memory": tool_memory,
+        "route_tools": route_tools,
+        "pinned_tools": pinned_tools or list(DEFAULT_PINNED_TOOLS),
+        "cache_size": cache_size,
+        "options": model_options(settings),
+        "max_context": settings.get("max_context", DEFAULT_MAX_CONTEXT),
+    }
+
+    try:
+        conversations = load_conversations(input_file)
+    except BatchError as e:
+        interface.show_error(str(e))
+        raise typer.Exit(1)
+
+    runner = BatchRunner(interface, config)
+    summary = asyncio.run(runner.run(conversations, output_file))
+    interface.show_batch_summary(summary, str(output_file))
+    if summary.failed:
+        raise typer.Exit(1)
+
+
 if __name__ == "__main__":
     app()
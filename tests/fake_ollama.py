@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Sequence, Union
+
+
+class FakeOllama:
+    """An Ollama server on localhost that streams a canned reply to every chat
+    request, so the CLI can be tested without a model. Each chunk of the reply
+    is a string of content, or a dict of message fields such as tool calls.
+
+    Chat requests fail with `status`, unless it is 200. Otherwise the first
+    chunk of the reply is sent after `first_chunk_delay` seconds, and each of
+    the others `chunk_delay` seconds after the one before it.
+
+    To stand in for a real model's costs, the first chat request also waits
+    `load_delay` seconds, as if loading the model, and each request waits
+    `prefill_delay` seconds per kilobyte of its tools and messages that do
+    not start the same as the request before it, as if evaluating the part of
+    the prompt that is not already cached.
+    """
+
+    def __init__(
+        self,
+        reply: Sequence[Union[str, Dict[str, Any]]] = ("Hello", " there."),
+        chunk_delay: float = 0.0,
+        first_chunk_delay: float = 0.0,
+        status: int = 200,
+        model: str = "fake",
+        load_delay: float = 0.0,
+        prefill_delay: float = 0.0,
+    ):
+        self.reply = list(reply)
+        self.chunk_delay = chunk_delay
+        self.first_chunk_delay = first_chunk_delay
+        self.status = status
+        self.model = model
+        self.load_delay = load_delay
+        self.prefill_delay = prefill_delay
+        self.requests: List[Dict[str, Any]] = []
+        self.disconnected = threading.Event()
+        self._loaded = False
+        self._cached_prompt = ""
+        self._model_lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeOllama":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def chat_requests(self) -> List[Dict[str, Any]]:
+        return [request for request in self.requests if request["path"] == "/api/chat"]
+
+    def _evaluate(self, body: Dict[str, Any]):
+        """Wait as long as loading the model and evaluating the prompt would."""
+        prompt = json.dumps([body.get("tools"), body.get("messages")])
+        with self._model_lock:
+            if not self._loaded:
+                time.sleep(self.load_delay)
+                self._loaded = True
+
+            cached = len(os.path.commonprefix([prompt, self._cached_prompt]))
+            time.sleep(self.prefill_delay * (len(prompt) - cached) / 1024)
+            self._cached_prompt = prompt
+
+
+def _handler(fake: FakeOllama):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path == "/api/ps":
+                model = {
+                    "name": fake.model,
+                    "model": fake.model,
+                    "size": 2,
+                    "size_vram": 1,
+                }
+                self._send_json(200, {"models": [model]})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            fake.requests.append({"path": self.path, **body})
+
+            if self.path == "/api/show":
+                details = {"parameter_size": "1B", "quantization_level": "Q4_K_M"}
+                self._send_json(
+                    200,
+                    {"details": details, "capabilities": ["tools"], "model_info": {}},
+                )
+            elif self.path != "/api/chat":
+                self._send_json(404, {"error": "not found"})
+            elif fake.status != 200:
+                self._send_json(fake.status, {"error": f"status {fake.status}"})
+            else:
+                fake._evaluate(body)
+                self._stream_reply()
+
+        def _send_json(self, status: int, payload: Dict[str, Any]):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream_reply(self):
+            try:
+                time.sleep(fake.first_chunk_delay)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                for index, text in enumerate(fake.reply):
+                    if index:
+                        time.sleep(fake.chunk_delay)
+                    message = text if isinstance(text, dict) else {"content": text}
+                    self._send_chunk(message, done=False)
+
+                self._send_chunk(
+                    {"content": ""},
+                    done=True,
+                    prompt_eval_count=10,
+                    prompt_eval_duration=1_000_000,
+                    eval_count=len(fake.reply),
+                    eval_duration=2_000_000,
+                )
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                fake.disconnected.set()
+
+        def _send_chunk(self, message: Dict[str, Any], done: bool, **stats):
+            chunk = {
+                "model": fake.model,
+                "created_at": "2025-01-01T00:00:00Z",
+                "message": {"role": "assistant", **message},
+                "done": done,
+                **stats,
+            }
+            data = (json.dumps(chunk) + "\n").encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+    return Handler
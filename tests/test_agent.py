@@ -0,0 +1,41 @@
+import asyncio
+
+from cli.agent import Agent
+from cli.provider import Provider
+from cli.registry import ToolRegistry
+from cli.router import ToolRouter
+
+from fake_ollama import FakeOllama
+
+
+def warm_up(server: FakeOllama, registry: ToolRegistry, router: ToolRouter = None):
+    async def scenario():
+        provider = Provider("fake", server.url)
+        agent = Agent(provider, "Be brief.", tool_registry=registry, tool_router=router)
+        await agent.warm_up()
+
+    asyncio.run(scenario())
+    [request] = server.chat_requests()
+    return [tool["function"]["name"] for tool in request.get("tools") or []]
+
+
+def test_warm_up_primes_every_tool(tmp_path):
+    registry = ToolRegistry(["tools"], index_path=tmp_path / "index.json")
+    with FakeOllama() as server:
+        sent = warm_up(server, registry)
+
+    assert sent == sorted(
+        schema["function"]["name"] for schema in registry.get_schemas()
+    )
+
+
+def test_warm_up_primes_no_tools_when_routing(tmp_path):
+    registry = ToolRegistry(["tools"], index_path=tmp_path / "index.json")
+    router = ToolRouter(top_k=3, pinned=["get_time"])
+    with FakeOllama() as server:
+        sent = warm_up(server, registry, router)
+
+    assert sent == []
+    # The first turn's selection and metrics are left to the first prompt.
+    assert router.last_route is None
+    assert router.selected == set()
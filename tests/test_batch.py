@@ -0,0 +1,61 @@
+import json
+import asyncio
+
+from rich.console import Console
+
+from cli.batch import MAX_TOOL_ROUNDS, BatchRunner, Conversation
+from cli.interface import ChatInterface
+from cli.theme import Theme
+
+from fake_ollama import FakeOllama
+
+
+def batch_config(server: FakeOllama):
+    return {
+        "model": "fake",
+        "hosts": [server.url],
+        "prompt": "Be brief.",
+        "tools": ["tools"],
+        "allowed_tools": ["get_time"],
+        "workers": 1,
+        "context_budget": 24000,
+        "tool_concurrency": 1,
+        "isolate_tools": False,
+        "tool_timeout": None,
+        "tool_memory": None,
+        "route_tools": None,
+        "pinned_tools": [],
+        "cache_size": 16,
+        "options": {},
+        "max_context": 8192,
+    }
+
+
+def test_tool_calls_past_the_round_limit_are_answered(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    # The model asks for the time, again and again.
+    call = {"function": {"name": "get_time", "arguments": {}}}
+    output = tmp_path / "results.jsonl"
+
+    with FakeOllama(reply=[{"tool_calls": [call, call]}]) as server:
+        runner = BatchRunner(
+            ChatInterface(Console(quiet=True), Theme()), batch_config(server)
+        )
+        summary = asyncio.run(runner.run([Conversation("1", ["Time?"])], output))
+
+    [record] = [json.loads(line) for line in output.read_text().splitlines()]
+    assert record["error"] is None
+    assert summary.failed == 0
+    assert record["turns"][0]["tool_rounds"] == MAX_TOOL_ROUNDS
+
+    statuses = [call["status"] for call in record["tool_calls"]]
+    assert statuses == ["ok"] * 2 * MAX_TOOL_ROUNDS + ["skipped"] * 2
+
+    # Every call in the transcript is followed by a result for it.
+    transcript = record["transcript"]
+    for index, message in enumerate(transcript):
+        if message["role"] == "assistant" and message.get("tool_calls"):
+            results = transcript[index + 1 : index + 3]
+            assert [result["role"] for result in results] == ["tool", "tool"]
+    assert transcript[-1]["role"] == "tool"
+    assert "ToolRoundLimitReached" in transcript[-1]["content"]
@@ -0,0 +1,75 @@
+import sys
+import json
+import asyncio
+import subprocess
+
+from pathlib import Path
+
+from cli.cache import ConversionCache
+from cli.files import FileManager
+
+
+def test_conversions_run_off_the_event_loop(tmp_path):
+    paths = []
+    for index in range(3):
+        path = tmp_path / f"table{index}.csv"
+        path.write_text(f"name,count\nrow{index},{index}\n")
+        paths.append(str(path))
+    (tmp_path / "cache").mkdir()
+    manager = FileManager(ConversionCache(directory=tmp_path / "cache"))
+
+    async def scenario():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        try:
+            files = await manager.process_files(paths)
+        finally:
+            ticker.cancel()
+        return files, ticks
+
+    try:
+        files, ticks = asyncio.run(scenario())
+        assert manager._pool is not None
+    finally:
+        manager.close()
+
+    assert manager._pool is None
+    assert [file.name for file in files] == ["table0", "table1", "table2"]
+    assert all(f"row{index}" in file.contents for index, file in enumerate(files))
+    # Starting the conversion workers alone takes many ticks of the loop.
+    assert ticks > 0
+
+
+def test_evicting_entries_prunes_the_index(tmp_path):
+    (tmp_path / "cache").mkdir()
+    cache = ConversionCache(max_bytes=100, directory=tmp_path / "cache")
+    sources = []
+    for index in range(3):
+        source = tmp_path / f"doc{index}.txt"
+        source.write_text(f"document {index}")
+        sources.append(str(source))
+        cache.put(cache.key(str(source)), "x" * 60)
+
+    index = json.loads((tmp_path / "cache" / "index.json").read_text())
+    assert list(index) == sources[-1:]
+    assert cache.get(cache.key(sources[-1])) == "x" * 60
+    assert cache.get(cache.key(sources[0])) is None
+
+
+def test_starting_the_cli_does_not_import_markitdown():
+    code = "import sys, main; print('markitdown' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert output.strip() == "False"
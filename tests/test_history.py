@@ -0,0 +1,103 @@
+import asyncio
+
+from sdk import OllamaProvider
+from sdk.types import Message, Part, ToolCall
+
+from cli.history import CHARS_PER_TOKEN, HistoryManager
+from cli.provider import Provider
+
+from fake_ollama import FakeOllama
+
+
+def text(role: str, data: str) -> Message:
+    return Message(role=role, parts=[Part(kind="text", data=data)])
+
+
+def result(tool: str, data: str) -> Message:
+    call = ToolCall(id=None, tool=tool, parameters={})
+    return Message(
+        role="tool",
+        parts=[Part(kind="text", data=data), Part(kind="tool_call", data=call)],
+    )
+
+
+def conversation(result_tokens: int):
+    """A conversation of three turns, the first of which read a large file."""
+    return [
+        text("system", "Be brief."),
+        text("user", "Read the file."),
+        result("read_file", "x" * result_tokens * CHARS_PER_TOKEN),
+        text("assistant", "It is full of x."),
+        text("user", "And now?"),
+        text("assistant", "Still x."),
+        text("user", "Thanks."),
+    ]
+
+
+def test_only_messages_before_the_kept_turns_are_compacted():
+    history = conversation(2000)
+    original = list(history)
+    manager = HistoryManager(budget=1000, keep_turns=2)
+
+    saved = manager.compact(history)
+
+    assert saved > 0
+    assert manager.usage(history) <= 1000
+    assert "omitted to save context" in history[2].parts[0].data
+    # The system prompt and the last two turns are the same messages as before.
+    assert history[0] is original[0]
+    assert history[4:] == original[4:]
+    assert all(a is b for a, b in zip(history[4:], original[4:]))
+    assert [c.description for c in manager.compactions] == ["Result of read_file"]
+
+
+def test_history_within_the_budget_is_left_alone():
+    history = conversation(100)
+    original = list(history)
+
+    assert HistoryManager(budget=1000).compact(history) == 0
+    assert all(a is b for a, b in zip(history, original))
+
+
+def test_a_large_result_in_the_current_turn_is_cut_to_fit():
+    history = conversation(0)[:5] + [result("read_file", "y" * 40_000)]
+    manager = HistoryManager(budget=1000, keep_turns=2)
+
+    manager.compact(history)
+
+    assert manager.usage(history) <= 1000
+    cut = history[-1].parts[0].data
+    assert cut.startswith("yyyy")
+    assert "characters omitted to save context" in cut
+    assert history[-1].parts[1].kind == "tool_call"
+    assert manager.compactions[-1].description == "Part of result of read_file"
+
+
+def test_the_provider_formats_only_compacted_messages_again(monkeypatch):
+    formatted = []
+    format_message = OllamaProvider._format_message
+
+    def counting(self, message):
+        formatted.append(message)
+        return format_message(self, message)
+
+    monkeypatch.setattr(OllamaProvider, "_format_message", counting)
+    history = conversation(2000)
+    manager = HistoryManager(budget=1000, keep_turns=2)
+
+    with FakeOllama() as server:
+
+        async def scenario():
+            provider = Provider("fake", server.url)
+            async for _ in provider.chat(history):
+                pass
+            first = len(formatted)
+            manager.compact(history)
+            async for _ in provider.chat(history):
+                pass
+            return first
+
+        first = asyncio.run(scenario())
+
+    assert first == len(history)
+    assert formatted[first:] == [history[2]]
@@ -0,0 +1,65 @@
+import io
+import os
+import sys
+import asyncio
+import threading
+
+from rich.console import Console
+
+from cli.interface import ChatInterface
+from cli.theme import Theme
+
+
+def test_tool_progress_renders_while_input_is_pending(monkeypatch):
+    master, slave = os.openpty()
+    monkeypatch.setattr(sys, "stdin", open(slave, encoding="utf-8"))
+    screen = io.StringIO()
+    console = Console(file=screen, force_terminal=True, color_system=None, width=80)
+    interface = ChatInterface(console, Theme(), frame_rate=100)
+
+    # Submits the input anyway, should reading it block the event loop.
+    unblock = threading.Timer(5, os.write, (master, b"late\n\x04"))
+    unblock.start()
+
+    async def scenario():
+        reading = asyncio.create_task(interface.get_user_input())
+        with interface.tool_progress(["run_command"]):
+            for line in range(5):
+                interface.show_tool_output("run_command", [f"line {line}"])
+                await asyncio.sleep(0.05)
+        pending = not reading.done()
+        rendered = screen.getvalue()
+
+        os.write(master, b"hello\n\x04")
+        return pending, rendered, await reading
+
+    try:
+        pending, rendered, text = asyncio.run(scenario())
+    finally:
+        unblock.cancel()
+        sys.stdin.close()
+        os.close(master)
+
+    assert pending
+    assert "Executing run_command" in rendered
+    assert "line 4" in rendered
+    assert text == "hello"
+
+
+def test_a_streamed_response_is_framed_in_one_panel():
+    screen = io.StringIO()
+    console = Console(file=screen, color_system=None, width=40)
+    interface = ChatInterface(console, Theme(), frame_rate=1000)
+
+    interface.start_stream()
+    for chunk in ("First", " paragraph.\n\n- one\n", "\n- two\n\nLast."):
+        interface.update_stream(chunk)
+    interface.stop_stream()
+
+    lines = screen.getvalue().strip("\n").splitlines()
+    borders = [line for line in lines if line[:1] in "╭╰"]
+    assert [line[0] for line in borders] == ["╭", "╰"]
+    assert lines[0].startswith("╭") and lines[-1].startswith("╰")
+    text = " ".join(line.strip("│ ") for line in lines)
+    assert "First paragraph." in text and "Last." in text
+    assert text.index("one") < text.index("two") < text.index("Last.")
@@ -0,0 +1,126 @@
+import socket
+import asyncio
+
+import pytest
+
+from typing import List
+from ollama import ResponseError
+from sdk.types import Message, Part
+
+from cli.hosts import HostPool
+from cli.provider import Provider
+
+from fake_ollama import FakeOllama
+
+
+def user(text: str = "Hi") -> List[Message]:
+    return [Message(role="user", parts=[Part(kind="text", data=text)])]
+
+
+async def reply(provider: Provider) -> str:
+    return "".join([part.data async for part in provider.chat(user())])
+
+
+def unused_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def test_fails_over_when_a_host_errors():
+    with FakeOllama(status=500) as broken, FakeOllama() as working:
+
+        async def scenario():
+            provider = Provider("fake", [broken.url, working.url])
+            return provider, await reply(provider)
+
+        provider, text = asyncio.run(scenario())
+
+    assert text == "Hello there."
+    assert provider.host.url == working.url
+    assert not provider.pool.hosts[0].healthy
+    assert [host.outstanding for host in provider.pool.hosts] == [0, 0]
+
+
+def test_fails_over_when_a_host_is_down():
+    with FakeOllama() as working:
+
+        async def scenario():
+            provider = Provider("fake", [unused_url(), working.url])
+            return provider, await reply(provider)
+
+        provider, text = asyncio.run(scenario())
+
+    assert text == "Hello there."
+    assert provider.host.url == working.url
+    assert provider.last_stats.completion_tokens == 2
+
+
+def test_request_errors_do_not_fail_over():
+    with FakeOllama(status=400) as first, FakeOllama() as second:
+
+        async def scenario():
+            provider = Provider("fake", [first.url, second.url])
+            with pytest.raises(ResponseError):
+                await reply(provider)
+            return provider
+
+        provider = asyncio.run(scenario())
+
+    assert not second.chat_requests()
+    assert all(host.healthy for host in provider.pool.hosts)
+    assert provider.pool.hosts[0].outstanding == 0
+
+
+def test_sticks_to_the_host_of_the_last_request():
+    with FakeOllama() as first, FakeOllama() as second:
+
+        async def scenario():
+            provider = Provider("fake", [first.url, second.url])
+            for _ in range(3):
+                await reply(provider)
+
+        asyncio.run(scenario())
+
+    assert len(first.chat_requests()) == 3
+    assert not second.chat_requests()
+
+
+def test_routes_to_the_least_loaded_host():
+    reply_chunks = ["a", "b", "c", "d"]
+    with (
+        FakeOllama(reply_chunks, chunk_delay=0.05) as first,
+        FakeOllama(reply_chunks, chunk_delay=0.05) as second,
+    ):
+
+        async def scenario():
+            pool = HostPool([first.url, second.url])
+            busy, idle = Provider("fake", pool), Provider("fake", pool)
+            stream = busy.chat(user())
+            await anext(stream)
+            # The busy provider's request is still streaming from its host.
+            assert busy.host.outstanding == 1
+            assert await reply(idle) == "abcd"
+            await stream.aclose()
+            return busy, idle
+
+        busy, idle = asyncio.run(scenario())
+
+    assert busy.host is not idle.host
+    assert [host.outstanding for host in busy.pool.hosts] == [0, 0]
+
+
+def test_cancelling_before_the_first_chunk_releases_the_host():
+    with FakeOllama(first_chunk_delay=1.0) as server:
+
+        async def scenario():
+            provider = Provider("fake", server.url)
+            with pytest.raises(TimeoutError):
+                await asyncio.wait_for(reply(provider), 0.2)
+            return provider
+
+        provider = asyncio.run(scenario())
+        assert server.disconnected.wait(5)
+
+    assert provider.pool.hosts[0].outstanding == 0
+    assert provider.pool.hosts[0].healthy
@@ -0,0 +1,79 @@
+import pytest
+
+from tool_modules import load_tool
+
+
+read_file = load_tool("read_file").read_file
+
+LINES = "".join(f"line {index} \N{GRINNING FACE}\n" for index in range(1, 101))
+
+
+@pytest.mark.parametrize(
+    "encoding",
+    ["utf-8", "utf-8-sig", "utf-16", "utf-16-le", "utf-16-be", "utf-32", "utf-32-be"],
+)
+def test_files_with_any_encoding_are_read_by_line(tmp_path, encoding):
+    path = tmp_path / "lines.txt"
+    if encoding in ("utf-16-le", "utf-16-be", "utf-32-be"):
+        # Write the byte order mark for an explicit byte order by hand.
+        path.write_bytes("\ufeff".encode(encoding) + LINES.encode(encoding))
+    else:
+        path.write_bytes(LINES.encode(encoding))
+    lines = LINES.splitlines(keepends=True)
+
+    assert read_file(str(path)) == LINES
+    assert read_file(str(path), start_line=3, end_line=4)["content"] == "".join(
+        lines[2:4]
+    )
+    assert read_file(str(path), tail_lines=2)["content"] == "".join(lines[-2:])
+
+    # Paging through a file a few bytes at a time returns all of it.
+    pages, start = [], None
+    while True:
+        result = read_file(str(path), start_byte=start, max_bytes=37)
+        pages.append(result["content"])
+        if "next_byte" not in result:
+            break
+        assert result["truncated"]
+        start = result["next_byte"]
+    assert "".join(pages) == LINES
+
+
+def test_tail_lines(tmp_path):
+    path = tmp_path / "tail.txt"
+    path.write_text("one\ntwo\nthree")
+
+    assert read_file(str(path), tail_lines=2)["content"] == "two\nthree"
+    assert read_file(str(path), tail_lines=10)["content"] == "one\ntwo\nthree"
+    empty = read_file(str(path), tail_lines=0)
+    assert empty["content"] == ""
+    assert empty["byte_range"] == [13, 13]
+    assert "next_byte" not in empty
+
+
+def test_next_byte_continues_a_truncated_read(tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_text("é" * 100)
+
+    first = read_file(str(path), max_bytes=51)
+    # A character is not split, so the first page stops a byte short.
+    assert first["byte_range"] == [0, 50]
+    assert first["truncated"]
+    assert first["next_byte"] == 50
+
+    rest = read_file(str(path), start_byte=first["next_byte"])
+    assert first["content"] + rest["content"] == "é" * 100
+    assert not rest["truncated"]
+    assert "next_byte" not in rest
+
+
+def test_ranged_reads_of_empty_files_report_truncated(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("")
+
+    assert read_file(str(path)) == ""
+    assert read_file(str(path), tail_lines=5) == {
+        "content": "",
+        "total_bytes": 0,
+        "truncated": False,
+    }
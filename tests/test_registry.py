@@ -0,0 +1,66 @@
+import asyncio
+import inspect
+
+import pytest
+
+from ollama._utils import convert_function_to_tool
+
+from cli.registry import ToolRegistry, parse_tool_module
+
+from tool_modules import TOOLS, load_tool
+
+
+@pytest.mark.parametrize("path", sorted(TOOLS.glob("*.py")), ids=lambda path: path.stem)
+def test_compiled_schemas_match_the_ollama_client(path):
+    module = load_tool(path.stem)
+    specs = parse_tool_module(path)
+    assert specs
+
+    for spec in specs:
+        function = getattr(module, spec["name"])
+        compiled = spec["schema"]
+        converted = convert_function_to_tool(function).model_dump(exclude_none=True)
+
+        # Unlike the client, parameters that have defaults are not required.
+        defaults = {
+            name
+            for name, parameter in inspect.signature(function).parameters.items()
+            if parameter.default is not inspect.Parameter.empty
+        }
+        required = converted["function"]["parameters"].pop("required", None) or []
+        assert compiled["function"]["parameters"].pop("required") == [
+            name for name in required if name not in defaults
+        ]
+        assert compiled == converted
+
+
+def test_a_helper_package_in_another_tool_directory_does_not_shadow_the_builtin(
+    tmp_path,
+):
+    # Tool directories are on the import path, so a package named like the
+    # builtin tools' helpers would be imported in their place.
+    (tmp_path / "_shared").mkdir()
+    (tmp_path / "_shared" / "__init__.py").write_text("VALUE = 'custom'\n")
+    (tmp_path / "custom.py").write_text(CUSTOM)
+    registry = ToolRegistry(
+        [str(tmp_path), str(TOOLS)], index_path=tmp_path / "index.json"
+    )
+
+    assert registry.execute_tool("custom_value", {}) == "custom"
+    result = asyncio.run(registry.execute_tool("run_command", {"command": "echo hi"}))
+    assert result["stdout"] == "hi\n"
+
+
+CUSTOM = '''
+from _shared import VALUE
+
+
+def custom_value():
+    """
+    Returns a value from this directory's helper package.
+
+    Returns:
+        str: The value.
+    """
+    return VALUE
+'''
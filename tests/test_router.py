@@ -0,0 +1,60 @@
+import pytest
+
+from cli.registry import ToolRegistry
+from cli.router import DEFAULT_PINNED_TOOLS, ToolRouter
+
+
+@pytest.fixture(scope="module")
+def schemas(tmp_path_factory):
+    index = tmp_path_factory.mktemp("index") / "index.json"
+    return ToolRegistry(["tools"], index_path=index).get_schemas()
+
+
+def names(schemas):
+    return {schema["function"]["name"] for schema in schemas}
+
+
+@pytest.mark.parametrize(
+    "prompt, best",
+    [
+        ("What is the weather like in Lisbon?", "get_weather"),
+        ("Scrape the text of this web page URL", "scrape_url"),
+        ("Add buy milk to my todo list", "add_todo"),
+        ("Record an expense of 12 euros for lunch", "record_expense"),
+    ],
+)
+def test_the_most_relevant_tool_ranks_first(schemas, prompt, best):
+    router = ToolRouter(top_k=3)
+    router.route(schemas, prompt)
+    assert router.rank(prompt)[0] == best
+
+
+def test_the_top_tools_and_the_pinned_ones_are_sent(schemas):
+    router = ToolRouter(top_k=2, pinned=["get_time"])
+    prompt = "What is the weather like in Lisbon?"
+
+    routed = router.route(schemas, prompt)
+
+    assert names(routed) == {"get_time", *router.rank(prompt)[:2]}
+    assert router.last_route.sent == len(routed)
+    assert router.last_route.total == len(schemas)
+    assert router.last_route.tokens_saved > 0
+
+
+def test_core_tools_are_pinned_by_default(schemas):
+    routed = ToolRouter(top_k=1).route(schemas, "What is the weather like?")
+    assert names(routed) == {"get_weather", *DEFAULT_PINNED_TOOLS}
+
+
+def test_a_call_to_a_tool_not_sent_expands_the_turn_to_every_tool(schemas):
+    router = ToolRouter(top_k=1, pinned=[])
+    first = router.route(schemas, "What is the weather like?")
+    router.observe(["get_weather"])
+    assert router.route(schemas, None) == first
+
+    router.observe(["get_time"])
+    assert router.route(schemas, None) == schemas
+    assert router.last_route.tokens_saved == 0
+
+    # The next prompt starts a new selection.
+    assert router.route(schemas, "What is the weather like?") == first
@@ -0,0 +1,43 @@
+import sys
+import asyncio
+
+from tool_modules import load_tool
+
+
+run_command = load_tool("run_command")
+
+BUSY = f'{sys.executable} -c "import time\nend = time.process_time() + 0.5\nwhile time.process_time() < end: pass"'
+IDLE = f'{sys.executable} -c "import time; time.sleep(1)"'
+
+
+def test_cpu_time_is_counted_for_each_command_alone():
+    async def scenario():
+        return await asyncio.gather(
+            run_command.run_command(BUSY), run_command.run_command(IDLE)
+        )
+
+    busy, idle = asyncio.run(scenario())
+
+    assert busy["returncode"] == idle["returncode"] == 0
+    assert busy["cpu_seconds"] >= 0.5
+    # The idle command finishes after the busy one, so a count of all the
+    # children reaped while it ran would include the busy command's time too.
+    assert idle["cpu_seconds"] < 0.3
+
+
+def test_output_and_timeouts():
+    async def scenario():
+        return await asyncio.gather(
+            run_command.run_command("echo out; echo err >&2; exit 3"),
+            run_command.run_command("sleep 30", timeout=0.5),
+        )
+
+    finished, stopped = asyncio.run(scenario())
+
+    assert finished["stdout"] == "out\n"
+    assert finished["stderr"] == "err\n"
+    assert finished["returncode"] == 3
+    assert not finished["timed_out"]
+    assert stopped["timed_out"]
+    assert stopped["returncode"] == -15
+    assert stopped["elapsed_seconds"] < 5
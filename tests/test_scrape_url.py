@@ -0,0 +1,141 @@
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from tool_modules import load_tool
+
+
+scrape_url = load_tool("scrape_url")
+
+# Saved from documentation that ships with the Rust toolchain (MIT/Apache-2.0),
+# Node.js (MIT), npm (Artistic-2.0) and the racc gem (BSD-2-Clause).
+PAGES = Path(__file__).resolve().parent / "fixtures" / "pages"
+
+
+def extract(html: str) -> str:
+    extractor = scrape_url._ContentExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor.content()
+
+
+@pytest.mark.parametrize(
+    "page, expected, boilerplate",
+    [
+        (
+            "rustc-book.html",
+            [
+                'Welcome to "The rustc book"! rustc is the compiler',
+                "$ rustc main.rs",
+                "the crate is a translation unit, not a\nparticular module.",
+            ],
+            ["Keyboard shortcuts", "Command-line Arguments"],
+        ),
+        (
+            "nodejs-docs.html",
+            [
+                "An example of a web server written with Node.js",
+                "node hello-world.js",
+                "the server is working.",
+            ],
+            ["Node.js v20.19.5 documentation", "Index", "Assertion testing"],
+        ),
+        (
+            "npm-docs.html",
+            [
+                "npm link [<package-spec>]",
+                "Package linking is a two-step process.",
+                "install-links",
+            ],
+            ["npm-link\n", "Table of contents"],
+        ),
+    ],
+)
+def test_extracts_the_main_content_of_saved_pages(page, expected, boilerplate):
+    text = extract((PAGES / page).read_text(encoding="utf-8"))
+
+    for snippet in expected:
+        assert snippet in text
+    for snippet in boilerplate:
+        assert snippet not in text
+
+
+def test_keeps_pages_wrapped_in_a_form():
+    html = (
+        "<html><body><form id='aspnetForm'><div><h1>Title</h1>"
+        "<p>Main article text, long enough to be scored as a paragraph.</p>"
+        "<select><option>Choose one</option></select></div></form></body></html>"
+    )
+
+    assert extract(html) == (
+        "Title\nMain article text, long enough to be scored as a paragraph."
+    )
+
+
+def test_keeps_article_headers_but_not_page_headers():
+    html = (
+        "<body><header><h1>Site name</h1></header>"
+        "<article><header><h1>Headline</h1></header><p>Body.</p></article></body>"
+    )
+
+    assert extract(html) == "Headline\nBody."
+
+
+class _Page(BaseHTTPRequestHandler):
+    body = b""
+    content_type = "text/html"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", self.content_type)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+
+def serve(body: bytes, content_type: str = "text/html") -> str:
+    handler = type("Page", (_Page,), {"body": body, "content_type": content_type})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return f"http://{host}:{port}/"
+
+
+@pytest.mark.parametrize(
+    "declaration",
+    [
+        '<meta charset="iso-8859-1">',
+        '<meta http-equiv="Content-Type" content="text/html; charset=iso-8859-1">',
+    ],
+)
+def test_uses_the_encoding_declared_in_the_page(declaration):
+    html = (
+        f"<html><head>{declaration}<title>Café</title></head>"
+        "<body><p>Le café était fermé, à côté de l'église.</p></body></html>"
+    )
+    result = scrape_url.scrape_url(serve(html.encode("iso-8859-1")))
+
+    assert result == (
+        "Title: Café\n\nContent:\nLe café était fermé, à côté de l'église."
+    )
+
+
+def test_detects_the_encoding_of_undeclared_pages():
+    html = (PAGES / "racc-usage-ja.html").read_text(encoding="utf-8")
+    result = scrape_url.scrape_url(serve(html.encode("euc-jp")))
+
+    assert "Racc は文法規則から Ruby で書かれたパーサを生成する" in result
+    assert "�" not in result
+
+
+def test_prefers_the_charset_of_the_response():
+    html = '<meta charset="iso-8859-1"><p>Déjà vu, once again.</p>'
+    url = serve(html.encode("utf-8"), "text/html; charset=utf-8")
+
+    assert scrape_url.scrape_url(url).endswith("Déjà vu, once again.")
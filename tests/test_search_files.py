@@ -0,0 +1,158 @@
+import os
+
+from tool_modules import load_tool
+
+
+search_files = load_tool("search_files").search_files
+
+
+def make_tree(root, files):
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def found(root, pattern="*"):
+    result = search_files(str(root), pattern, max_results=1000)
+    assert result["next_offset"] is None
+    return sorted(
+        os.path.relpath(path, root).replace(os.sep, "/") for path in result["matches"]
+    )
+
+
+def test_negated_patterns_include_files_again(tmp_path):
+    make_tree(
+        tmp_path,
+        {
+            ".gitignore": "*.log\n!keep.log\n",
+            "debug.log": "",
+            "keep.log": "",
+            "logs/trace.log": "",
+            "logs/keep.log": "",
+        },
+    )
+
+    assert found(tmp_path, "*.log") == ["keep.log", "logs/keep.log"]
+
+
+def test_directory_only_patterns_do_not_match_files(tmp_path):
+    make_tree(
+        tmp_path,
+        {
+            ".gitignore": "build/\n",
+            "build/output.txt": "",
+            "src/build/output.txt": "",
+            "docs/build": "",
+        },
+    )
+
+    assert found(tmp_path) == [".gitignore", "docs/build"]
+
+
+def test_patterns_with_a_slash_are_anchored_to_their_gitignore(tmp_path):
+    make_tree(
+        tmp_path,
+        {
+            ".gitignore": "/config.py\ndocs/*.md\n",
+            "config.py": "",
+            "src/config.py": "",
+            "docs/index.md": "",
+            "src/docs/index.md": "",
+        },
+    )
+
+    assert found(tmp_path, "*.*") == [
+        ".gitignore",
+        "src/config.py",
+        "src/docs/index.md",
+    ]
+
+
+def test_nested_gitignores_apply_below_their_directory(tmp_path):
+    make_tree(
+        tmp_path,
+        {
+            ".gitignore": "*.tmp\n",
+            "generated.py": "",
+            "scratch.tmp": "",
+            "app/.gitignore": "generated.py\n!wanted.tmp\n",
+            "app/generated.py": "",
+            "app/main.py": "",
+            "app/wanted.tmp": "",
+            "app/other.tmp": "",
+            "app/module/generated.py": "",
+            "lib/generated.py": "",
+        },
+    )
+
+    assert found(tmp_path, "*.py") == [
+        "app/main.py",
+        "generated.py",
+        "lib/generated.py",
+    ]
+    assert found(tmp_path, "*.tmp") == ["app/wanted.tmp"]
+
+
+def test_pages_cover_every_match_once_in_a_stable_order(tmp_path):
+    make_tree(
+        tmp_path,
+        {f"d{index % 3}/file{index}.txt": "" for index in range(10)},
+    )
+    everything = search_files(str(tmp_path), "*.txt")
+    assert everything["next_offset"] is None
+    assert len(everything["matches"]) == 10
+
+    pages, offset = [], 0
+    while offset is not None:
+        page = search_files(str(tmp_path), "*.txt", max_results=4, offset=offset)
+        assert set(page) == {"matches", "next_offset"}
+        pages.append(page["matches"])
+        offset = page["next_offset"]
+
+    assert [len(page) for page in pages] == [4, 4, 2]
+    assert sum(pages, []) == everything["matches"]
+
+
+def test_a_full_last_page_has_no_next_offset(tmp_path):
+    make_tree(tmp_path, {f"file{index}.txt": "" for index in range(4)})
+
+    first = search_files(str(tmp_path), "*.txt", max_results=2)
+    last = search_files(str(tmp_path), "*.txt", max_results=2, offset=2)
+
+    assert first["next_offset"] == 2
+    assert len(last["matches"]) == 2
+    assert last["next_offset"] is None
+    assert search_files(str(tmp_path), "*.txt", offset=4) == {
+        "matches": [],
+        "next_offset": None,
+    }
+
+
+def test_content_matches_name_the_first_matching_line(tmp_path):
+    make_tree(
+        tmp_path,
+        {
+            "a.py": "import os\nimport sys\n",
+            "b.py": "print('no imports')\n",
+            "c.py": "\n\nimport sys\n",
+        },
+    )
+
+    result = search_files(str(tmp_path), "*.py", contains=r"^import sys")
+
+    assert result == {
+        "matches": [
+            {
+                "path": str(tmp_path / "a.py"),
+                "line_number": 2,
+                "line": "import sys",
+            },
+            {
+                "path": str(tmp_path / "c.py"),
+                "line_number": 3,
+                "line": "import sys",
+            },
+        ],
+        "next_offset": None,
+    }
@@ -0,0 +1,89 @@
+import os
+import signal
+import asyncio
+
+import pytest
+
+from rich.console import Console
+
+from cli.agent import INTERRUPTED_MARKER
+from cli.interface import ChatInterface
+from cli.provider import Provider
+from cli.session import ChatSession
+from cli.theme import Theme
+
+from fake_ollama import FakeOllama
+
+
+def session_config(provider: Provider):
+    return {
+        "provider": provider,
+        "prompt": "Be brief.",
+        "tools": "tools",
+        "context_budget": 8192,
+        "watch_tools": False,
+        "tool_concurrency": 4,
+        "speculative_tools": False,
+        "isolate_tools": False,
+        "tool_timeout": 30.0,
+        "tool_memory": 512,
+        "route_tools": 0,
+        "pinned_tools": [],
+        "cache_size": 16,
+        "prefix_diagnostics": False,
+        "metrics_file": None,
+        "warm_up": False,
+    }
+
+
+@pytest.mark.parametrize(
+    "first_chunk_delay, chunk_delay, interrupt_after",
+    [(2.0, 0.0, 0.3), (0.0, 0.1, 0.35)],
+    ids=["before the first chunk", "after the first chunk"],
+)
+def test_interrupting_a_response(
+    monkeypatch, tmp_path, first_chunk_delay, chunk_delay, interrupt_after
+):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    reply = [f"word{index} " for index in range(20)]
+
+    with FakeOllama(reply) as server:
+
+        async def scenario():
+            provider = Provider("fake", server.url)
+            interface = ChatInterface(Console(quiet=True), Theme())
+            session = ChatSession(interface, session_config(provider))
+            await session._initialize_model()
+            await session._process_user_message("Hi")
+
+            server.first_chunk_delay = first_chunk_delay
+            server.chunk_delay = chunk_delay
+            asyncio.get_running_loop().call_later(
+                interrupt_after, os.kill, os.getpid(), signal.SIGINT
+            )
+            await session._process_user_message("Hi again")
+            return session
+
+        session = asyncio.run(scenario())
+        assert server.disconnected.wait(5)
+
+    # What was received is kept, ending with the marker.
+    [partial] = session.agent.history[-1].parts
+    assert session.agent.history[-1].role == "assistant"
+    assert partial.data.endswith(INTERRUPTED_MARKER)
+    received = partial.data.removesuffix(INTERRUPTED_MARKER)
+    assert "".join(reply).startswith(received)
+    assert bool(received) == (first_chunk_delay == 0)
+
+    provider = session.agent.model_provider
+    assert [host.outstanding for host in provider.pool.hosts] == [0]
+
+    # Only the finished response is counted, and its stats only once.
+    first, interrupted = session.metrics.turns
+    assert (first.requests, first.prompt_tokens, first.completion_tokens) == (
+        1,
+        10,
+        20,
+    )
+    assert (interrupted.requests, interrupted.prompt_tokens) == (0, 0)
+    assert session.metrics.totals().prompt_tokens == 10
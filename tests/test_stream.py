@@ -0,0 +1,59 @@
+import pytest
+
+from cli.stream import MarkdownStream
+
+
+def blocks(text: str, size: int = 3):
+    """Stream text in small chunks, returning every block it is split into."""
+    stream = MarkdownStream()
+    completed = []
+    for start in range(0, len(text), size):
+        completed += stream.feed(text[start : start + size])
+    if tail := stream.flush():
+        completed.append(tail)
+    return completed
+
+
+@pytest.mark.parametrize("size", [1, 3, 1000])
+def test_paragraphs_are_split_at_blank_lines(size):
+    text = "First paragraph,\nstill first.\n\nSecond.\n\n\nThird."
+    assert blocks(text, size) == ["First paragraph,\nstill first.", "Second.", "Third."]
+
+
+def test_a_loose_list_stays_in_one_block():
+    text = "- one\n\n- two\n\n  more about two\n\n1. three\n\nAfter the list.\n"
+    assert blocks(text) == [
+        "- one\n\n- two\n\n  more about two\n\n1. three",
+        "After the list.",
+    ]
+
+
+def test_a_table_stays_in_one_block():
+    table = "| a | b |\n|---|---|\n| 1 | 2 |\n| 3 | 4 |"
+    assert blocks(f"Intro.\n\n{table}\n\nOutro.") == ["Intro.", table, "Outro."]
+
+
+def test_fences_keep_blank_lines_and_interrupt_paragraphs():
+    fence = "```python\nfirst()\n\n\nsecond()\n```"
+    assert blocks(f"Some code:\n{fence}\nDone.") == ["Some code:", fence, "Done."]
+
+
+def test_a_fence_inside_a_list_item_stays_with_the_list():
+    text = "1. Run:\n\n   ```sh\n   make\n\n   ```\n2. Check.\n\nDone.\n"
+    assert blocks(text) == [
+        "1. Run:\n\n   ```sh\n   make\n\n   ```\n2. Check.",
+        "Done.",
+    ]
+
+
+def test_the_tail_is_the_open_block():
+    stream = MarkdownStream()
+    assert stream.feed("Done.\n\n- item\n\n") == ["Done."]
+    assert stream.tail == "- item\n\n"
+    assert stream.feed("Next") == []
+    assert stream.feed(" paragraph\n") == ["- item"]
+    assert stream.tail == "Next paragraph\n"
+
+
+def test_flushing_after_a_list_keeps_what_follows_it_apart():
+    assert blocks("- item\n\nAfter") == ["- item\n\nAfter"]
@@ -0,0 +1,156 @@
+import asyncio
+
+from types import SimpleNamespace
+
+from rich.console import Console
+
+from sdk.types import ToolCall
+
+from cli.cache import ResultCache
+from cli.interface import ChatInterface
+from cli.registry import ToolRegistry
+from cli.theme import Theme
+from cli.tools import ToolManager
+
+
+LOOKUP = '''
+import itertools
+
+CACHE_TTL = 60
+
+_calls = itertools.count()
+
+
+def lookup(key: str):
+    """
+    Looks up a key.
+
+    Args:
+        key (str): The key to look up.
+
+    Returns:
+        int: How many lookups were made before this one.
+    """
+    return next(_calls)
+'''
+
+NOTES = '''
+def save_note(text: str):
+    """
+    Saves a note.
+
+    Args:
+        text (str): The note.
+
+    Returns:
+        str: The note.
+    """
+    return text
+'''
+
+
+def test_result_cache_evicts_the_least_recently_used_entry():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1, ttl=60)
+    cache.put("b", 2, ttl=60)
+    assert cache.get("a") == (True, 1)
+
+    cache.put("c", 3, ttl=60)
+
+    assert len(cache) == 2
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+
+
+def test_tools_that_are_not_read_only_clear_cached_results(tmp_path):
+    (tmp_path / "lookup.py").write_text(LOOKUP)
+    (tmp_path / "notes.py").write_text(NOTES)
+    registry = ToolRegistry([str(tmp_path)], index_path=tmp_path / "index.json")
+    model = SimpleNamespace(tool_manager=registry)
+    interface = ChatInterface(Console(quiet=True), Theme())
+    manager = ToolManager(interface)
+
+    async def consent(tool_name, arguments):
+        return True
+
+    interface.request_tool_consent = consent
+
+    async def call(tool, **parameters):
+        [message] = await manager.process_tool_calls(
+            model, [ToolCall(id=tool, tool=tool, parameters=parameters)]
+        )
+        return message.parts[0].data
+
+    async def scenario():
+        return [
+            await call("lookup", key="x"),
+            await call("lookup", key="x"),
+            await call("save_note", text="changed"),
+            await call("lookup", key="x"),
+        ]
+
+    first, cached, _, refreshed = asyncio.run(scenario())
+    assert '"result": 0' in first
+    assert '"result": 0' in cached
+    assert '"result": 1' in refreshed
+
+
+SEARCH = '''
+import time
+
+
+def web_search(query: str):
+    """
+    Searches the web.
+
+    Args:
+        query (str): What to search for.
+
+    Returns:
+        str: The results.
+    """
+    time.sleep(0.2)
+    return "speculative results"
+'''
+
+
+def test_speculative_results_are_discarded_when_consent_is_denied(tmp_path):
+    (tmp_path / "web_search.py").write_text(SEARCH)
+    registry = ToolRegistry([str(tmp_path)], index_path=tmp_path / "index.json")
+    model = SimpleNamespace(tool_manager=registry)
+    interface = ChatInterface(Console(quiet=True), Theme())
+    manager = ToolManager(interface, speculative=True)
+
+    async def deny(tool_name, arguments):
+        return False
+
+    interface.request_tool_consent = deny
+    tool_call = ToolCall(id="1", tool="web_search", parameters={"query": "x"})
+
+    async def scenario():
+        manager.speculate(model, tool_call)
+        run = manager._speculative_runs[id(tool_call)]
+        messages = await manager.process_tool_calls(model, [tool_call])
+        await asyncio.sleep(0)
+        return run, messages
+
+    run, [message] = asyncio.run(scenario())
+    assert run.cancelled()
+    assert manager._speculative_runs == {}
+    assert "ToolExecutionDenied" in message.parts[0].data
+    assert "speculative results" not in message.parts[0].data
+
+
+def test_only_web_searches_are_started_speculatively(tmp_path):
+    manager = ToolManager(ChatInterface(Console(quiet=True), Theme()), speculative=True)
+    registry = ToolRegistry(["tools"], index_path=tmp_path / "index.json")
+    model = SimpleNamespace(tool_manager=registry)
+
+    async def scenario():
+        manager.speculate(
+            model, ToolCall(id="1", tool="read_file", parameters={"file_path": "x"})
+        )
+        return dict(manager._speculative_runs)
+
+    assert asyncio.run(scenario()) == {}
@@ -0,0 +1,23 @@
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from tool_modules import load_tool
+
+
+web_search = load_tool("web_search")
+
+
+def test_each_thread_reuses_a_client_of_its_own():
+    barrier = threading.Barrier(2)
+
+    def clients(_):
+        # Both calls wait for each other, so each runs on its own thread.
+        barrier.wait()
+        return web_search._get_client(), web_search._get_client()
+
+    with ThreadPoolExecutor(2) as pool:
+        (first, again), (second, _) = pool.map(clients, range(2))
+
+    assert first is again
+    assert first is not second
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from cli.workers import WorkerError, WorkerPool
+
+
+TOOLS = """
+import os
+import time
+
+def echo(value):
+    return value
+
+def sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+def hog():
+    return bytearray(1024 ** 3)
+
+def crash():
+    os._exit(1)
+"""
+
+
+@pytest.fixture
+def tools(tmp_path):
+    path = tmp_path / "tools.py"
+    path.write_text(TOOLS)
+    return str(path)
+
+
+def run_pool(pool: WorkerPool, paths, scenario):
+    async def main():
+        pool.start(paths)
+        try:
+            return await scenario()
+        finally:
+            pool.close()
+
+    return asyncio.run(main())
+
+
+def test_timeout_kills_and_respawns_the_worker(tools):
+    pool = WorkerPool(1, timeout=5)
+
+    async def scenario():
+        [first] = pool._workers
+        with pytest.raises(TimeoutError, match="did not finish within 0.5s"):
+            await pool.run(tools, "sleep", {"seconds": 30}, timeout=0.5)
+        [second] = pool._workers
+        assert first.process.poll() is not None
+        return second is not first, await pool.run(tools, "echo", {"value": 3})
+
+    assert run_pool(pool, [tools], scenario) == (True, 3)
+    assert pool.respawns == 1
+
+
+def test_running_out_of_memory_raises_and_respawns(tools):
+    pool = WorkerPool(1, memory_limit=256)
+
+    async def scenario():
+        with pytest.raises(MemoryError):
+            await pool.run(tools, "hog", {})
+        return await pool.run(tools, "echo", {"value": "still here"})
+
+    assert run_pool(pool, [tools], scenario) == "still here"
+    assert pool.respawns == 1
+
+
+def test_a_crash_respawns_the_worker(tools):
+    pool = WorkerPool(1)
+
+    async def scenario():
+        with pytest.raises(WorkerError):
+            await pool.run(tools, "crash", {})
+        return await pool.run(tools, "echo", {"value": 1})
+
+    assert run_pool(pool, [tools], scenario) == 1
+    assert pool.respawns == 1
+
+
+def test_a_module_that_hangs_on_import_times_out(tools, tmp_path):
+    hanging = tmp_path / "hanging.py"
+    hanging.write_text("import time\ntime.sleep(30)\n")
+    pool = WorkerPool(1, timeout=0.5)
+
+    async def scenario():
+        with pytest.raises(TimeoutError, match="did not finish importing"):
+            await pool.run(tools, "echo", {"value": 1})
+
+    run_pool(pool, [tools, str(hanging)], scenario)
+    assert pool.respawns == 1
+
+
+def test_large_results_arrive_whole(tools):
+    pool = WorkerPool(1)
+    value = bytes(range(256)) * (64 * 1024)
+
+    async def scenario():
+        return await pool.run(tools, "echo", {"value": value})
+
+    assert run_pool(pool, [tools], scenario) == value
@@ -0,0 +1,176 @@
+import os
+import pickle
+import sqlite3
+
+from contextlib import closing
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+
+DATA_DIR = os.path.expanduser("~/data")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS expenses (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    category TEXT NOT NULL COLLATE NOCASE,
+    amount REAL NOT NULL,
+    description TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS expenses_by_date ON expenses (date);
+CREATE INDEX IF NOT EXISTS expenses_by_category ON expenses (category, date);
+CREATE TABLE IF NOT EXISTS migrations (name TEXT PRIMARY KEY);
+"""
+
+_INSERT = (
+    "INSERT INTO expenses (date, category, amount, description) "
+    "VALUES (:date, :category, :amount, :description)"
+)
+
+_GROUPS = {
+    "category": ["category"],
+    "month": ["substr(date, 1, 7) AS month"],
+    "category_month": ["category", "substr(date, 1, 7) AS month"],
+}
+
+
+class ExpenseStoreError(Exception):
+    pass
+
+
+class ExpenseStore:
+    """Stores expenses in SQLite, indexed by date and category.
+
+    The database runs in WAL mode, so recording an expense is a single indexed
+    insert. Expenses saved by older versions in `expenses.pkl` are migrated the
+    first time one is recorded. Reads change nothing on disk, since they may run
+    speculatively, before the user has consented to them.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.data_dir = data_dir
+        self.path = os.path.join(data_dir, "expenses.db")
+        self.legacy_path = os.path.join(data_dir, "expenses.pkl")
+
+    def add(self, category: str, amount: float, date: str, description: str = ""):
+        with closing(self._connect(write=True)) as db, db:
+            db.execute(
+                _INSERT,
+                {
+                    "date": date,
+                    "category": category,
+                    "amount": amount,
+                    "description": description,
+                },
+            )
+
+    def list(
+        self,
+        category: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the matching expenses, oldest first."""
+        where, params = self._filters(category, start_date, end_date)
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "SELECT category, amount, date, description FROM expenses"
+                f"{where} ORDER BY date, id",
+                params,
+            )
+            return [dict(row) for row in rows]
+
+    def summarize(
+        self,
+        group_by: str = "category",
+        category: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the count and total of the matching expenses, per group."""
+        if group_by not in _GROUPS:
+            raise ValueError(
+                f"Invalid group_by: {group_by}. Must be one of {', '.join(_GROUPS)}."
+            )
+
+        columns = _GROUPS[group_by]
+        keys = ", ".join(column.split(" AS ")[-1] for column in columns)
+        where, params = self._filters(category, start_date, end_date)
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                f"SELECT {', '.join(columns)}, COUNT(*) AS count, "
+                f"ROUND(SUM(amount), 2) AS total FROM expenses{where} "
+                f"GROUP BY {keys} ORDER BY {keys}",
+                params,
+            )
+            return [dict(row) for row in rows]
+
+    def _filters(self, category, start_date, end_date):
+        clauses, params = [], []
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if start_date is not None:
+            clauses.append("date >= ?")
+            params.append(start_date)
+        if end_date is not None:
+            clauses.append("date <= ?")
+            params.append(end_date)
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def _connect(self, write: bool = False) -> sqlite3.Connection:
+        """Open the database, creating it and migrating legacy expenses only to
+        write to it. Until something is written, reads see the legacy expenses
+        through an in-memory copy.
+        """
+        if write:
+            os.makedirs(self.data_dir, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+            if os.path.exists(self.legacy_path):
+                self._migrate(db)
+        elif os.path.exists(self.path):
+            uri = f"{Path(self.path).resolve().as_uri()}?mode=ro"
+            db = sqlite3.connect(uri, uri=True, timeout=10)
+        else:
+            db = sqlite3.connect(":memory:")
+            db.executescript(_SCHEMA)
+            if os.path.exists(self.legacy_path):
+                db.executemany(_INSERT, self._legacy_expenses())
+
+        db.row_factory = sqlite3.Row
+        return db
+
+    def _migrate(self, db: sqlite3.Connection):
+        """Import expenses from the legacy pickle file, exactly once."""
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            done = db.execute("SELECT 1 FROM migrations WHERE name = 'pickle'")
+            if done.fetchone():
+                db.rollback()
+                return
+
+            db.executemany(_INSERT, self._legacy_expenses())
+            db.execute("INSERT INTO migrations (name) VALUES ('pickle')")
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+
+    def _legacy_expenses(self) -> List[Dict[str, Any]]:
+        try:
+            with open(self.legacy_path, "rb") as f:
+                expenses = pickle.load(f)
+        except EOFError:
+            expenses = []
+        except Exception as e:
+            raise ExpenseStoreError(
+                f"Could not read legacy expenses from '{self.legacy_path}': {e}"
+            )
+
+        return [{"description": "", **expense} for expense in expenses]
@@ -0,0 +1,52 @@
+import threading
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+
+# Seconds to wait for a connection, and then for each read from the socket.
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 15
+
+# How many hosts to keep connection pools for, and connections per host.
+POOLED_HOSTS = 32
+CONNECTIONS_PER_HOST = 4
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) Gecko/20100101 Firefox/141.0"
+
+
+class _TimeoutAdapter(HTTPAdapter):
+    """Applies the default timeouts to requests that do not set their own."""
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the HTTP session shared by all tools, creating it on first use.
+
+    Connections are kept alive between calls, so repeated requests to a host
+    skip the DNS lookup, TCP connect and TLS handshake.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            adapter = _TimeoutAdapter(
+                pool_connections=POOLED_HOSTS,
+                pool_maxsize=CONNECTIONS_PER_HOST,
+                pool_block=True,
+            )
+            session = requests.Session()
+            session.headers["User-Agent"] = USER_AGENT
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+
+    return _session
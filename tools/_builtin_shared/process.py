@@ -0,0 +1,216 @@
+import os
+import time
+import signal
+import asyncio
+import subprocess
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+# How much of the start and the end of each output stream is kept.
+HEAD_BYTES = 16 * 1024
+TAIL_BYTES = 48 * 1024
+
+# Seconds between samples of the process tree's memory use.
+SAMPLE_INTERVAL = 0.1
+
+# Seconds a timed out process group gets to exit before it is killed.
+KILL_GRACE = 2.0
+
+# Receives each line of output while a process runs. A tool module exposes this
+# as OUTPUT_SINK, which the CLI sets for the call it is running, so the output
+# can be shown as it arrives.
+output_sink: ContextVar[Optional[Callable[[str], None]]] = ContextVar(
+    "output_sink", default=None
+)
+
+
+class OutputBuffer:
+    """Keeps the head and tail of a stream, dropping the middle once it is full."""
+
+    def __init__(self, head_bytes: int = HEAD_BYTES, tail_bytes: int = TAIL_BYTES):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.omitted = 0
+
+    def append(self, data: bytes):
+        room = self.head_bytes - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+
+        self.tail += data
+        excess = len(self.tail) - self.tail_bytes
+        if excess > 0:
+            del self.tail[:excess]
+            self.omitted += excess
+
+    def text(self) -> str:
+        head = self.head.decode("utf-8", errors="replace")
+        tail = self.tail.decode("utf-8", errors="replace")
+        if self.omitted:
+            return f"{head}\n... [{self.omitted} bytes omitted] ...\n{tail}"
+        return head + tail
+
+
+@dataclass
+class ProcessResult:
+    """The output, exit status and resource usage of a finished process."""
+
+    stdout: str
+    stderr: str
+    returncode: int
+    timed_out: bool
+    elapsed: float
+    cpu_time: float
+    peak_rss: int
+    omitted_bytes: int
+
+
+async def run_process(command: str, timeout: float) -> ProcessResult:
+    """Run a shell command, streaming its output to the current output sink.
+
+    Only the head and tail of each stream are kept in memory. The command runs
+    in its own process group, so on timeout the whole group is terminated, and
+    then killed if it does not exit. CPU time covers the command and any
+    children it waited for, and peak RSS is sampled across the process tree.
+
+    The process is reaped here rather than by asyncio, so that its own resource
+    usage is read as it exits, apart from any other commands running at once.
+    """
+    sink = output_sink.get()
+    started = time.perf_counter()
+
+    process = subprocess.Popen(
+        command,
+        shell=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=os.name == "posix",
+    )
+    exited = asyncio.ensure_future(asyncio.to_thread(_wait, process))
+
+    stdout, stderr = OutputBuffer(), OutputBuffer()
+    readers = asyncio.gather(
+        _read_stream(await _open_stream(process.stdout), stdout, sink),
+        _read_stream(await _open_stream(process.stderr), stderr, sink),
+    )
+    peak_rss = [0]
+    sampler = asyncio.create_task(_sample_memory(process.pid, peak_rss))
+
+    timed_out = False
+    try:
+        await asyncio.wait_for(asyncio.shield(exited), timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        await _terminate(process, exited)
+    except asyncio.CancelledError:
+        await _terminate(process, exited)
+        readers.cancel()
+        raise
+    finally:
+        sampler.cancel()
+
+    try:
+        # Descendants that left the process group can hold the pipes open.
+        await asyncio.wait_for(readers, KILL_GRACE)
+    except asyncio.TimeoutError:
+        pass
+
+    return ProcessResult(
+        stdout=stdout.text(),
+        stderr=stderr.text(),
+        returncode=process.returncode,
+        timed_out=timed_out,
+        elapsed=time.perf_counter() - started,
+        cpu_time=exited.result(),
+        peak_rss=peak_rss[0],
+        omitted_bytes=stdout.omitted + stderr.omitted,
+    )
+
+
+def _wait(process: subprocess.Popen) -> float:
+    """Wait for a process to exit, returning the CPU time used by it and the
+    children it waited for.
+    """
+    if not hasattr(os, "wait4"):  # not available on Windows
+        process.wait()
+        return 0.0
+
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return usage.ru_utime + usage.ru_stime
+
+
+async def _open_stream(pipe) -> asyncio.StreamReader:
+    """Wrap one of a process's output pipes in a stream for the event loop."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+    return reader
+
+
+async def _read_stream(
+    stream: asyncio.StreamReader,
+    buffer: OutputBuffer,
+    sink: Optional[Callable[[str], None]],
+):
+    """Copy a stream into a buffer, passing each complete line to the sink."""
+    partial = b""
+    while chunk := await stream.read(64 * 1024):
+        buffer.append(chunk)
+        if sink is None:
+            continue
+
+        *lines, partial = (partial + chunk).split(b"\n")
+        for line in lines:
+            sink(line.decode("utf-8", errors="replace"))
+        partial = partial[-TAIL_BYTES:]
+
+    if sink is not None and partial:
+        sink(partial.decode("utf-8", errors="replace"))
+
+
+async def _sample_memory(pid: int, peak_rss: list):
+    """Track the largest total RSS of a process and its descendants."""
+    # Imported here, as psutil takes a while to import and only this needs it.
+    import psutil
+
+    try:
+        root = psutil.Process(pid)
+        while True:
+            rss = 0
+            for process in [root, *root.children(recursive=True)]:
+                try:
+                    rss += process.memory_info().rss
+                except psutil.Error:
+                    pass
+            peak_rss[0] = max(peak_rss[0], rss)
+            await asyncio.sleep(SAMPLE_INTERVAL)
+    except psutil.Error:
+        return
+
+
+async def _terminate(process: subprocess.Popen, exited: asyncio.Future):
+    """Terminate a process group, killing it if it outlives the grace period."""
+    _signal_group(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(asyncio.shield(exited), KILL_GRACE)
+    except asyncio.TimeoutError:
+        _signal_group(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+        await exited
+
+
+def _signal_group(process: subprocess.Popen, sig: int):
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, sig)
+        else:
+            process.send_signal(sig)
+    except ProcessLookupError:
+        pass
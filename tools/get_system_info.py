@@ -1,6 +1,10 @@
 import psutil
 
 
+# Measuring CPU usage takes a second, so results are reused briefly.
+CACHE_TTL = 5
+
+
 def get_system_info():
     """
     Returns detailed information about the system's CPU, RAM, and disk usage.
@@ -1,5 +1,11 @@
 import requests
 
+from _builtin_shared.network import get_session
+
+
+# Weather changes slowly, so results are reused for ten minutes.
+CACHE_TTL = 600
+
 
 class WeatherError(Exception):
     pass
@@ -25,7 +31,7 @@ def get_weather(location: str):
     """
     try:
         url = f"https://wttr.in/{location}?format=j1"
-        response = requests.get(url, timeout=10)
+        response = get_session().get(url)
         response.raise_for_status()
 
         data = response.json()
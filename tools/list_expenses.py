@@ -1,7 +1,7 @@
-import os
-import pickle
 from datetime import datetime
 
+from _builtin_shared.expenses import ExpenseStore
+
 
 def list_expenses(category: str = None, start_date: str = None, end_date: str = None):
     """
@@ -39,18 +39,4 @@ def list_expenses(category: str = None, start_date: str = None, end_date: str =
                 f"Invalid end_date: {end_date}. Date must be in YYYY-MM-DD format."
             )
 
-    filepath = os.path.expanduser("~/data/expenses.pkl")
-    try:
-        with open(filepath, "rb") as f:
-            expenses = pickle.load(f)
-    except (FileNotFoundError, EOFError):
-        return []
-
-    filtered = [
-        exp
-        for exp in expenses
-        if (category is None or exp["category"].lower() == category.lower())
-        and (start_date is None or exp["date"] >= start_date)
-        and (end_date is None or exp["date"] <= end_date)
-    ]
-    return filtered
+    return ExpenseStore().list(category, start_date, end_date)
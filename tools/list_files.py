@@ -23,8 +23,14 @@ def list_files(directory: str = "."):
     if not os.path.isdir(directory):
         raise FileNotFoundError(f"The directory '{directory}' does not exist.")
 
-    items = os.listdir(directory)
-    dirs = [item for item in items if os.path.isdir(os.path.join(directory, item))]
-    files = [item for item in items if os.path.isfile(os.path.join(directory, item))]
-
-    return {"directories": dirs, "files": files}
+    dirs, files = [], []
+    with os.scandir(directory) as entries:
+        # DirEntry caches the type from the directory listing, so these checks
+        # only need a stat call for symlinks.
+        for entry in entries:
+            if entry.is_dir():
+                dirs.append(entry.name)
+            elif entry.is_file():
+                files.append(entry.name)
+
+    return {"directories": sorted(dirs), "files": sorted(files)}
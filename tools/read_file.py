@@ -1,18 +1,127 @@
 import os
+import mmap
+import codecs
 
+from contextlib import nullcontext
 
-def read_file(file_path: str):
+
+# How much of a file to read when no range or cap is given.
+DEFAULT_MAX_BYTES = 64 * 1024
+
+# How much of the start of a file is inspected to detect its encoding.
+SAMPLE_BYTES = 8 * 1024
+
+# The most read from a file that reports no size, such as those in /proc.
+MAX_UNSIZED_BYTES = 16 * 1024 * 1024
+
+# Files that start with a byte order mark are decoded without it, in the
+# byte order it gives, so that any range of the file can be decoded alone.
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+]
+
+
+def _detect_encoding(sample: bytes):
+    """
+    Guess a file's encoding from its first bytes. Returns the encoding and the
+    length of its byte order mark, or None if the file is binary.
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding, len(bom)
+
+    if b"\x00" in sample:
+        return None
+
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8", 0
+    except UnicodeDecodeError:
+        return "latin-1", 0
+
+
+def _find(data, newline: bytes, origin: int, start: int) -> int:
+    """Find the next newline at or after start that is aligned to a character."""
+    offset = data.find(newline, start)
+    while offset != -1 and (offset - origin) % len(newline):
+        offset = data.find(newline, offset + 1)
+    return offset
+
+
+def _rfind(data, newline: bytes, origin: int, end: int) -> int:
+    """Find the last newline before end that is aligned to a character."""
+    offset = data.rfind(newline, origin, end)
+    while offset != -1 and (offset - origin) % len(newline):
+        offset = data.rfind(newline, origin, offset + len(newline) - 1)
+    return offset
+
+
+def _line_start(data, line: int, newline: bytes = b"\n", origin: int = 0) -> int:
+    """Return the offset of a 1-based line, scanning forwards from the start."""
+    offset = origin
+    for _ in range(line - 1):
+        offset = _find(data, newline, origin, offset)
+        if offset == -1:
+            return len(data)
+        offset += len(newline)
+    return offset
+
+
+def _tail_start(data, lines: int, newline: bytes = b"\n", origin: int = 0) -> int:
+    """Return the offset of the last `lines` lines, scanning backwards."""
+    if lines <= 0:
+        return len(data)
+    end = len(data)
+    if data[end - len(newline) :] == newline:
+        end -= len(newline)
+    for _ in range(lines):
+        end = _rfind(data, newline, origin, end)
+        if end == -1:
+            return origin
+    return end + len(newline)
+
+
+def _align(offset: int, origin: int, unit: int) -> int:
+    """Round an offset down to the start of a code unit after the BOM."""
+    return origin + max(offset - origin, 0) // unit * unit
+
+
+def read_file(
+    file_path: str,
+    start_line: int = None,
+    end_line: int = None,
+    tail_lines: int = None,
+    start_byte: int = None,
+    end_byte: int = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+):
     """
-    Reads the entire content of a specified file.
+    Reads the content of a specified file, or a range of it.
 
-    For the model: Use this to read the contents of a file. The output is a
-    string containing the file's content.
+    For the model: Use this to read the contents of a file. Small files are
+    returned whole, as a string. For large files, or when a range is requested,
+    the result is an object with the 'content' and metadata: 'total_bytes',
+    the 'byte_range' (and 'line_range') returned, and 'truncated'. If a result
+    is truncated, call this tool again with 'start_byte' set to 'next_byte' to
+    continue. To read the first N lines use end_line=N, and to read the last N
+    lines use tail_lines=N.
 
     Args:
         file_path (str): The path to the file to read.
+        start_line (int, optional): The first line to read (1-based).
+        end_line (int, optional): The last line to read (inclusive).
+        tail_lines (int, optional): Read only this many lines from the end.
+        start_byte (int, optional): The byte offset to start reading from.
+        end_byte (int, optional): The byte offset to stop reading at (exclusive).
+        max_bytes (int, optional): The most bytes to return. Defaults to 65536.
 
     Returns:
-        str: The content of the file.
+        str | dict: The content of the file, or an object with a range of the
+                    content and metadata about it.
 
     Raises:
         FileNotFoundError: If the specified file does not exist.
@@ -20,8 +129,90 @@ def read_file(file_path: str):
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"The file '{file_path}' does not exist.")
+
+    range_args = (start_line, end_line, tail_lines, start_byte, end_byte)
+    ranged = any(arg is not None for arg in range_args)
+
     try:
-        with open(file_path, "r") as f:
-            return f.read()
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size:
+                source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                # Files in /proc and the like report a size of 0 without being
+                # empty, and cannot be mapped, so they are read as they are.
+                source = nullcontext(f.read(MAX_UNSIZED_BYTES))
+
+            with source as data:
+                total = len(data)
+                if total == 0:
+                    if not ranged:
+                        return ""
+                    return {"content": "", "total_bytes": 0, "truncated": False}
+
+                detected = _detect_encoding(data[:SAMPLE_BYTES])
+                if detected is None:
+                    return {
+                        "content": None,
+                        "binary": True,
+                        "total_bytes": total,
+                        "description": "This is a binary file, not a text file.",
+                    }
+
+                encoding, origin = detected
+                result = {"total_bytes": total, "encoding": encoding}
+
+                # Newlines in UTF-16 and UTF-32 are as wide as a code unit, and
+                # offsets are only searched and cut on code unit boundaries.
+                newline = "\n".encode(encoding)
+                unit = len(newline)
+
+                if tail_lines is not None:
+                    start = _tail_start(data, tail_lines, newline, origin)
+                    end = total
+                elif start_line is not None or end_line is not None:
+                    start = _line_start(data, start_line or 1, newline, origin)
+                    end = total
+                    if end_line is not None:
+                        end = _line_start(data, end_line + 1, newline, origin)
+                else:
+                    start = _align(min(start_byte or 0, total), origin, unit)
+                    end = min(end_byte if end_byte is not None else total, total)
+                    end = _align(end, origin, unit)
+
+                end = max(start, end)
+                truncated = end - start > max_bytes
+                if truncated:
+                    end = _align(start + max_bytes, start, unit)
+                    if encoding == "utf-8":
+                        # Do not split a multi-byte character.
+                        while end > start and data[end] & 0xC0 == 0x80:
+                            end -= 1
+                    elif encoding.startswith("utf-16") and end > start:
+                        # Nor a surrogate pair.
+                        high = (
+                            data[end - 1] if encoding.endswith("le") else data[end - 2]
+                        )
+                        if 0xD8 <= high <= 0xDB:
+                            end -= unit
+
+                content = data[start:end].decode(encoding, errors="replace")
     except IOError as e:
         raise IOError(f"Error reading file '{file_path}': {e}")
+
+    if not ranged and not truncated:
+        return content
+
+    result.update(
+        {
+            "content": content,
+            "byte_range": [start, end],
+            "truncated": truncated,
+        }
+    )
+    if tail_lines is None and (start_line is not None or end_line is not None):
+        first = start_line or 1
+        last = first + content.count("\n") - (1 if content.endswith("\n") else 0)
+        result["line_range"] = [first, max(first, last)]
+    if end < total:
+        result["next_byte"] = end
+    return result
@@ -1,7 +1,7 @@
-import os
-import pickle
 from datetime import datetime
 
+from _builtin_shared.expenses import ExpenseStore
+
 
 def record_expense(category: str, amount: float, date: str, description: str = ""):
     """
@@ -30,27 +30,6 @@ def record_expense(category: str, amount: float, date: str, description: str = "
     except ValueError:
         raise ValueError("Invalid date format. Date must be in YYYY-MM-DD format.")
 
-    data_dir = os.path.expanduser("~/data")
-    os.makedirs(data_dir, exist_ok=True)
-    filepath = os.path.join(data_dir, "expenses.pkl")
-
-    expenses = []
-    if os.path.exists(filepath):
-        try:
-            with open(filepath, "rb") as f:
-                expenses = pickle.load(f)
-        except Exception:
-            expenses = []
-
-    expenses.append(
-        {
-            "category": category,
-            "amount": amount,
-            "date": date,
-            "description": description,
-        }
-    )
-    with open(filepath, "wb") as f:
-        pickle.dump(expenses, f)
+    ExpenseStore().add(category, amount, date, description)
 
     return f"Successfully recorded expense: {amount} in {category} on {date}."
@@ -1,26 +1,41 @@
-import subprocess
+from _builtin_shared.process import output_sink, run_process
 
 
-def run_command(command: str):
+# Seconds a command may run before it is stopped.
+DEFAULT_TIMEOUT = 300
+
+# The CLI sets this to a callback for each line of the command's output, so the
+# output is shown as it arrives.
+OUTPUT_SINK = output_sink
+
+
+async def run_command(command: str, timeout: int = DEFAULT_TIMEOUT):
     """
     Executes a shell command.
 
     For the model: Use this to run shell commands. Be careful with this tool.
+    Commands that run longer than the timeout are stopped. Very long output is
+    shortened to its beginning and end.
 
     Args:
         command (str): The command to execute.
+        timeout (int, optional): The most seconds the command may run. Defaults to 300.
 
     Returns:
-        dict: A dictionary containing the command's stdout, stderr, and return code.
+        dict: A dictionary containing the command's stdout, stderr, and return code,
+              whether it timed out, and its runtime, CPU time and peak memory use.
     """
     try:
-        process = subprocess.run(
-            command, shell=True, capture_output=True, text=True, check=False
-        )
+        result = await run_process(command, timeout)
         return {
-            "stdout": process.stdout,
-            "stderr": process.stderr,
-            "returncode": process.returncode,
+            "stdout": result.stdout,
+            "stderr": result.stderr,
+            "returncode": result.returncode,
+            "timed_out": result.timed_out,
+            "omitted_bytes": result.omitted_bytes,
+            "elapsed_seconds": round(result.elapsed, 3),
+            "cpu_seconds": round(result.cpu_time, 3),
+            "peak_rss_mb": round(result.peak_rss / (1024 * 1024), 1),
         }
     except Exception as e:
         return {
@@ -1,11 +1,231 @@
+import re
+import codecs
+import itertools
+from html.parser import HTMLParser
+
 import requests
-from bs4 import BeautifulSoup
+
+from requests.compat import chardet
+
+from _builtin_shared.network import get_session
+
+
+# Page contents are reused for an hour.
+CACHE_TTL = 3600
+
+# Pages larger than this are cut off, rather than read into memory whole.
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+# Once the best candidate holds this much text, the rest of the page is skipped.
+ENOUGH_CONTENT_CHARS = 50_000
+
+# Headers are only skipped outside the main content, where they hold a page's
+# navigation rather than an article's headline.
+_SKIPPED = {
+    "aside",
+    "footer",
+    "header",
+    "iframe",
+    "nav",
+    "noscript",
+    "script",
+    "select",
+    "style",
+    "svg",
+    "template",
+    "textarea",
+}
+_VOID = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "source",
+    "track",
+    "wbr",
+}
+_CONTAINERS = {"article", "body", "div", "main", "section", "td"}
+_PARAGRAPHS = {
+    "blockquote",
+    "dd",
+    "dt",
+    "figcaption",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "li",
+    "p",
+    "pre",
+}
+_BLOCKS = _CONTAINERS | _PARAGRAPHS | {"dl", "ol", "table", "tr", "ul"}
+
+_POSITIVE = re.compile(r"article|body|content|entry|main|page|post|story|text", re.I)
+_NEGATIVE = re.compile(
+    r"ad-|banner|comment|footer|menu|promo|related|share|sidebar|social|sponsor|widget",
+    re.I,
+)
+
+
+# Declares the page's encoding, as <meta charset> or as an http-equiv header.
+_META_CHARSET = re.compile(rb"""<meta[^>]*?charset\s*=\s*["']?\s*([\w.:-]+)""", re.I)
 
 
 class ScrapeError(Exception):
     pass
 
 
+class _ContentExtractor(HTMLParser):
+    """Finds a page's main content in a single pass, as the page streams in.
+
+    Boilerplate subtrees are dropped as soon as they open. Each paragraph-level
+    block is scored by its length, comma count and link density, and the score
+    is credited to its enclosing containers, readability style. The container
+    with the highest score, weighted by hints in its tag, id and class, is taken
+    as the main content.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self._stack = []  # (tag, node id) of each open element
+        self._skip_depth = 0
+        self._in_title = False
+        self._link_depth = 0
+        self._text, self._link_chars = [], 0
+        self._blocks = []  # (text, ancestor container ids)
+        self._weights = {}
+        self._scores = {}
+        self._lengths = {}
+        self._next_id = 0
+
+    @property
+    def done(self) -> bool:
+        """Whether some container already holds enough text to stop reading."""
+        return any(n >= ENOUGH_CONTENT_CHARS for n in self._lengths.values())
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_depth:
+            if tag in _SKIPPED:
+                self._skip_depth += 1
+            return
+
+        if tag in _SKIPPED and not (tag == "header" and self._in_content()):
+            self._skip_depth = 1
+            self._flush()
+            return
+
+        if tag == "title":
+            self._in_title = True
+        elif tag == "a":
+            self._link_depth += 1
+        elif tag == "br":
+            self._text.append("\n")
+
+        if tag in _VOID:
+            return
+
+        if tag in _BLOCKS:
+            self._flush()
+            if tag in ("p", "li") and self._stack and self._stack[-1][0] == tag:
+                self._stack.pop()
+
+        node = self._next_id
+        self._next_id += 1
+        self._stack.append((tag, node))
+
+        if tag in _CONTAINERS:
+            hints = " ".join(v or "" for name, v in attrs if name in ("id", "class"))
+            weight = 1.25 if tag in ("article", "main") else 1.0
+            if _POSITIVE.search(hints):
+                weight *= 1.5
+            if _NEGATIVE.search(hints):
+                weight *= 0.5
+            self._weights[node] = weight
+            self._scores[node] = 0.0
+            self._lengths[node] = 0
+
+    def handle_endtag(self, tag):
+        if self._skip_depth:
+            if tag in _SKIPPED:
+                self._skip_depth -= 1
+            return
+
+        if tag == "title":
+            self._in_title = False
+        elif tag == "a":
+            self._link_depth = max(0, self._link_depth - 1)
+
+        if not any(open_tag == tag for open_tag, _ in self._stack):
+            return
+
+        if tag in _BLOCKS:
+            self._flush()
+        while self._stack and self._stack.pop()[0] != tag:
+            pass
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self.title += data
+            return
+
+        self._text.append(data)
+        if self._link_depth:
+            self._link_chars += len(data.strip())
+
+    def content(self) -> str:
+        """Return the text of the best-scoring container, in document order."""
+        self._flush()
+        if not self._blocks:
+            return ""
+
+        # Only containers with paragraphs of their own are candidates, and their
+        # tag, id and class only weigh what those paragraphs scored.
+        candidates = {
+            node: score * self._weights[node]
+            for node, score in self._scores.items()
+            if score > 0
+        }
+        best = max(candidates, key=candidates.get, default=None)
+        blocks = [text for text, ancestors in self._blocks if best in ancestors]
+        if not blocks:
+            blocks = [text for text, _ in self._blocks]
+        return "\n".join(blocks)
+
+    def _in_content(self) -> bool:
+        return any(tag in ("article", "main") for tag, _ in self._stack)
+
+    def _flush(self):
+        """Close the current run of text as a block and score it."""
+        text = re.sub(r"[ \t\r\f\v]+", " ", "".join(self._text))
+        text = "\n".join(line.strip() for line in text.split("\n") if line.strip())
+        link_chars, self._text, self._link_chars = self._link_chars, [], 0
+        if not text:
+            return
+
+        ancestors = [node for tag, node in self._stack if tag in _CONTAINERS]
+        self._blocks.append((text, ancestors))
+
+        if len(text) < 25:
+            return
+
+        link_density = min(1.0, link_chars / len(text))
+        score = (1 + text.count(",") + min(len(text) / 100, 3)) * (1 - link_density)
+        for depth, node in enumerate(reversed(ancestors[-3:])):
+            self._scores[node] += score / (depth + 1)
+            self._lengths[node] += len(text)
+
+
 def scrape_url(url: str):
     """
     Fetches the main text content from a given URL.
@@ -25,27 +245,51 @@ def scrape_url(url: str):
         ScrapeError: If the URL cannot be fetched, is not HTML, or cannot be parsed.
     """
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) Gecko/20100101 Firefox/141.0"
-        }
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        if "text/html" not in response.headers.get("Content-Type", ""):
-            raise ScrapeError(
-                f"Content type is not text/html, but '{response.headers.get('Content-Type', '')}'."
-            )
-
-        soup = BeautifulSoup(response.text, "html.parser")
-        for tag in ["script", "style", "nav", "header", "footer", "aside"]:
-            for s in soup.select(tag):
-                s.decompose()
-
-        main_content = soup.find("article") or soup.find("main") or soup.body
-        text = main_content.get_text(separator="\n", strip=True)
-        page_title = soup.title.string if soup.title else "No title found."
-
-        return f"Title: {page_title}\n\nContent:\n{text}"
+        extractor = _ContentExtractor()
+
+        with get_session().get(url, stream=True) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "")
+            if "text/html" not in content_type:
+                raise ScrapeError(
+                    f"Content type is not text/html, but '{content_type}'."
+                )
+
+            chunks = response.iter_content(chunk_size=64 * 1024)
+            first = next(chunks, b"")
+            if "charset" in content_type:
+                encoding = response.encoding
+            else:
+                encoding = _sniff_encoding(first)
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+            size = 0
+            for chunk in itertools.chain([first], chunks):
+                size += len(chunk)
+                extractor.feed(decoder.decode(chunk))
+                if size >= MAX_PAGE_BYTES or extractor.done:
+                    break
+            else:
+                extractor.feed(decoder.decode(b"", final=True))
+
+        extractor.close()
+        page_title = extractor.title.strip() or "No title found."
+        return f"Title: {page_title}\n\nContent:\n{extractor.content()}"
     except requests.exceptions.RequestException as e:
         raise ScrapeError(f"Could not retrieve URL: {e}")
     except Exception as e:
         raise ScrapeError(f"An error occurred during scraping: {e}")
+
+
+def _sniff_encoding(head: bytes) -> str:
+    """Return the encoding a page declares in a <meta> tag, or else the one its
+    first bytes look like, as `response.apparent_encoding` would detect it from
+    the whole body.
+    """
+    match = _META_CHARSET.search(head)
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return chardet.detect(head)["encoding"] or "utf-8"
@@ -1,22 +1,210 @@
 import os
+import re
 import fnmatch
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 
-def search_files(directory: str, pattern: str):
+# Directories that are never worth searching.
+PRUNED_DIRECTORIES = {
+    ".git",
+    ".hg",
+    ".svn",
+    ".venv",
+    "venv",
+    "node_modules",
+    "__pycache__",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".tox",
+    ".nox",
+}
+
+# Files larger than this are not searched for content.
+MAX_GREP_BYTES = 10 * 1024 * 1024
+
+WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# How many directories may be scanned ahead of the results being consumed.
+SCAN_AHEAD = WORKERS * 4
+
+
+def _read_gitignore(directory: str):
+    """Parse a directory's .gitignore into (pattern, negated, dir_only, anchored)
+    rules. Anchored patterns match the path relative to the directory, and the
+    others match any file or directory name below it.
+    """
+    rules = []
+    try:
+        with open(os.path.join(directory, ".gitignore"), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return rules
+
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+
+        negated = line.startswith("!")
+        line = line.removeprefix("!")
+        dir_only = line.endswith("/")
+        line = line.rstrip("/").removeprefix("**/")
+        anchored = "/" in line
+        line = line.lstrip("/")
+        if line:
+            rules.append((line, negated, dir_only, anchored))
+
+    return rules
+
+
+def _is_ignored(path: str, is_dir: bool, ignores) -> bool:
+    """Check a path against the .gitignore rules of its ancestors, in order."""
+    ignored = False
+    for base, rules in ignores:
+        # Paths are built by joining names onto their ancestors' paths.
+        relative = path[len(base) + 1 :].replace(os.sep, "/")
+        name = relative.rsplit("/", 1)[-1]
+        for pattern, negated, dir_only, anchored in rules:
+            if dir_only and not is_dir:
+                continue
+            target = relative if anchored else name
+            if fnmatch.fnmatchcase(target, pattern):
+                ignored = not negated
+
+    return ignored
+
+
+def _grep(path: str, expression):
+    """Return the first line of a text file matching an expression, if any."""
+    try:
+        if os.path.getsize(path) > MAX_GREP_BYTES:
+            return None
+        with open(path, encoding="utf-8", errors="strict") as f:
+            for number, line in enumerate(f, 1):
+                if expression.search(line):
+                    return {"path": path, "line_number": number, "line": line.strip()}
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    return None
+
+
+def _scan(directory: str, ignores, match, expression):
+    """List one directory, returning its matches and its subdirectories."""
+    files, directories, has_gitignore = [], [], False
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                # DirEntry caches the type from the directory listing, so these
+                # checks do not need a stat call per entry.
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in PRUNED_DIRECTORIES:
+                        directories.append(entry)
+                elif match(entry.name) and entry.is_file():
+                    files.append(entry)
+                has_gitignore = has_gitignore or entry.name == ".gitignore"
+    except OSError:
+        return [], []
+
+    if has_gitignore and (rules := _read_gitignore(directory)):
+        ignores = ignores + [(directory, rules)]
+
+    matches = []
+    for entry in sorted(files, key=lambda entry: entry.name):
+        if ignores and _is_ignored(entry.path, False, ignores):
+            continue
+        if expression is None:
+            matches.append(entry.path)
+        elif found := _grep(entry.path, expression):
+            matches.append(found)
+
+    subdirectories = [
+        (entry.path, ignores)
+        for entry in sorted(directories, key=lambda entry: entry.name)
+        if not (ignores and _is_ignored(entry.path, True, ignores))
+    ]
+    return matches, subdirectories
+
+
+def _walk(directory: str, pattern: str, expression):
+    """Yield matches breadth-first, scanning directories in parallel.
+
+    Results are yielded in a stable order, so pages of results line up across
+    calls. Only a bounded number of directories is scanned ahead of the ones
+    whose results are being consumed, so the walk stops soon after the caller
+    stops consuming it.
+    """
+    flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+    match = re.compile(fnmatch.translate(pattern), flags).match
+
+    queue = deque([(directory, [])])
+    scans = deque()
+    pool = ThreadPoolExecutor(max_workers=WORKERS)
+    try:
+        while queue or scans:
+            while queue and len(scans) < SCAN_AHEAD:
+                path, ignores = queue.popleft()
+                scans.append(pool.submit(_scan, path, ignores, match, expression))
+
+            matches, subdirectories = scans.popleft().result()
+            yield from matches
+            queue.extend(subdirectories)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def search_files(
+    directory: str,
+    pattern: str,
+    contains: str = None,
+    max_results: int = 100,
+    offset: int = 0,
+):
     """
     Searches for files matching a pattern in a directory and its subdirectories.
 
-    For the model: Use this to find files. The pattern can include wildcards like *.txt.
+    For the model: Use this to find files. The pattern can include wildcards like
+    *.txt. Directories such as .git and node_modules, and anything ignored by a
+    .gitignore file, are skipped. To find files by their content, pass a regular
+    expression as 'contains'. Results are paginated: if 'next_offset' is set in
+    the result, call this tool again with that offset to get more results.
 
     Args:
         directory (str): The directory to start the search from.
         pattern (str): The search pattern (e.g., '*.py', 'data_*.csv').
+        contains (str, optional): A regular expression the file content must match.
+        max_results (int, optional): The most results to return. Defaults to 100.
+        offset (int, optional): How many results to skip. Defaults to 0.
 
     Returns:
-        list: A list of paths to matching files.
+        dict: An object with a list of 'matches' and a 'next_offset' (or null if
+              there are no more results). Each match is a file path, or, when
+              'contains' is given, an object with the 'path', and the
+              'line_number' and text of the first matching 'line'.
+
+    Raises:
+        FileNotFoundError: If the specified directory does not exist.
+        ValueError: If 'contains' is not a valid regular expression.
     """
-    matches = []
-    for root, _, filenames in os.walk(directory):
-        for filename in fnmatch.filter(filenames, pattern):
-            matches.append(os.path.join(root, filename))
-    return matches
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"The directory '{directory}' does not exist.")
+
+    try:
+        expression = re.compile(contains) if contains else None
+    except re.error as e:
+        raise ValueError(f"Invalid regular expression '{contains}': {e}")
+
+    walk = _walk(directory, pattern, expression)
+    try:
+        page = list(itertools.islice(walk, offset, offset + max_results + 1))
+    finally:
+        walk.close()
+
+    has_more = len(page) > max_results
+    return {
+        "matches": page[:max_results],
+        "next_offset": offset + max_results if has_more else None,
+    }
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from _builtin_shared.expenses import ExpenseStore
+
+
+def summarize_expenses(
+    group_by: str = "category",
+    category: str = None,
+    start_date: str = None,
+    end_date: str = None,
+):
+    """
+    Totals saved expenses by category and/or month, with optional filters.
+
+    For the model: Prefer this tool over 'list_expenses' whenever the user asks
+    how much they spent, or for totals, counts or breakdowns, since the totals
+    are computed for you. All filters are optional and can be combined. Dates
+    must be in 'YYYY-MM-DD' format.
+
+    Args:
+        group_by (str, optional): How to group the expenses. One of "category",
+            "month" or "category_month". Defaults to "category".
+        category (str, optional): Only include expenses in this category.
+        start_date (str, optional): The start of the date range (YYYY-MM-DD).
+        end_date (str, optional): The end of the date range (YYYY-MM-DD).
+
+    Returns:
+        list: One object per group, with the group's 'category' and/or 'month'
+              (YYYY-MM), the 'count' of expenses and their 'total' amount.
+
+    Raises:
+        ValueError: If group_by is invalid, or a date is not in YYYY-MM-DD format.
+    """
+    for name, value in [("start_date", start_date), ("end_date", end_date)]:
+        if value:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except ValueError:
+                raise ValueError(
+                    f"Invalid {name}: {value}. Date must be in YYYY-MM-DD format."
+                )
+
+    return ExpenseStore().summarize(group_by, category, start_date, end_date)
@@ -1,6 +1,24 @@
+import threading
+
 from ddgs import DDGS
 
 
+# Search results are reused for an hour.
+CACHE_TTL = 3600
+
+# DDGS keeps per-request state on the client, so it is not safe to share
+# between threads. Each thread that searches keeps a client of its own.
+_local = threading.local()
+
+
+def _get_client() -> DDGS:
+    """Return this thread's search client, which is reused across its calls."""
+    client = getattr(_local, "client", None)
+    if client is None:
+        client = _local.client = DDGS()
+    return client
+
+
 def web_search(
     query: str,
     engine: str = "duckduckgo",
@@ -33,12 +51,10 @@ def web_search(
               summary of the results to the user, and use the 'href' links for
               subsequent calls to this tool if more details are needed.
     """
-    with DDGS() as ddgs:
-        results = ddgs.text(
-            query,
-            max_results=max_results,
-            safesearch=safesearch,
-            region=region,
-            engine=engine,
-        )
-    return results
+    return _get_client().text(
+        query,
+        max_results=max_results,
+        safesearch=safesearch,
+        region=region,
+        engine=engine,
+    )